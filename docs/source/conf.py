@@ -8,7 +8,6 @@
 import os
 import sys
 
-sys.path.insert(0, os.path.abspath('../../drmd'))
 sys.path.insert(0, os.path.abspath('../../'))
 
 suppress_warnings = ['docutils']
@@ -0,0 +1,96 @@
+'''
+DrMD: a python package for performing quantum gate operations on two qubits.
+
+The main classes and functions are available from the package directly,
+e.g. 'drmd.QubitState' or 'from drmd import Circuit'. Submodules are only
+imported the first time one of their names is accessed, to keep
+'import drmd' fast.
+'''
+
+import importlib
+
+# Map of public names to the submodule that defines them
+_LAZY_ATTRS = {
+    "QubitState": "qubit_state",
+    "product_states": "qubit_state",
+    "basis_states": "qubit_state",
+    "bloch_states": "qubit_state",
+    "measure_arrays": "qubit_state",
+    "UnitaryGate": "unitary_gate",
+    "random_unitary": "unitary_gate",
+    "Circuit": "circuit",
+    "random_circuit": "circuit",
+    "get_registry": "gate_registry",
+    "StabilizerState": "stabilizer",
+    "MPSState": "mps",
+    "ResultCache": "cache",
+    "DiskCache": "disk_cache",
+    "synthesize": "synthesis",
+    "CircuitDAG": "dag",
+    "fuse": "fusion",
+    "FusedCircuit": "fusion",
+    "PauliTransferMatrix": "pauli_transfer",
+    "process_fidelity": "pauli_transfer",
+    "Hamiltonian": "hamiltonian",
+    "stream_apply": "stream",
+    "stream_unitary": "stream",
+    "AsyncRunner": "runner",
+    "set_precision": "precision",
+    "use_precision": "precision",
+    "set_validation": "validation",
+    "use_validation": "validation",
+    "spawn": "rng",
+    "reduced_density_matrix": "entanglement",
+    "purity": "entanglement",
+    "entropy": "entanglement",
+    "concurrence": "entanglement",
+    "fidelity": "distance",
+    "trace_distance": "distance",
+    "equal_up_to_phase": "distance",
+}
+
+_SUBMODULES = ("qubit_state", "unitary_gate", "circuit", "gate_list",
+               "gate_registry", "structure", "stabilizer",
+               "mps", "cache", "product_tree", "stream",
+               "runner", "precision", "validation", "rng",
+               "entanglement", "distance", "disk_cache",
+               "synthesis", "dag", "fusion",
+               "pauli_transfer", "hamiltonian")
+
+__all__ = list(_LAZY_ATTRS) + list(_SUBMODULES)
+
+
+def __getattr__(name):
+    """
+    Module-level attribute hook, importing the submodule
+    that defines 'name' on first access.
+
+    Args:
+        name (str): Name of the attribute or submodule.
+
+    Returns:
+        The requested class, function or submodule.
+
+    Raises:
+        AttributeError: If the package has no such attribute.
+    """
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module("." + _LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value  # cache, so the hook is not called again
+    return value
+
+
+def __dir__():
+    """
+    Lists the package attributes, including lazily imported ones.
+
+    Returns:
+        list: Names of the package attributes.
+    """
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,262 @@
+'''
+An opt-in cache of the results of applying circuits to states.
+
+Workloads that evaluate the same circuit on the same few states over and
+over can wrap their calls in a 'ResultCache':
+
+    cache = ResultCache(maxsize = 256)
+    out = cache.apply(circuit, state)
+    stats = cache.measure_stats(circuit, state, 1)
+    value = cache.expectation(circuit, state, observable)
+
+Results are keyed by the content hash of the circuit (see
+'Circuit.content_hash') and a hash of the amplitudes of the state, so
+that equal circuits built separately share cache entries. Content hashes
+need the dense unitary of the circuit, so circuits on more than
+MAX_HASH_QUBITS qubits are keyed by their exact gates instead (see
+'Circuit.gate_hash'). When the cache is full, the least recently used
+entry is evicted.
+'''
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .circuit import Circuit, MAX_HASH_QUBITS
+from .qubit_state import QubitState
+from .unitary_gate import UnitaryGate
+
+
+def _array_key(array: np.ndarray) -> str:
+    """
+    Hashes the exact contents, dtype and shape of an array.
+
+    Args:
+        array (numpy.ndarray): The array.
+
+    Returns:
+        str: Hexadecimal hash of the array.
+    """
+    array = np.ascontiguousarray(array)
+    digest = hashlib.blake2b(digest_size = 16)
+    digest.update(f"{array.dtype.str}{array.shape}".encode())
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def _circuit_key(circuit: Circuit, up_to_phase: bool = True) -> tuple:
+    """
+    Builds the part of a cache key describing a circuit.
+
+    Args:
+        circuit (Circuit): The circuit.
+        up_to_phase (bool): Whether circuits differing by a global phase
+        may share the key, see 'Circuit.content_hash'.
+
+    Returns:
+        tuple: Kind and hash of the circuit.
+    """
+    if circuit.n_qubits() > MAX_HASH_QUBITS:
+        # Building the unitary would cost more than simulating the circuit
+        return ("gates", circuit.gate_hash())
+    return ("content", circuit.content_hash(up_to_phase = up_to_phase))
+
+
+def _state_key(state) -> tuple:
+    """
+    Builds the part of a cache key describing a state.
+
+    Args:
+        state (QubitState or numpy.ndarray): The state.
+
+    Returns:
+        tuple: Type and hash of the state.
+
+    Raises:
+        TypeError: If the state is not a QubitState or numpy.ndarray.
+    """
+    if type(state) is QubitState:
+        # Circuits are applied to the current state of a QubitState,
+        # which differs from its initial state after a collapse
+        return ("QubitState", _array_key(state.peek()))
+
+    if type(state) is np.ndarray:
+        return ("ndarray", _array_key(state))
+
+    raise TypeError("Input must be numpy.ndarray or QubitState.")
+
+
+def _copy_result(result):
+    """
+    Copies a cached result, so that callers cannot modify the cache.
+
+    Args:
+        result: A state, a list of (state, probability) tuples or a value.
+
+    Returns:
+        A copy of the result.
+    """
+    if type(result) is list:
+        return [(state.copy(), prob) for state, prob in result]
+
+    if type(result) in (QubitState, np.ndarray):
+        return result.copy()
+
+    return result
+
+
+class ResultCache:
+    """
+    A bounded least-recently-used cache of circuit results.
+
+    Attributes:
+        _entries (OrderedDict): Cached results, from least to most
+        recently used.
+        _maxsize (int): Maximum number of entries.
+        _hits (int): Number of lookups answered from the cache.
+        _misses (int): Number of lookups that had to be computed.
+        _evictions (int): Number of entries evicted so far.
+        _lock (threading.Lock): Lock making the cache safe to share
+        between threads.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Initialises an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of cached results.
+
+        Raises:
+            ValueError: If maxsize is not a positive integer.
+        """
+        if type(maxsize) is not int or maxsize < 1:
+            raise ValueError("The cache size must be a positive integer.")
+
+        self._entries = OrderedDict()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def __lookup(self, key: tuple, compute):
+        """
+        Private method returning the cached result for a key, or
+        computing and caching it.
+
+        Args:
+            key (tuple): The cache key.
+            compute (callable): Function computing the result.
+
+        Returns:
+            A copy of the result.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return _copy_result(self._entries[key])
+            self._misses += 1
+
+        result = compute()
+
+        with self._lock:
+            self._entries[key] = _copy_result(result)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last = False)
+                self._evictions += 1
+
+        return result
+
+    def apply(self, circuit: Circuit, state):
+        """
+        Cached version of 'circuit.apply(state)'.
+
+        Args:
+            circuit (Circuit): The circuit.
+            state (QubitState or numpy.ndarray): The input state.
+
+        Returns:
+            QubitState or numpy.ndarray: State after applying the circuit.
+        """
+        # The global phase of the circuit matters for the output state
+        key = ("apply", _circuit_key(circuit, up_to_phase = False), _state_key(state))
+        return self.__lookup(key, lambda: circuit.apply(state))
+
+    def measure_stats(self, circuit: Circuit, state: QubitState, to_measure: int = 12) -> list:
+        """
+        Cached version of 'circuit.apply(state).measure_stats(to_measure)'.
+
+        Args:
+            circuit (Circuit): The circuit.
+            state (QubitState): The input state.
+            to_measure (int): Which qubit to measure, as in
+            'QubitState.measure_stats'.
+
+        Returns:
+            list: The states after measurement, with their probabilities.
+
+        Raises:
+            TypeError: If the state is not a QubitState.
+        """
+        if type(state) is not QubitState:
+            raise TypeError("Input must be a QubitState.")
+
+        # The states after measurement keep the global phase of the circuit
+        key = ("measure_stats", _circuit_key(circuit, up_to_phase = False), _state_key(state),
+               to_measure)
+        return self.__lookup(key, lambda: circuit.apply(state).measure_stats(to_measure))
+
+    def expectation(self, circuit: Circuit, state, observable):
+        """
+        Cached version of 'circuit.expectation(state, observable)'.
+
+        Args:
+            circuit (Circuit): The circuit.
+            state (QubitState or numpy.ndarray): The input state.
+            observable (UnitaryGate or numpy.ndarray): The observable.
+
+        Returns:
+            float or numpy.ndarray: The expectation value(s).
+        """
+        matrix = observable._matrix if type(observable) is UnitaryGate else observable
+        key = ("expectation", _circuit_key(circuit), _state_key(state),
+               _array_key(np.asarray(matrix)))
+        return self.__lookup(key, lambda: circuit.expectation(state, observable))
+
+    def stats(self) -> dict:
+        """
+        Returns the usage statistics of the cache.
+
+        Returns:
+            dict: Number of hits, misses and evictions, hit rate,
+            current size and maximum size.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {"hits": self._hits,
+                    "misses": self._misses,
+                    "evictions": self._evictions,
+                    "hit_rate": self._hits / lookups if lookups else 0.0,
+                    "size": len(self._entries),
+                    "maxsize": self._maxsize}
+
+    def clear(self):
+        """
+        Removes all entries and resets the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self):
+        """
+        Returns:
+            int: Number of cached results.
+        """
+        return len(self._entries)
@@ -1,19 +1,37 @@
 from typing import TypeVar
+import hashlib
 import numpy as np
 
-from unitary_gate import UnitaryGate, random_unitary
-from qubit_state import QubitState
+from .unitary_gate import UnitaryGate, random_unitary, _check_out
+from .qubit_state import QubitState
+from .stabilizer import StabilizerState
+from .mps import MPSState
+from .structure import canonical_phase, matrix_key
+from .product_tree import ProductTree
+from .precision import INFER, resolve_precision, cast
+from .rng import as_generator
 
 # Creates an range of valid input types for testing.
 circ_in = TypeVar("circ", list[UnitaryGate], UnitaryGate)
-state_type = TypeVar("state", np.ndarray, QubitState)
+state_type = TypeVar("state", np.ndarray, QubitState, StabilizerState, MPSState)
+
+# Largest register simulated with a dense state vector by the 'auto' backend
+MAX_STATEVECTOR_QUBITS = 20
+
+# Largest register whose unitary 'content_hash' builds; each gate of the
+# circuit is embedded as a dense 2**n x 2**n matrix
+MAX_HASH_QUBITS = 8
 
 class Circuit:
     """
-    Class for storing circuits acting on 2 qubits.
+    Class for storing circuits acting on 2 qubits, or more generally
+    on a register of n qubits.
 
     The circuit is stored as a list of unitary gates,
     Indexing starts from 0 for the gate that is first applied.
+    Each gate acts on a pair of qubits of the register, labelled from 0
+    (the most significant qubit). On 2 qubits, gates act on (0, 1) 
+    unless stated otherwise.
 
     The list of gates is inteded to be a protected attribute, 
     to be accessed through the class methods to avoid mishandling.
@@ -24,18 +42,35 @@ class Circuit:
     
     Attributes:
         _gates (list[UnitaryGate]): a list of unitaries describing the circuit.
+        _qubits (list[tuple]): the pair of qubits each gate acts on.
+        _n_qubits (int): number of qubits of the register.
+        _tree (ProductTree): partial products of the gate matrices, built
+        by the first call to 'unitary' and then updated by every edit, or
+        None if it has not been built.
+        _hashes (dict): cached content hashes, by arguments of content_hash,
+        and the gate hash, under "gates".
+        _precision (np.dtype): precision of the gates and of the states the
+        circuit outputs (see the 'precision' module), or None if dtypes 
+        are inferred by NumPy.
     """
 
-    def __init__(self, gates: circ_in = []):
+    def __init__(self, gates: circ_in = [], n_qubits: int = 2, dtype = None):
         """
-        Constructor of a a 2-qubit circuit.
+        Constructor of a a 2-qubit circuit, or an n-qubit circuit.
+        The gates given to the constructor act on qubits (0, 1).
 
         Args: 
             gates (list[UnitaryGate] or UnitaryGate): a list of unitary gates,
             or a single unitary. Implicitly, it is an empty list.
+            n_qubits (int): number of qubits of the register, at least 2.
+            dtype (str or np.dtype): precision of the circuit, 'complex64'
+            or 'complex128', or 'infer' to keep the dtypes of the gates.
+            Implicitly, the default precision (see 'precision.set_precision').
 
         Raises:
             TypeError: if input type is wrong.
+            ValueError: if n_qubits is smaller than 2, or dtype is not a 
+            valid precision.
         """
         if type(gates) is UnitaryGate:
             gates = [gates]
@@ -46,8 +81,17 @@ class Circuit:
         elif not all(type(x) is UnitaryGate for x in gates):
             raise TypeError("Elements of input list need to be UnitaryGate")
         
+        if type(n_qubits) is not int or n_qubits < 2:
+            raise ValueError("The number of qubits must be an integer of at least 2.")
+        
+        self._precision = resolve_precision(dtype)
+
         # store deep copy so that gate list cannot be modified via reference:
         self._gates= self.__deepcopy(gates)
+        self._qubits = [(0, 1)] * len(gates)
+        self._n_qubits = n_qubits
+        self._tree = None
+        self._invalidate()
     
     def __str__(self):
         """
@@ -81,8 +125,127 @@ class Circuit:
         """
         returned = []
         for unitary in gates:
-            returned.append(unitary.copy())
+            returned.append(self.__adopt(unitary))
         return returned
+
+    def __adopt(self, unitary: UnitaryGate) -> UnitaryGate:
+        """
+        Private method copying a gate, in the precision of the circuit.
+
+        Returns:
+            UnitaryGate: Copy of the gate.
+        """
+        if self._precision is None:
+            return unitary.copy()
+        return unitary.astype(self._precision)
+
+    def __check_qubits(self, qubits) -> tuple:
+        """
+        Private method checking that a gate can act on the given qubits.
+
+        Args:
+            qubits (tuple): Pair of qubits.
+
+        Returns:
+            tuple: The pair of qubits, as a tuple of ints.
+
+        Raises:
+            ValueError: If the qubits are not two distinct qubits of the register.
+        """
+        try:
+            q1, q2 = (int(q) for q in qubits)
+        except (TypeError, ValueError):
+            raise ValueError("Gates must act on a pair of qubits.") from None
+
+        if q1 == q2 or not (0 <= q1 < self._n_qubits and 0 <= q2 < self._n_qubits):
+            raise ValueError("Gates must act on two distinct qubits between 0 " +
+                             f"and {self._n_qubits - 1}.")
+        
+        return (q1, q2)
+
+    def _invalidate(self):
+        """
+        Clears the cached hashes, after the circuit is modified.
+        """
+        self._hashes = {}
+
+    def __embed(self, unitary: UnitaryGate, qubits: tuple) -> np.ndarray:
+        """
+        Private method returning the matrix of a gate acting on the
+        whole register.
+
+        Args:
+            unitary (UnitaryGate): The gate.
+            qubits (tuple): Pair of qubits the gate acts on.
+
+        Returns:
+            np.array: The 2**n x 2**n matrix of the gate.
+        """
+        dtype = self._precision or complex
+        if self._n_qubits == 2 and qubits == (0, 1):
+            return np.asarray(unitary._matrix, dtype = dtype)
+
+        # Rows of the identity are basis states; applying the gate
+        # to them gives the columns of its matrix.
+        basis = np.eye(2 ** self._n_qubits, dtype = dtype)
+        return unitary.apply_to_qubits(basis, qubits).T
+
+    def __product(self, dtype) -> np.ndarray:
+        """
+        Private method returning the product of the gates, cast so that
+        multiplying states of a given dtype by it gives the dtype applying
+        the gates in turn would give. The product is built on first use,
+        as by 'unitary'.
+
+        Args:
+            dtype (numpy.dtype): dtype of the states.
+
+        Returns:
+            np.array: The 2**n x 2**n product, not to be modified.
+        """
+        if self._tree is None:
+            self.unitary()
+
+        if self._precision is not None:
+            return self._tree.product()
+
+        dtype = np.result_type(dtype, *(unitary._matrix.dtype for unitary in self._gates))
+        product = self._tree.product()
+        if not np.issubdtype(dtype, np.complexfloating):
+            product = product.real  # real gates have a real product
+        return product.astype(dtype, copy = False)
+
+    def precision(self):
+        """
+        Returns:
+            np.dtype: Precision of the circuit, or None if the dtypes of
+            its gates are inferred by NumPy.
+        """
+        return self._precision
+
+    def n_qubits(self) -> int:
+        """
+        Function returning the number of qubits the circuit acts on.
+
+        Returns:
+            int: Number of qubits.
+        """
+        return self._n_qubits
+
+    def get_qubits(self, index: int) -> tuple:
+        """
+        Returns the pair of qubits the gate at position index acts on.
+
+        Args:
+            index (int): Position of the gate.
+
+        Returns:
+            tuple: Pair of qubits.
+
+        Raises:
+            IndexError: If index out of bounds.
+        """
+        return self._qubits[index]
         
     def is_empty(self):
         """
@@ -102,7 +265,7 @@ class Circuit:
         """
         return len(self._gates)
     
-    def append(self, unitary: UnitaryGate):
+    def append(self, unitary: UnitaryGate, qubits: tuple = (0, 1)):
         """
         Appends unitary to the end of the circuit.
         A deep copy of the unitary is appended instead of a reference
@@ -110,15 +273,23 @@ class Circuit:
         
         Args:
             unitary (UnitaryGate): Unitary to be appended to circuit
+            qubits (tuple): Pair of qubits the unitary acts on.
 
         Raises:
             TypeError: If input is not a UnitaryGate
+            ValueError: If the qubits are not valid.
         """
 
         if type(unitary) is not UnitaryGate:
             raise TypeError("Input must be a UnitaryGate")
         
-        self._gates.append(unitary.copy())
+        qubits = self.__check_qubits(qubits)
+        self._gates.append(self.__adopt(unitary))
+        self._qubits.append(qubits)
+
+        if self._tree is not None:
+            self._tree.insert(len(self._tree), self.__embed(unitary, qubits))
+        self._invalidate()
 
     def pop(self, index = -1) -> UnitaryGate:
         """
@@ -132,7 +303,13 @@ class Circuit:
         Returns:
             UnitaryGate: The unitary that was removed from the circuit.
         """
-        return self._gates.pop(index)
+        gate = self._gates.pop(index)
+        self._qubits.pop(index)
+
+        if self._tree is not None:
+            self._tree.pop(index % (self.size() + 1))
+        self._invalidate()
+        return gate
     
     def get_element(self, index: int) -> UnitaryGate:
         """
@@ -149,8 +326,41 @@ class Circuit:
         
         """
         return self._gates[index].copy()
+
+    def set_element(self, index: int, unitary: UnitaryGate, qubits: tuple = None):
+        """
+        Replaces the unitary at position index in the circuit.
+        Once the matrix of the circuit has been computed, it is updated
+        with O(log depth) matrix multiplications instead of being
+        recomputed from scratch.
+
+        Args:
+            index (int): Position of the unitary to be replaced.
+            unitary (UnitaryGate): Unitary whose deep copy is 
+                    placed in the circuit.
+            qubits (tuple): Pair of qubits the unitary acts on. 
+                    Implicitly, the qubits of the replaced unitary.
+
+        Raises:
+            TypeError: If input is not a UnitaryGate.
+            ValueError: If the qubits are not valid.
+            IndexError: If index out of bounds.
+        """
+        if type(unitary) is not UnitaryGate:
+            raise TypeError("Input must be a UnitaryGate")
+
+        if qubits is None:
+            qubits = self._qubits[index]
+        qubits = self.__check_qubits(qubits)
+
+        self._gates[index] = self.__adopt(unitary)
+        self._qubits[index] = qubits
+
+        if self._tree is not None:
+            self._tree.replace(index % self.size(), self.__embed(unitary, qubits))
+        self._invalidate()
     
-    def insert(self, index: int, unitary: UnitaryGate):
+    def insert(self, index: int, unitary: UnitaryGate, qubits: tuple = (0, 1)):
         """
         Insert at position index a unitary in the circuit.
         If index exceeds the depth of the circuit, the method
@@ -161,13 +371,28 @@ class Circuit:
             index (int): Position at which unitary is inserted.
             unitary (UnitaryGate): Unitary whose deep copy is 
                     inserted in the circuit.
+            qubits (tuple): Pair of qubits the unitary acts on.
+
+        Raises:
+            ValueError: If the qubits are not valid.
         """
-        self._gates.insert(index,unitary.copy())
+        qubits = self.__check_qubits(qubits)
+        self._gates.insert(index, self.__adopt(unitary))
+        self._qubits.insert(index, qubits)
+
+        if self._tree is not None:
+            # Position actually taken by the gate, as in list.insert()
+            position = min(max(index + len(self._tree) if index < 0 else index, 0),
+                           len(self._tree))
+            self._tree.insert(position, self.__embed(unitary, qubits))
+        self._invalidate()
 
     def merge(self, circuit: 'Circuit'):
         """
         Modify current circuit by appending deep copy 
         of the gates in another circuit to the end.
+        The other circuit may act on fewer qubits, in which
+        case its gates act on the first qubits of self.
 
         Args:
             circuit: Object of type Circuit, whose gates
@@ -175,6 +400,7 @@ class Circuit:
 
         Raises:
             TypeError: If input not of type Circuit.
+            ValueError: If input acts on more qubits than self.
 
         Returns:
             Circuit: Reference to self.
@@ -183,8 +409,11 @@ class Circuit:
         if type(circuit) != Circuit:
             raise TypeError("Merged element must be of type Circuit")
         
-        for unitary in circuit._gates:
-            self.append(unitary)    # to perform deep copy
+        if circuit._n_qubits > self._n_qubits:
+            raise ValueError("Merged circuit acts on more qubits than this circuit")
+        
+        for unitary, qubits in zip(circuit._gates, circuit._qubits):
+            self.append(unitary, qubits)    # to perform deep copy
 
         return self
     
@@ -197,32 +426,406 @@ class Circuit:
         """
         gates = self.__deepcopy(self._gates)
 
-        copied = Circuit(gates)
+        copied = Circuit(gates, self._n_qubits, dtype = self._precision or INFER)
+        copied._qubits = list(self._qubits)
         return copied
     
-    def apply(self, in_state: state_type) -> state_type:
+    def apply(self, in_state: state_type, use_product: bool = False) -> state_type:
         """
         Apply circuit to a state and return output state.
         Input state is not modified.
 
         Args:
-            in_state (QubitState or np.array): State to which self is applied.
+            in_state (QubitState, np.array, StabilizerState or MPSState): 
+            State to which self is applied. Arrays may hold one state of
+            2**n entries, or an (N, 2**n) array of N states.
+            use_product (bool): Whether to multiply QubitState and array
+            states by the product of the gates (see 'unitary'), built on
+            first use, instead of applying each gate in turn. This is
+            faster for deep circuits on few qubits; the output has the
+            same dtype either way, but may differ by rounding.
 
         Returns:
-            QubitState or np.array: State after applying the circuit, 
-            of same type as the input.
+            QubitState, np.array, StabilizerState or MPSState: State after
+            applying the circuit, of same type as the input.
+        
+        Raises:
+            ValueError: If np.array state not of correct size, or if 
+            a non-Clifford gate is applied to a StabilizerState.
+            TypeError: If input not QubitState, np.array, StabilizerState
+            or MPSState.
+        """
+        if type(in_state) in (StabilizerState, MPSState):
+            if in_state.n_qubits() != self._n_qubits:
+                raise ValueError("Wrong number of qubits of the input state.")
+
+            out_state = in_state.copy()
+            for unitary, qubits in zip(self._gates, self._qubits):
+                out_state.apply_gate(unitary, qubits)
+            return out_state
+
+        if type(in_state) is np.ndarray:
+            # States are cast once, so that every gate runs in the same precision
+            in_state = cast(in_state, self._precision)
+        
+        if self._n_qubits == 2:
+            if use_product:
+                # One product replaces the whole sequence of gates
+                if type(in_state) is QubitState:
+                    # The current state, as copied by the per-gate path below
+                    current = in_state.peek()
+                    return QubitState._from_array(self.__product(current.dtype) @ current,
+                                                  self._precision or in_state.precision() or INFER)
+                if (type(in_state) is np.ndarray and in_state.ndim in (1, 2)
+                        and in_state.shape[-1] == 4):
+                    return in_state @ self.__product(in_state.dtype).T
+
+            out_state = in_state.copy()  # don't modify input
+
+            for unitary, qubits in zip(self._gates, self._qubits):
+                if qubits == (0, 1):
+                    out_state = unitary.apply(out_state)  # errors handled here 
+                elif type(out_state) is QubitState:
+                    precision = self._precision or out_state.precision() or INFER
+                    out_state = QubitState._from_array(unitary.apply_to_qubits(
+                        out_state.peek(), qubits), precision)
+                elif type(out_state) is np.ndarray and out_state.shape[-1] == 4:
+                    out_state = unitary.apply_to_qubits(out_state, qubits)
+                else:
+                    out_state = unitary.apply(out_state)  # raises the error
+            
+            return out_state
+        
+        if type(in_state) is not np.ndarray:
+            raise TypeError("Input must be numpy.ndarray or StabilizerState " +
+                            "for circuits on more than 2 qubits.")
         
+        if in_state.ndim not in (1, 2) or in_state.shape[-1] != 2 ** self._n_qubits:
+            raise ValueError("Wrong size of state. Input states need to have " +
+                             f"{2 ** self._n_qubits} entries.")
+        
+        if use_product:
+            return in_state @ self.__product(in_state.dtype).T
+
+        out_state = in_state
+        for unitary, qubits in zip(self._gates, self._qubits):
+            out_state = unitary.apply_to_qubits(out_state, qubits)
+        
+        return out_state.copy() if out_state is in_state else out_state
+
+    def apply_into(self, in_state: np.ndarray, out: np.ndarray,
+                   scratch: np.ndarray = None, use_product: bool = False) -> np.ndarray:
+        """
+        Apply circuit to an array of states, writing the output into a
+        preallocated array. The gates alternate between out and a scratch
+        array of the same shape, so that with both arrays given, no memory 
+        is allocated however long the circuit. Input state is not modified.
+
+        Args:
+            in_state (np.array): One state of 2**n entries, or an (N, 2**n)
+            array of N states.
+            out (np.array): C-contiguous array of the same shape, receiving
+            the output. Its dtype must be able to hold the result, e.g. 
+            complex for complex gates.
+            scratch (np.array): Array like out, used as an intermediate 
+            buffer. Implicitly, one is allocated when needed.
+            use_product (bool): Whether to multiply the states by the
+            product of the gates, see 'apply'.
+
+        Returns:
+            np.array: The array out.
+
         Raises:
-            ValueError: If np.array state not of correct size.
+            ValueError: If the arrays are not of correct size, or overlap.
+            TypeError: If the arrays are not np.array.
+        """
+        if type(in_state) is not np.ndarray:
+            raise TypeError("Input must be numpy.ndarray.")
+        
+        dim = 2 ** self._n_qubits
+        if in_state.ndim not in (1, 2) or in_state.shape[-1] != dim:
+            raise ValueError("Wrong size of state. Input states need to have " +
+                             f"{dim} entries.")
+        
+        _check_out(in_state, out)
+
+        if use_product:
+            np.matmul(in_state, self.__product(in_state.dtype).T, out = out)
+            return out
+
+        if self.is_empty():
+            np.copyto(out, in_state)
+            return out
+
+        if scratch is None:
+            scratch = np.empty_like(out) if self.size() > 1 else out
+        else:
+            _check_out(in_state, scratch)
+            if np.may_share_memory(out, scratch):
+                raise ValueError("The scratch buffer must not overlap the output buffer.")
+
+        # Alternate between the buffers, so that the last gate writes into out
+        buffers = (out, scratch) if self.size() % 2 == 1 else (scratch, out)
+        source = in_state
+        for step, (unitary, qubits) in enumerate(zip(self._gates, self._qubits)):
+            target = buffers[step % 2]
+            unitary._apply_into(source, target, self._n_qubits, qubits)
+            source = target
+
+        return out
+
+    def unitary(self) -> np.ndarray:
+        """
+        Returns the matrix of the whole circuit, i.e. the product of its
+        gates. The first call stores the partial products of the gates in
+        a balanced tree (see 'ProductTree'), which later calls to append,
+        insert, pop and set_element update in O(log depth) matrix
+        multiplications, so the matrix never has to be recomputed.
+
+        Returns:
+            np.array: The 2**n x 2**n unitary matrix of the circuit.
+        """
+        if self._tree is None:
+            matrices = [self.__embed(unitary, qubits)
+                        for unitary, qubits in zip(self._gates, self._qubits)]
+            self._tree = ProductTree(matrices, 2 ** self._n_qubits,
+                                     self._precision or complex)
+        
+        return self._tree.product().copy()
+
+    def equivalent(self, circ: 'Circuit', atol: float = 1.e-8) -> bool:
+        """
+        Function checking if two circuits implement the same unitary
+        up to a global phase, even if they are made of different gates.
+
+        Args:
+            circ (Circuit): A circuit to be compared with self.
+            atol (float): Absolute tolerance of the comparison.
+
+        Returns:
+            bool: True iff. the unitaries of the circuits are equal up to a 
+            global phase.
+
+        Raises:
+            TypeError: If input is not a Circuit.
+        """
+        if type(circ) is not Circuit:
+            raise TypeError("Input must be a Circuit")
+
+        if circ._n_qubits != self._n_qubits:
+            return False
+
+        mine, theirs = self.unitary(), circ.unitary()
+
+        # Best matching global phase between the two unitaries
+        overlap = np.vdot(mine, theirs)
+        if abs(overlap) < 1.e-12:
+            return False
+        
+        return np.allclose(mine * (overlap / abs(overlap)), theirs, atol = atol)
+
+    def content_hash(self, decimals: int = 6, up_to_phase: bool = True) -> str:
+        """
+        Returns a hash of the unitary of the circuit, with its global phase
+        removed. Equivalent circuits (see 'equivalent') get the same hash,
+        so it can be used as a dictionary key to remove duplicates from 
+        large libraries of circuits. The hash is cached until the circuit
+        is modified. The unitary costs 4**n memory per gate, so circuits on
+        more than MAX_HASH_QUBITS qubits are not hashed: use 'gate_hash'
+        for them.
+
+        Args:
+            decimals (int): Number of decimals of the unitary kept before
+            hashing. Entries are compared after rounding, so two unitaries
+            differing by about 10**-decimals may rarely hash differently.
+            up_to_phase (bool): If False, the global phase is kept, so that
+            only circuits with equal unitaries share a hash.
+
+        Returns:
+            str: Hexadecimal hash of the circuit unitary.
+
+        Raises:
+            ValueError: If the circuit acts on more than MAX_HASH_QUBITS
+            qubits.
+        """
+        if self._n_qubits > MAX_HASH_QUBITS:
+            raise ValueError("Content hashes need the unitary of the circuit, on at most " +
+                             f"{MAX_HASH_QUBITS} qubits; use 'gate_hash' for larger registers.")
+
+        key = (decimals, up_to_phase)
+        if key not in self._hashes:
+            matrix = self.unitary()
+            if up_to_phase:
+                matrix = canonical_phase(matrix)
+
+            digest = hashlib.blake2b(digest_size = 16)
+            digest.update(str(self._n_qubits).encode())
+            digest.update(matrix_key(matrix, decimals))
+            self._hashes[key] = digest.hexdigest()
+        
+        return self._hashes[key]
+
+    def gate_hash(self) -> str:
+        """
+        Returns a hash of the exact gates of the circuit, and of the qubits
+        they act on. Unlike 'content_hash', it does not need the unitary
+        of the circuit, so it costs a single pass over the gate matrices,
+        and only identical circuits share it. The hash is cached until
+        the circuit is modified.
+
+        Returns:
+            str: Hexadecimal hash of the gates of the circuit.
+        """
+        if "gates" not in self._hashes:
+            digest = hashlib.blake2b(digest_size = 16)
+            digest.update(f"{self._n_qubits}:{self._precision}".encode())
+            for unitary, qubits in zip(self._gates, self._qubits):
+                digest.update(bytes(qubits))
+                digest.update(np.asarray(unitary._matrix, dtype = complex).tobytes())
+            self._hashes["gates"] = digest.hexdigest()
+
+        return self._hashes["gates"]
+
+    def expectation(self, in_state: state_type, observable) -> np.ndarray:
+        """
+        Applies the circuit to a state and returns the expectation value
+        <psi|O|psi> / <psi|psi> of an observable O in the final state.
+
+        Args:
+            in_state (QubitState or np.array): State to which self is 
+            applied, or an (N, 2**n) array of N states.
+            observable (UnitaryGate or np.array): The 2**n x 2**n matrix 
+            of the observable.
+
+        Returns:
+            float or np.array: The expectation value, or N values for a 
+            batch of states. Real if the observable is Hermitian.
+
+        Raises:
+            ValueError: If the observable is not of correct size.
             TypeError: If input not QubitState or np.array.
         """
+        if type(observable) is UnitaryGate:
+            observable = observable._matrix
+        observable = np.asarray(observable)
 
-        out_state = in_state.copy()  # don't modify input
+        dim = 2 ** self._n_qubits
+        if observable.shape != (dim, dim):
+            raise ValueError(f"The observable should be a {dim}x{dim} matrix.")
 
-        for unitary in self._gates:
-            out_state = unitary.apply(out_state)  # errors handled here 
-            
-        return out_state
+        if type(in_state) not in (QubitState, np.ndarray):
+            raise TypeError("Input must be numpy.ndarray or QubitState.")
+
+        out_state = self.apply(in_state)
+        if type(out_state) is QubitState:
+            out_state = out_state.peek()
+
+        value = (np.einsum('...i,ij,...j->...', out_state.conj(), observable, out_state) /
+                 np.einsum('...i,...i->...', out_state.conj(), out_state))
+        return np.real_if_close(value)
+
+    def is_clifford(self) -> bool:
+        """
+        Checks if every gate of the circuit is a Clifford gate, in which
+        case it can be simulated efficiently on a StabilizerState.
+
+        Returns:
+            bool: True if all gates are Clifford gates.
+        """
+        return all(unitary.is_clifford() for unitary in self._gates)
+
+    def simulate(self, backend: str = "auto", max_bond: int = 64,
+                 max_error: float = 1.e-10):
+        """
+        Applies the circuit to the state |0...0> of the register.
+
+        Args:
+            backend (str): 'statevector' for a dense state vector,
+            'stabilizer' for a StabilizerState (Clifford circuits only),
+            'mps' for a matrix product state, or 'auto'. The 'auto' backend
+            uses the stabilizer backend whenever all gates are Clifford
+            gates, a state vector for up to MAX_STATEVECTOR_QUBITS qubits,
+            and a matrix product state otherwise.
+            max_bond (int): Maximum bond dimension of the 'mps' backend.
+            max_error (float): Error budget of each truncation of the 'mps'
+            backend.
+
+        Returns:
+            np.array, StabilizerState or MPSState: The final state.
+
+        Raises:
+            ValueError: If the backend is not valid.
+        """
+        backend = self.__choose_backend(backend)
+
+        if backend == "stabilizer":
+            return self.apply(StabilizerState(self._n_qubits))
+
+        if backend == "mps":
+            return self.apply(MPSState(self._n_qubits, max_bond, max_error,
+                                       dtype = self._precision))
+
+        state = np.zeros(2 ** self._n_qubits, dtype = self._precision or complex)
+        state[0] = 1
+        return self.apply(state)
+
+    def sample(self, shots: int = 1, backend: str = "auto", max_bond: int = 64,
+               max_error: float = 1.e-10, rng = None) -> np.ndarray:
+        """
+        Applies the circuit to the state |0...0> of the register and samples
+        measurements of all qubits in the computational basis.
+
+        Args:
+            shots (int): Number of samples.
+            backend (str): Simulation backend, as in 'simulate'.
+            max_bond (int): Maximum bond dimension of the 'mps' backend.
+            max_error (float): Error budget of each truncation of the 'mps'
+            backend.
+            rng (None, int, SeedSequence or Generator): Random number
+            generator, see drmd.rng. Implicitly, a new unseeded one.
+
+        Returns:
+            np.array: (shots, n) array of measured bits, qubit 0 first.
+
+        Raises:
+            ValueError: If the backend is not valid.
+        """
+        final = self.simulate(backend, max_bond, max_error)
+
+        if type(final) in (StabilizerState, MPSState):
+            return final.sample(shots, rng)
+
+        probs = np.abs(final) ** 2
+        outcomes = as_generator(rng).choice(len(probs), size = shots,
+                                            p = probs / probs.sum())
+        shifts = np.arange(self._n_qubits - 1, -1, -1)
+        return ((outcomes[:, None] >> shifts) & 1).astype(np.uint8)
+
+    def __choose_backend(self, backend: str) -> str:
+        """
+        Private method resolving the name of a simulation backend.
+
+        Args:
+            backend (str): 'auto', 'statevector', 'stabilizer' or 'mps'.
+
+        Returns:
+            str: 'statevector', 'stabilizer' or 'mps'.
+
+        Raises:
+            ValueError: If the backend is not valid.
+        """
+        if backend == "auto":
+            if self.is_clifford():
+                return "stabilizer"
+            if self._n_qubits <= MAX_STATEVECTOR_QUBITS:
+                return "statevector"
+            return "mps"
+        
+        if backend not in ("statevector", "stabilizer", "mps"):
+            raise ValueError("The backend must be 'auto', 'statevector', " +
+                             "'stabilizer' or 'mps'.")
+        
+        return backend
     
     def compare(self, circ: 'Circuit') -> bool:
         """
@@ -238,7 +841,10 @@ class Circuit:
         if type(circ) is not Circuit:
             raise TypeError("Input must be a Circuit")
 
-        if circ.size() != self.size():
+        if circ.size() != self.size() or circ._n_qubits != self._n_qubits:
+            return False
+        
+        if circ._qubits != self._qubits:
             return False
 
         for i in range(circ.size()):
@@ -264,7 +870,7 @@ class Circuit:
         print(self._gates[-1], ".\n")
     
 
-def random_circuit(depth: int = 1) -> Circuit:
+def random_circuit(depth: int = 1, rng = None) -> Circuit:
     """
     Function that returns a random circuit of unitaries,
     of given depth.
@@ -272,14 +878,17 @@ def random_circuit(depth: int = 1) -> Circuit:
     Args:
         depth (int): Depth of the circuit to be returned.
                     Implicitly, it is 1.
+        rng (None, int, SeedSequence or Generator): Random number
+        generator, see drmd.rng. Implicitly, a new unseeded one.
 
     Returns:
         Circuit : Circuit object  with <depth> random unitaries.
     """
     gates = []
+    rng = as_generator(rng)
 
     for i in range(depth):
-        gates.append(random_unitary())
+        gates.append(random_unitary(rng = rng))
     
     return Circuit(gates)
         
\ No newline at end of file
@@ -0,0 +1,394 @@
+'''
+Dependency analysis of circuits: qubit supports, commutation, layers and
+reordering.
+
+A Circuit is an ordered list of gates, but only the order of gates that
+do not commute matters. A 'CircuitDAG' finds, for each gate, the qubits
+it really acts on (e.g. HADAMARD1 on the pair (0, 1) only acts on qubit
+0), and which earlier gates it must follow. Two gates commute when:
+
+    - they act on disjoint sets of qubits;
+    - both are diagonal in the computational basis;
+    - both are Pauli operators (up to a phase) with an even number of
+    anticommuting single-qubit factors;
+    - or, failing these rules, their matrices on the union of their
+    qubits (at most 4) commute, which is checked numerically and cached.
+
+Any order of the gates in which each gate comes after its predecessors in
+the DAG gives the same unitary. The DAG gives the layers (moments) of the
+circuit, sets of gates on disjoint qubits that can run concurrently, and
+reorders circuits so that gates on the same qubits are next to each other,
+ready to be fused:
+
+    dag = CircuitDAG(circuit)
+    moments = dag.layers()
+    grouped = dag.reorder("fusion")
+'''
+
+import numpy as np
+
+from .circuit import Circuit
+from .unitary_gate import UnitaryGate
+from .structure import PAULIS, matrix_key
+
+# Commutation results of pairs of gates checked numerically
+_COMMUTES = {}
+
+# Largest size of the commutation cache
+_MAX_COMMUTES = 65536
+
+# Positions in the pair of the qubits each gate acts on, by matrix
+_SUPPORTS = {}
+
+
+def gate_support(unitary: UnitaryGate, qubits: tuple) -> tuple:
+    """
+    Finds the qubits a gate acts on non-trivially.
+
+    Args:
+        unitary (UnitaryGate): The gate.
+        qubits (tuple): The pair of qubits the gate is applied to.
+
+    Returns:
+        tuple: The qubits of the pair on which the gate is not the identity,
+        in the order of the pair.
+    """
+    key = matrix_key(unitary._matrix)
+    if key not in _SUPPORTS:
+        matrix = np.asarray(unitary._matrix)
+        blocks = matrix.reshape(2, 2, 2, 2)  # blocks[a, b, c, d] = <ab|M|cd>
+
+        first = blocks[:, 0, :, 0]   # M = first x I, if it is a product
+        second = blocks[0, :, 0, :]  # M = I x second, if it is a product
+        only_first = np.allclose(matrix, np.kron(first, np.eye(2)))
+        only_second = np.allclose(matrix, np.kron(np.eye(2), second))
+
+        if only_first and only_second:
+            positions = ()  # a multiple of the identity
+        elif only_first:
+            positions = (0,)
+        elif only_second:
+            positions = (1,)
+        else:
+            positions = (0, 1)
+
+        if len(_SUPPORTS) >= _MAX_COMMUTES:
+            _SUPPORTS.clear()
+        _SUPPORTS[key] = positions
+
+    return tuple(qubits[p] for p in _SUPPORTS[key])
+
+
+def _pauli_factors(unitary: UnitaryGate, qubits: tuple):
+    """
+    Finds the single-qubit factors of a gate that is a Pauli operator,
+    up to a phase.
+
+    Returns:
+        dict: (x, z) bits of the factor on each qubit, or None if the
+        gate is not a Pauli operator.
+    """
+    overlaps = np.abs(np.einsum('vij,ij->v', PAULIS.conj(), np.asarray(unitary._matrix)))
+    v = int(np.argmax(overlaps))
+    if not np.isclose(overlaps[v], 4):
+        return None
+
+    return {qubits[0]: (v & 1, (v >> 1) & 1), qubits[1]: ((v >> 2) & 1, (v >> 3) & 1)}
+
+
+def _embed(unitary: UnitaryGate, qubits: tuple, register: list) -> np.ndarray:
+    """
+    Returns the matrix of a gate on a small register of qubits.
+
+    Args:
+        unitary (UnitaryGate): The gate.
+        qubits (tuple): The pair of qubits the gate is applied to.
+        register (list): Qubits of the register, most significant first.
+
+    Returns:
+        numpy.ndarray: The matrix of the gate on the register.
+    """
+    local = tuple(register.index(q) for q in qubits)
+    basis = np.eye(2 ** len(register), dtype = complex)
+    return unitary.apply_to_qubits(basis, local).T
+
+
+def _gate_info(unitary: UnitaryGate, qubits: tuple) -> tuple:
+    """
+    Computes once what the commutation rules need to know of a gate.
+
+    Args:
+        unitary (UnitaryGate): The gate.
+        qubits (tuple): The pair of qubits it is applied to.
+
+    Returns:
+        tuple: The gate, its pair of qubits, its support (see
+        'gate_support'), its Pauli factors (see '_pauli_factors') and the
+        key of its matrix.
+    """
+    return (unitary, tuple(qubits), gate_support(unitary, qubits),
+            _pauli_factors(unitary, qubits), matrix_key(unitary._matrix))
+
+
+def _commute(first: tuple, second: tuple) -> bool:
+    """
+    Checks if two gates commute, from their precomputed '_gate_info'.
+
+    Returns:
+        bool: True if the gates commute.
+    """
+    unitary1, qubits1, support1, paulis1, key1 = first
+    unitary2, qubits2, support2, paulis2, key2 = second
+
+    if not set(support1) & set(support2):
+        return True
+
+    if unitary1.is_diagonal() and unitary2.is_diagonal():
+        return True
+
+    if paulis1 is not None and paulis2 is not None:
+        anticommuting = 0
+        for q in set(paulis1) & set(paulis2):
+            (x1, z1), (x2, z2) = paulis1[q], paulis2[q]
+            anticommuting += x1 * z2 + z1 * x2
+        return anticommuting % 2 == 0
+
+    # Numerical check on the union of the qubits, with relative positions
+    register = sorted(set(qubits1) | set(qubits2))
+    key = (key1, tuple(register.index(q) for q in qubits1),
+           key2, tuple(register.index(q) for q in qubits2))
+
+    if key not in _COMMUTES:
+        a = _embed(unitary1, qubits1, register)
+        b = _embed(unitary2, qubits2, register)
+        if len(_COMMUTES) >= _MAX_COMMUTES:
+            _COMMUTES.clear()
+        _COMMUTES[key] = np.allclose(a @ b, b @ a)
+
+    return _COMMUTES[key]
+
+
+def gates_commute(first: UnitaryGate, first_qubits: tuple,
+                  second: UnitaryGate, second_qubits: tuple) -> bool:
+    """
+    Checks if two gates commute exactly, i.e. applying them in either
+    order gives the same unitary.
+
+    Args:
+        first (UnitaryGate): A gate.
+        first_qubits (tuple): The pair of qubits it is applied to.
+        second (UnitaryGate): Another gate.
+        second_qubits (tuple): The pair of qubits it is applied to.
+
+    Returns:
+        bool: True if the gates commute.
+    """
+    return _commute(_gate_info(first, first_qubits), _gate_info(second, second_qubits))
+
+
+class CircuitDAG:
+    """
+    Dependency graph of the gates of a circuit.
+
+    Attributes:
+        _circuit (Circuit): Copy of the circuit.
+        _supports (list[tuple]): Qubits each gate acts on non-trivially.
+        _predecessors (list[list[int]]): For each gate, the earlier gates
+        it directly depends on, which it must follow.
+        _successors (list[list[int]]): For each gate, the later gates
+        that must follow it.
+    """
+
+    def __init__(self, circuit: Circuit):
+        """
+        Builds the graph of a circuit, in time linear in its depth for
+        circuits of non-commuting gates.
+
+        A new gate is compared with the earlier gates on each of its
+        qubits, latest first, and the scan stops at the first one it does
+        not commute with that is a barrier: a gate that follows all earlier
+        gates on the qubit, so that they are its ancestors. A gate becomes
+        a barrier when it does not commute with any gate of its scan.
+
+        Args:
+            circuit (Circuit): The circuit.
+
+        Raises:
+            TypeError: If circuit is not a Circuit.
+        """
+        if type(circuit) is not Circuit:
+            raise TypeError("Input must be a Circuit")
+
+        self._circuit = circuit.copy()
+        size = circuit.size()
+        infos = [_gate_info(unitary, qubits)
+                 for unitary, qubits in zip(self._circuit._gates, self._circuit._qubits)]
+
+        self._supports = [info[2] for info in infos]
+        self._predecessors = [[] for i in range(size)]
+        self._successors = [[] for i in range(size)]
+
+        # Gates on each qubit, and whether each is a barrier on it
+        on_qubit = {}
+        for j in range(size):
+            predecessors = set()
+            for q in self._supports[j]:
+                gates = on_qubit.setdefault(q, [])
+                barrier = True
+                for i, is_barrier in reversed(gates):
+                    if _commute(infos[i], infos[j]):
+                        barrier = False
+                        continue
+                    predecessors.add(i)
+                    if is_barrier:
+                        break
+                gates.append((j, barrier))
+
+            for i in sorted(predecessors):
+                self._predecessors[j].append(i)
+                self._successors[i].append(j)
+
+    def __len__(self):
+        """
+        Returns:
+            int: Number of gates.
+        """
+        return len(self._supports)
+
+    def support(self, index: int) -> tuple:
+        """
+        Returns the qubits a gate acts on non-trivially.
+
+        Args:
+            index (int): Index of the gate in the circuit.
+
+        Returns:
+            tuple: The qubits, an empty tuple for a multiple of the identity.
+        """
+        return self._supports[index]
+
+    def predecessors(self, index: int) -> list:
+        """
+        Returns the earlier gates a gate directly depends on: gates it
+        does not commute with, since the last gate on each of its qubits
+        that follows all earlier ones. Other dependencies are implied by
+        these.
+
+        Args:
+            index (int): Index of the gate in the circuit.
+
+        Returns:
+            list[int]: Indices of the gates, in increasing order.
+        """
+        return list(self._predecessors[index])
+
+    def successors(self, index: int) -> list:
+        """
+        Returns the later gates that directly depend on a gate, see
+        'predecessors'.
+
+        Args:
+            index (int): Index of the gate in the circuit.
+
+        Returns:
+            list[int]: Indices of the gates, in increasing order.
+        """
+        return list(self._successors[index])
+
+    def layers(self) -> list:
+        """
+        Splits the gates into layers (moments): the gates of a layer act
+        on disjoint qubits, and only follow gates of earlier layers. Each
+        gate is put in the earliest such layer.
+
+        Returns:
+            list[list[int]]: Indices of the gates of each layer.
+        """
+        layer_of = []
+        layers = []
+        busy = []  # qubits used by each layer
+
+        for j, support in enumerate(self._supports):
+            layer = max((layer_of[i] + 1 for i in self._predecessors[j]), default = 0)
+            while layer < len(layers) and busy[layer] & set(support):
+                layer += 1
+
+            if layer == len(layers):
+                layers.append([])
+                busy.append(set())
+            layers[layer].append(j)
+            busy[layer] |= set(support)
+            layer_of.append(layer)
+
+        return layers
+
+    def depth(self) -> int:
+        """
+        Returns:
+            int: Number of layers of the circuit.
+        """
+        return len(self.layers())
+
+    def order(self, strategy: str = "fusion") -> list:
+        """
+        Returns an order of the gates that keeps the unitary of the circuit.
+
+        Args:
+            strategy (str): 'layers', to order the gates layer by layer, or
+            'fusion', to place next to each other gates acting within the
+            same qubits: after each gate, the next one is an available gate
+            acting within the qubits of the previous gates of the current
+            group, if any, else the earliest available gate.
+
+        Returns:
+            list[int]: Indices of the gates, in the new order.
+
+        Raises:
+            ValueError: If the strategy is not valid.
+        """
+        if strategy == "layers":
+            return [j for layer in self.layers() for j in layer]
+
+        if strategy != "fusion":
+            raise ValueError("The strategy must be 'layers' or 'fusion'.")
+
+        waiting = [len(p) for p in self._predecessors]
+        available = [j for j in range(len(self)) if waiting[j] == 0]
+        order = []
+        group = set()
+
+        while available:
+            chosen = next((j for j in available if set(self._supports[j]) <= group), None)
+            if chosen is None:
+                chosen = min(available)
+                group = set(self._circuit._qubits[chosen])
+
+            available.remove(chosen)
+            order.append(chosen)
+            for k in self._successors[chosen]:
+                waiting[k] -= 1
+                if waiting[k] == 0:
+                    available.append(k)
+            available.sort()
+
+        return order
+
+    def reorder(self, strategy: str = "fusion") -> Circuit:
+        """
+        Returns the circuit with its gates reordered, see 'order'. The
+        new circuit has the same unitary.
+
+        Args:
+            strategy (str): 'layers' or 'fusion'.
+
+        Returns:
+            Circuit: The reordered circuit.
+
+        Raises:
+            ValueError: If the strategy is not valid.
+        """
+        circuit = Circuit(n_qubits = self._circuit.n_qubits(),
+                          dtype = self._circuit.precision() or "infer")
+        for j in self.order(strategy):
+            circuit.append(self._circuit._gates[j], self._circuit._qubits[j])
+        return circuit
@@ -0,0 +1,398 @@
+'''
+An on-disk cache of circuit unitaries and analysis results, shared
+between processes and kept across restarts.
+
+Programs that repeatedly process the same library of circuits can keep
+the fused unitaries, and any other result computed from a circuit, in a
+directory:
+
+    cache = DiskCache("~/.cache/drmd", max_bytes = 2**30)
+    matrix = cache.unitary(circuit)
+    info = cache.metadata(circuit)
+    short = cache.lookup(circuit, "synthesis", lambda: optimise(circuit))
+
+Entries are keyed by 'Circuit.gate_hash', a hash of the exact gates of
+the circuit, so equal circuits built by different processes share them.
+Each entry is a NumPy .npz file. A value may be a numpy.ndarray, a
+Circuit, or a JSON-serialisable object such as a dictionary of numbers.
+
+Files are written to a temporary name and then renamed, so readers never
+see partial entries and need no lock. Writers take an exclusive lock on
+the directory (fcntl on Unix, msvcrt on Windows) while they add an entry
+and enforce the size cap: when the entries exceed 'max_bytes', the least
+recently used ones are deleted. Reading an entry marks it as used by
+updating its modification time.
+'''
+
+import contextlib
+import json
+import os
+import re
+import tempfile
+import zipfile
+
+import numpy as np
+
+from .circuit import Circuit
+from .unitary_gate import UnitaryGate
+from .precision import INFER
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Valid names of cached results
+_NAME = re.compile(r"[A-Za-z0-9_-]+")
+
+_LOCK_FILE = ".lock"
+
+
+@contextlib.contextmanager
+def _locked(path: str):
+    """
+    Context manager holding an exclusive lock on a file, shared by all
+    processes using it.
+
+    Args:
+        path (str): Path of the lock file, created if needed.
+    """
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _encode(value) -> dict:
+    """
+    Converts a value to the arrays of a .npz file.
+
+    Args:
+        value (numpy.ndarray, Circuit or JSON-serialisable object): The value.
+
+    Returns:
+        dict: Arrays of the file, by name.
+
+    Raises:
+        TypeError: If the value cannot be stored.
+    """
+    if type(value) is np.ndarray:
+        if value.dtype == object:
+            raise TypeError("Arrays of Python objects cannot be cached.")
+        return {"kind": np.array("ndarray"), "value": value}
+
+    if type(value) is Circuit:
+        size = value.size()
+        return {"kind": np.array("circuit"),
+                "n_qubits": np.array(value.n_qubits()),
+                "precision": np.array(str(value.precision() or INFER)),
+                "matrices": np.array([value._gates[i]._matrix for i in range(size)],
+                                     dtype = value.precision() or complex).reshape(size, 4, 4),
+                "qubits": np.array([value.get_qubits(i) for i in range(size)],
+                                   dtype = np.int64).reshape(size, 2)}
+
+    try:
+        text = json.dumps(value)
+    except (TypeError, ValueError):
+        raise TypeError("Cached values must be numpy.ndarray, Circuit or " +
+                        "JSON-serialisable objects.") from None
+
+    return {"kind": np.array("json"), "value": np.frombuffer(text.encode(), dtype = np.uint8)}
+
+
+def _decode(arrays) -> object:
+    """
+    Converts the arrays of a .npz file back to a value.
+
+    Args:
+        arrays (numpy.lib.npyio.NpzFile): The arrays of the file.
+
+    Returns:
+        The value.
+    """
+    kind = str(arrays["kind"])
+
+    if kind == "ndarray":
+        return arrays["value"]
+
+    if kind == "circuit":
+        matrices = arrays["matrices"]
+        circuit = Circuit(n_qubits = int(arrays["n_qubits"]),
+                          dtype = str(arrays["precision"]))
+        for matrix, qubits in zip(matrices, arrays["qubits"]):
+            circuit.append(UnitaryGate._from_matrix(matrix), tuple(int(q) for q in qubits))
+        return circuit
+
+    return json.loads(arrays["value"].tobytes().decode())
+
+
+def _metadata(circuit: Circuit) -> dict:
+    """
+    Describes the structure of the gates of a circuit.
+
+    Args:
+        circuit (Circuit): The circuit.
+
+    Returns:
+        dict: Number of qubits and of gates, whether the circuit is a
+        Clifford circuit, number of gates of each structure ('diagonal',
+        'permutation' or 'dense') and pairs of qubits acted on.
+    """
+    kinds = {"diagonal": 0, "permutation": 0, "dense": 0}
+    for unitary in circuit._gates:
+        kinds[unitary._kind] += 1
+
+    return {"n_qubits": circuit.n_qubits(),
+            "size": circuit.size(),
+            "clifford": circuit.is_clifford(),
+            "kinds": kinds,
+            "pairs": [list(pair) for pair in sorted(set(circuit._qubits))]}
+
+
+class DiskCache:
+    """
+    A directory of cached circuit results, bounded in size, with least
+    recently used eviction.
+
+    Attributes:
+        _directory (str): Directory of the cache files.
+        _max_bytes (int): Largest total size of the entries, in bytes.
+        _hits (int): Number of lookups answered from the cache by this object.
+        _misses (int): Number of lookups that had to be computed.
+        _evictions (int): Number of entries this object evicted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 2**20):
+        """
+        Opens a cache directory, creating it if needed.
+
+        Args:
+            directory (str): Path of the directory.
+            max_bytes (int): Largest total size of the entries, in bytes.
+            Implicitly, 256 MiB.
+
+        Raises:
+            ValueError: If max_bytes is not a positive integer.
+            OSError: If the directory cannot be created.
+        """
+        if type(max_bytes) is not int or max_bytes < 1:
+            raise ValueError("The cache size must be a positive integer.")
+
+        self._directory = os.path.abspath(os.path.expanduser(directory))
+        os.makedirs(self._directory, exist_ok = True)
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __path(self, circuit: Circuit, name: str) -> str:
+        """
+        Private method returning the path of an entry.
+
+        Raises:
+            TypeError: If circuit is not a Circuit.
+            ValueError: If the name is not valid.
+        """
+        if type(circuit) is not Circuit:
+            raise TypeError("Input must be a Circuit")
+
+        if type(name) is not str or not _NAME.fullmatch(name):
+            raise ValueError("Names of cached results may only contain letters, " +
+                             "digits, '_' and '-'.")
+
+        return os.path.join(self._directory, f"{circuit.gate_hash()}.{name}.npz")
+
+    def __entries(self) -> list:
+        """
+        Private method listing the entries of the cache.
+
+        Returns:
+            list: (modification time, size, path) of every entry.
+        """
+        entries = []
+        with os.scandir(self._directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(".npz"):
+                    try:
+                        info = entry.stat()
+                    except FileNotFoundError:  # evicted by another process
+                        continue
+                    entries.append((info.st_mtime_ns, info.st_size, entry.path))
+        return entries
+
+    def get(self, circuit: Circuit, name: str, default = None):
+        """
+        Returns a cached result of a circuit.
+
+        Args:
+            circuit (Circuit): The circuit.
+            name (str): Name of the result.
+            default: Value returned if the result is not cached.
+
+        Returns:
+            The cached value, or default.
+
+        Raises:
+            TypeError: If circuit is not a Circuit.
+            ValueError: If the name is not valid.
+        """
+        path = self.__path(circuit, name)
+
+        try:
+            with np.load(path, allow_pickle = False) as arrays:
+                value = _decode(arrays)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Missing, or evicted or replaced by another process meanwhile
+            self._misses += 1
+            return default
+
+        self._hits += 1
+        return value
+
+    def put(self, circuit: Circuit, name: str, value):
+        """
+        Stores a result of a circuit, replacing any previous one, and
+        evicts the least recently used entries if the cache is too large.
+
+        Args:
+            circuit (Circuit): The circuit.
+            name (str): Name of the result.
+            value (numpy.ndarray, Circuit or JSON-serialisable object): The result.
+
+        Raises:
+            TypeError: If circuit is not a Circuit, or the value cannot be stored.
+            ValueError: If the name is not valid.
+        """
+        path = self.__path(circuit, name)
+        arrays = _encode(value)
+
+        with tempfile.NamedTemporaryFile(dir = self._directory, suffix = ".tmp",
+                                         delete = False) as handle:
+            try:
+                np.savez(handle, **arrays)
+            except BaseException:
+                handle.close()
+                os.remove(handle.name)
+                raise
+
+        with _locked(os.path.join(self._directory, _LOCK_FILE)):
+            os.replace(handle.name, path)
+            self.__evict(keep = path)
+
+    def __evict(self, keep: str):
+        """
+        Private method deleting the least recently used entries until the
+        cache fits in its size cap. Must be called with the lock held.
+
+        Args:
+            keep (str): Path of an entry never deleted, the one just added.
+        """
+        entries = sorted(self.__entries())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self._max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self._evictions += 1
+
+    def lookup(self, circuit: Circuit, name: str, compute):
+        """
+        Returns a cached result of a circuit, or computes and caches it.
+
+        Args:
+            circuit (Circuit): The circuit.
+            name (str): Name of the result.
+            compute (callable): Function computing the result.
+
+        Returns:
+            The result.
+        """
+        missing = object()
+        value = self.get(circuit, name, missing)
+        if value is missing:
+            value = compute()
+            self.put(circuit, name, value)
+        return value
+
+    def unitary(self, circuit: Circuit) -> np.ndarray:
+        """
+        Cached version of 'circuit.unitary()'.
+
+        Args:
+            circuit (Circuit): The circuit.
+
+        Returns:
+            np.array: The 2**n x 2**n matrix of the circuit.
+        """
+        return self.lookup(circuit, "unitary", circuit.unitary)
+
+    def metadata(self, circuit: Circuit) -> dict:
+        """
+        Returns a cached description of the structure of a circuit.
+
+        Args:
+            circuit (Circuit): The circuit.
+
+        Returns:
+            dict: Number of qubits and of gates, whether the circuit is a
+            Clifford circuit, number of gates of each structure ('diagonal',
+            'permutation' or 'dense') and pairs of qubits acted on.
+        """
+        return self.lookup(circuit, "metadata", lambda: _metadata(circuit))
+
+    def stats(self) -> dict:
+        """
+        Returns the usage statistics of the cache.
+
+        Returns:
+            dict: Number of hits, misses and evictions of this object, hit
+            rate, current number of entries and total size in bytes, and
+            maximum size.
+        """
+        entries = self.__entries()
+        lookups = self._hits + self._misses
+        return {"hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self._max_bytes}
+
+    def clear(self):
+        """
+        Deletes all entries and resets the statistics.
+        """
+        with _locked(os.path.join(self._directory, _LOCK_FILE)):
+            for _, _, path in self.__entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        self._hits = self._misses = self._evictions = 0
+
+    def __len__(self):
+        """
+        Returns:
+            int: Number of cached results.
+        """
+        return len(self.__entries())
@@ -0,0 +1,175 @@
+'''
+Fidelity, distance and comparison of two-qubit states, over batches.
+
+Every function takes two arguments, each a QubitState, a 4x1 array or
+an (N, 4) array of N states, which need not be normalised. By default,
+the states are compared row by row: (N, 4) against (N, 4) gives N
+results, and a single state is compared with every row of a batch.
+With pairwise = True, every state of the first batch is compared with
+every state of the second, (N, 4) against (M, 4) giving an (N, M) array:
+
+    reference = circuit.apply(batch)
+    assert equal_up_to_phase(compiled.apply(batch), reference).all()
+
+    overlaps = fidelity(states, basis, pairwise = True)   # (N, M)
+
+For pure states, the trace distance is sqrt(1 - F), F being the fidelity.
+It is computed from the 2x2 minors of the pairs of states, by Lagrange's
+identity 1 - |<a|b>|^2 = sum_{i<j} |a_i b_j - a_j b_i|^2, which unlike
+1 - F keeps full precision for nearly equal states.
+'''
+
+import numpy as np
+
+from .entanglement import _as_batch
+
+# Largest number of entries of the temporary arrays of pairwise comparisons
+_CHUNK_ENTRIES = 1 << 20
+
+
+def _overlaps(a, b, pairwise: bool) -> tuple:
+    """
+    Computes the inner products <a|b> of normalised states.
+
+    Returns:
+        tuple: The normalised batches A and B, the inner products, of
+        shape (N,) or (N, M), and True if both inputs were single states.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not valid, or the batches are not
+        of compatible sizes.
+    """
+    batch_a, single_a = _as_batch(a)
+    batch_b, single_b = _as_batch(b)
+
+    if pairwise:
+        return batch_a, batch_b, batch_a.conj() @ batch_b.T, False
+
+    if len(batch_a) == 1:
+        inner = batch_b @ batch_a[0].conj()
+    elif len(batch_b) == 1:
+        inner = batch_a.conj() @ batch_b[0]
+    elif len(batch_a) == len(batch_b):
+        inner = np.einsum('ni,ni->n', batch_a.conj(), batch_b)
+    else:
+        raise ValueError("Batches compared row by row must have the same " +
+                         "number of states, or one state.")
+
+    return batch_a, batch_b, inner, single_a and single_b
+
+
+def fidelity(a, b, pairwise: bool = False):
+    """
+    Computes the fidelity |<a|b>|^2 of states, from 0 for orthogonal
+    states to 1 for states equal up to a global phase.
+
+    Args:
+        a (QubitState, list or numpy.ndarray): A state, or an (N, 4)
+        array of N states.
+        b (QubitState, list or numpy.ndarray): A state, or an (M, 4)
+        array of M states.
+        pairwise (bool): Whether to compare every state of a with every
+        state of b, instead of row by row.
+
+    Returns:
+        float or numpy.ndarray: The fidelity of two states, the (N,)
+        array of row by row fidelities, or the (N, M) array of the
+        fidelities of all pairs.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not valid, or the batches are not
+        of compatible sizes.
+    """
+    inner, single = _overlaps(a, b, pairwise)[2:]
+    values = np.minimum(inner.real ** 2 + inner.imag ** 2, 1)
+    return float(values[0]) if single else values
+
+
+def trace_distance(a, b, pairwise: bool = False):
+    """
+    Computes the trace distance sqrt(1 - |<a|b>|^2) of pure states, from
+    0 for states equal up to a global phase to 1 for orthogonal states.
+
+    Args:
+        a (QubitState, list or numpy.ndarray): A state, or an (N, 4)
+        array of N states.
+        b (QubitState, list or numpy.ndarray): A state, or an (M, 4)
+        array of M states.
+        pairwise (bool): Whether to compare every state of a with every
+        state of b, instead of row by row.
+
+    Returns:
+        float or numpy.ndarray: The trace distance, of the same shape as
+        the result of 'fidelity'.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not valid, or the batches are not
+        of compatible sizes.
+    """
+    batch_a, batch_b, inner, single = _overlaps(a, b, pairwise)
+
+    if pairwise:
+        batch_a = batch_a[:, None, :]
+        batch_b = batch_b[None, :, :]
+
+    values = np.zeros(inner.shape)
+    for i in range(4):
+        for j in range(i + 1, 4):
+            minor = batch_a[..., i] * batch_b[..., j] - batch_a[..., j] * batch_b[..., i]
+            values += minor.real ** 2 + minor.imag ** 2
+
+    values = np.sqrt(np.minimum(values, 1))
+    return float(values[0]) if single else values
+
+
+def equal_up_to_phase(a, b, pairwise: bool = False, rtol: float = 1.e-5,
+                      atol: float = 1.e-8):
+    """
+    Compares normalised states up to a global phase. The phase of each
+    state of b is aligned with the state of a it is compared to, and the
+    amplitudes are then compared as in numpy.allclose.
+
+    Args:
+        a (QubitState, list or numpy.ndarray): A state, or an (N, 4)
+        array of N states.
+        b (QubitState, list or numpy.ndarray): A state, or an (M, 4)
+        array of M states.
+        pairwise (bool): Whether to compare every state of a with every
+        state of b, instead of row by row.
+        rtol (float): Relative tolerance on the amplitudes.
+        atol (float): Absolute tolerance on the amplitudes.
+
+    Returns:
+        bool or numpy.ndarray: The result of the comparison, of the same
+        shape as the result of 'fidelity'.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not valid, or the batches are not
+        of compatible sizes.
+    """
+    batch_a, batch_b, inner, single = _overlaps(a, b, pairwise)
+
+    # e^{i phi} = <b|a> / |<b|a>| is the phase aligning b with a
+    size = np.abs(inner)
+    phases = np.where(size > 0, inner.conj() / np.where(size > 0, size, 1), 1)
+
+    if not pairwise:
+        aligned = batch_b * phases[:, None]
+        close = np.abs(batch_a - aligned) <= atol + rtol * np.abs(aligned)
+        values = np.all(close, axis = 1)
+        return bool(values[0]) if single else values
+
+    # Compare blocks of rows, to bound the size of the (rows, M, 4) temporaries
+    values = np.empty(inner.shape, dtype = bool)
+    rows = max(1, _CHUNK_ENTRIES // (4 * len(batch_b)))
+    for start in range(0, len(batch_a), rows):
+        stop = start + rows
+        aligned = batch_b[None, :, :] * phases[start:stop, :, None]
+        close = np.abs(batch_a[start:stop, None, :] - aligned) <= atol + rtol * np.abs(aligned)
+        values[start:stop] = np.all(close, axis = 2)
+
+    return values
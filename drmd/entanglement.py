@@ -0,0 +1,163 @@
+'''
+Reduced density matrices and entanglement measures of two-qubit states.
+
+Every function takes a QubitState, a 4x1 array, or an (N, 4) array of N
+states, e.g. the output of a Circuit applied to a batch, and computes its
+result for all states at once, with no Python loop over the batch:
+
+    states = circuit.apply(batch)             # (N, 4)
+    c = concurrence(states)                   # (N,)
+    rho = reduced_density_matrix(states, 1)   # (N, 2, 2)
+
+The states need not be normalised. For pure two-qubit states, the two
+reduced states have the same spectrum, which only depends on the
+concurrence C: its eigenvalues are (1 +- sqrt(1 - C^2)) / 2. Purity and
+entropy are therefore computed from C, without diagonalising any matrix.
+'''
+
+import numpy as np
+
+from .qubit_state import QubitState
+
+
+def _as_batch(states) -> tuple:
+    """
+    Converts states given by the user to a normalised batch.
+
+    Args:
+        states (QubitState, list or numpy.ndarray): A state, or an (N, 4)
+        array of N states.
+
+    Returns:
+        tuple: The (N, 4) array of normalised states, and True if a
+        single state was given.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not of correct size, or are null.
+    """
+    if type(states) is QubitState:
+        return states.peek()[None, :], True
+
+    if not isinstance(states, (list, tuple, np.ndarray)):
+        raise TypeError("States must be a QubitState, a list or a numpy.ndarray.")
+
+    batch = np.asarray(states)
+    if not np.issubdtype(batch.dtype, np.number):
+        raise TypeError("All elements of the states must be numbers.")
+
+    if batch.ndim not in (1, 2) or batch.shape[-1] != 4:
+        raise ValueError("States must be a 4x1 array or an (N, 4) array.")
+
+    single = batch.ndim == 1
+    batch = batch.reshape(-1, 4)
+
+    norms = np.einsum('ni,ni->n', batch.conj(), batch).real
+    if np.any(norms == 0):
+        raise ValueError("The qubit states must have some non-zero entries.")
+
+    return batch / np.sqrt(norms)[:, None], single
+
+
+def reduced_density_matrix(states, qubit: int = 1) -> np.ndarray:
+    """
+    Computes the density matrix of one qubit, tracing out the other.
+
+    Args:
+        states (QubitState, list or numpy.ndarray): A state, or an (N, 4)
+        array of N states.
+        qubit (int): The qubit kept, 1 or 2.
+
+    Returns:
+        numpy.ndarray: The 2x2 density matrix, or an (N, 2, 2) array for
+        a batch.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not valid, or the qubit is not 1 or 2.
+    """
+    if type(qubit) is not int or qubit not in (1, 2):
+        raise ValueError("The qubit kept must be 1 or 2.")
+
+    batch, single = _as_batch(states)
+    psi = batch.reshape(-1, 2, 2)  # psi[n, first qubit, second qubit]
+
+    if qubit == 1:
+        rho = np.einsum('nab,ncb->nac', psi, psi.conj())
+    else:
+        rho = np.einsum('nab,nac->nbc', psi, psi.conj())
+
+    return rho[0] if single else rho
+
+
+def concurrence(states):
+    """
+    Computes the concurrence 2|ad - bc| of states a|00> + b|01> + c|10> + d|11>,
+    from 0 for product states to 1 for maximally entangled states.
+
+    Args:
+        states (QubitState, list or numpy.ndarray): A state, or an (N, 4)
+        array of N states.
+
+    Returns:
+        float or numpy.ndarray: The concurrence, or an (N,) array for a batch.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not valid.
+    """
+    batch, single = _as_batch(states)
+    values = np.minimum(2 * np.abs(batch[:, 0] * batch[:, 3] - batch[:, 1] * batch[:, 2]), 1)
+    return float(values[0]) if single else values
+
+
+def purity(states):
+    """
+    Computes the purity Tr(rho^2) of the reduced state of either qubit,
+    from 1/2 for maximally entangled states to 1 for product states.
+
+    Args:
+        states (QubitState, list or numpy.ndarray): A state, or an (N, 4)
+        array of N states.
+
+    Returns:
+        float or numpy.ndarray: The purity, or an (N,) array for a batch.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not valid.
+    """
+    values = 1 - np.asarray(concurrence(states)) ** 2 / 2
+    return float(values) if values.ndim == 0 else values
+
+
+def entropy(states, base: float = 2):
+    """
+    Computes the von Neumann entropy of the reduced state of either
+    qubit, the entanglement entropy of the state.
+
+    Args:
+        states (QubitState, list or numpy.ndarray): A state, or an (N, 4)
+        array of N states.
+        base (float): Base of the logarithm. Implicitly 2, so that
+        maximally entangled states have an entropy of 1.
+
+    Returns:
+        float or numpy.ndarray: The entropy, or an (N,) array for a batch.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not valid, or the base is not
+        greater than 1.
+    """
+    if not base > 1:
+        raise ValueError("The base of the logarithm must be greater than 1.")
+
+    c = np.asarray(concurrence(states))
+    root = np.sqrt(1 - c ** 2)
+    eigenvalues = np.stack([(1 + root) / 2, (1 - root) / 2])
+
+    # 0 log 0 = 0
+    logs = np.log(np.where(eigenvalues > 0, eigenvalues, 1)) / np.log(base)
+    values = np.maximum(-np.sum(eigenvalues * logs, axis = 0), 0)
+    return float(values) if values.ndim == 0 else values
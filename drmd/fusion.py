@@ -0,0 +1,281 @@
+'''
+Fusion of the gates of a circuit into blocks acting on up to k qubits.
+
+Applying a gate to an n-qubit state vector reads and writes all its 2**n
+amplitudes, whatever the gate, so long circuits on many qubits are bound
+by memory traffic. 'fuse' merges runs of gates acting on overlapping
+qubits into blocks, each a 2**k x 2**k matrix on at most k qubits, so that
+a 'FusedCircuit' makes one pass over the state per block instead of one
+per gate:
+
+    fused = fuse(circuit, max_qubits = 4)
+    out = fused.apply(states)          # same result as circuit.apply(states)
+
+Gates are taken in the order of the circuit, or optionally in the
+'fusion' order of 'dag.CircuitDAG', which places gates on the same qubits
+next to each other, and each gate only counts the qubits it acts on
+non-trivially. Blocks are built greedily: a gate joins the open blocks on
+its qubits (merging them) if the result spans at most k qubits, else
+those blocks are closed and the gate starts a new one. Open blocks always
+act on disjoint qubits, so they can be closed in any order. Larger k
+means fewer passes but costlier blocks (2**k operations
+per amplitude); k = 3 to 5 is usually best.
+'''
+
+import numpy as np
+
+from .circuit import Circuit
+from .qubit_state import QubitState
+from .dag import CircuitDAG, gate_support
+from .precision import INFER, cast
+
+
+def _apply_block(tensor: np.ndarray, matrix: np.ndarray, axes: list) -> np.ndarray:
+    """
+    Applies a matrix to some axes of a batch of states.
+
+    Args:
+        tensor (numpy.ndarray): (N, 2, ..., 2) array of N states.
+        matrix (numpy.ndarray): 2**k x 2**k matrix, its first qubit being
+        the most significant.
+        axes (list): The k axes of the tensor the matrix acts on.
+
+    Returns:
+        numpy.ndarray: The new (N, 2, ..., 2) array.
+    """
+    k = len(axes)
+    op = matrix.reshape((2,) * (2 * k))
+    out = np.tensordot(op, tensor, axes = (list(range(k, 2 * k)), axes))
+    return np.moveaxis(out, list(range(k)), axes)
+
+
+def _operation(unitary, qubits: tuple, support: tuple) -> tuple:
+    """
+    Returns the matrix of a gate restricted to the qubits it acts on.
+
+    Args:
+        unitary (UnitaryGate): The gate.
+        qubits (tuple): The pair of qubits it is applied to.
+        support (tuple): The qubits it acts on, see 'dag.gate_support'.
+
+    Returns:
+        tuple: The qubits acted on (one or two), and the 2x2 or 4x4 matrix.
+    """
+    blocks = np.asarray(unitary._matrix).reshape(2, 2, 2, 2)
+
+    if len(support) == 2:
+        return tuple(qubits), np.asarray(unitary._matrix)
+    if support == (qubits[1],):
+        return support, blocks[0, :, 0, :]
+    # On the first qubit only, or a multiple of the identity
+    return (qubits[0],), blocks[:, 0, :, 0]
+
+
+class FusedCircuit:
+    """
+    A circuit of blocks of up to k qubits, built by 'fuse'.
+
+    Attributes:
+        _n_qubits (int): Number of qubits of the register.
+        _blocks (list[tuple]): Each block as (qubits in increasing order,
+        2**k x 2**k matrix), in order of application.
+        _n_gates (int): Number of gates of the original circuit.
+        _precision (numpy.dtype): Precision of the original circuit, or None.
+    """
+
+    def __init__(self, n_qubits: int, blocks: list, n_gates: int, precision):
+        """
+        Initialises a fused circuit from its blocks.
+
+        Args:
+            n_qubits (int): Number of qubits of the register.
+            blocks (list[tuple]): The (qubits, matrix) blocks.
+            n_gates (int): Number of gates of the original circuit.
+            precision (numpy.dtype): Precision of the blocks, or None.
+        """
+        self._n_qubits = n_qubits
+        self._blocks = blocks
+        self._n_gates = n_gates
+        self._precision = precision
+
+    def __len__(self):
+        """
+        Returns:
+            int: Number of blocks.
+        """
+        return len(self._blocks)
+
+    def n_qubits(self) -> int:
+        """
+        Returns:
+            int: Number of qubits of the register.
+        """
+        return self._n_qubits
+
+    def blocks(self) -> list:
+        """
+        Returns the blocks of the circuit.
+
+        Returns:
+            list[tuple]: (qubits, matrix) of each block, in order of
+            application, with copies of the matrices.
+        """
+        return [(qubits, matrix.copy()) for qubits, matrix in self._blocks]
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Number of gates of the original circuit, number of
+            blocks, and largest number of qubits of a block.
+        """
+        return {"gates": self._n_gates,
+                "blocks": len(self._blocks),
+                "max_qubits": max((len(q) for q, _ in self._blocks), default = 0)}
+
+    def apply(self, in_state):
+        """
+        Applies the blocks to a state and returns the output state.
+        Input state is not modified.
+
+        Args:
+            in_state (QubitState or np.array): A state of 2**n entries, or
+            an (N, 2**n) array of N states. QubitState inputs need a
+            register of 2 qubits.
+
+        Returns:
+            QubitState or np.array: State after applying the circuit,
+            of same type and shape as the input.
+
+        Raises:
+            TypeError: If the state is not a QubitState or numpy.ndarray.
+            ValueError: If the state is not of correct size.
+        """
+        dim = 2 ** self._n_qubits
+
+        if type(in_state) is QubitState:
+            if self._n_qubits != 2:
+                raise TypeError("QubitState inputs need a circuit on 2 qubits.")
+            # The current state, as applied by 'Circuit.apply'
+            out = self.apply(in_state.peek())
+            return QubitState._from_array(out, self._precision or in_state.precision() or INFER)
+
+        if type(in_state) is not np.ndarray:
+            raise TypeError("Input must be numpy.ndarray or QubitState.")
+
+        if in_state.ndim not in (1, 2) or in_state.shape[-1] != dim:
+            raise ValueError("Wrong size of state. Input states need to have " +
+                             f"{dim} entries.")
+
+        states = cast(in_state, self._precision).reshape((-1,) + (2,) * self._n_qubits)
+        for qubits, matrix in self._blocks:
+            states = _apply_block(states, matrix, [q + 1 for q in qubits])
+
+        out = np.ascontiguousarray(states).reshape(in_state.shape)
+        return out.copy() if np.may_share_memory(out, in_state) else out
+
+    def unitary(self) -> np.ndarray:
+        """
+        Returns:
+            np.array: The 2**n x 2**n matrix of the circuit.
+        """
+        dim = 2 ** self._n_qubits
+        return self.apply(np.eye(dim, dtype = self._precision or complex)).T
+
+
+def _close(block: list, precision) -> tuple:
+    """
+    Computes the matrix of a block from its operations.
+
+    Args:
+        block (list): [qubits of the block, list of (qubits, matrix)
+        operations in order of application].
+        precision (numpy.dtype): Precision of the matrix, or None.
+
+    Returns:
+        tuple: The qubits in increasing order, and the matrix of the block.
+    """
+    register = sorted(block[0])
+    k = len(register)
+
+    # Rows of the identity are basis states; applying the operations
+    # to them gives the columns of the matrix.
+    tensor = np.eye(2 ** k, dtype = precision or complex).reshape((-1,) + (2,) * k)
+    for qubits, matrix in block[1]:
+        tensor = _apply_block(tensor, matrix, [register.index(q) + 1 for q in qubits])
+
+    return tuple(register), np.ascontiguousarray(tensor).reshape(2 ** k, 2 ** k).T
+
+
+def fuse(circuit: Circuit, max_qubits: int = 3, reorder: bool = False) -> FusedCircuit:
+    """
+    Fuses the gates of a circuit into blocks acting on at most max_qubits
+    qubits.
+
+    Args:
+        circuit (Circuit): The circuit.
+        max_qubits (int): Largest number of qubits of a block, at least 2.
+        Blocks never span more qubits than the register.
+        reorder (bool): Whether to first reorder commuting gates to place
+        gates on the same qubits next to each other (see 'dag'). This
+        may give fewer blocks, but building the DAG costs several times
+        the fusion itself, so it is off by default.
+
+    Returns:
+        FusedCircuit: The fused circuit, with the same unitary.
+
+    Raises:
+        TypeError: If circuit is not a Circuit.
+        ValueError: If max_qubits is not an integer of at least 2.
+    """
+    if type(circuit) is not Circuit:
+        raise TypeError("Input must be a Circuit")
+
+    if type(max_qubits) is not int or max_qubits < 2:
+        raise ValueError("Blocks must span at least 2 qubits.")
+
+    gates, pairs = circuit._gates, circuit._qubits
+    if reorder:
+        dag = CircuitDAG(circuit)
+        order = dag.order("fusion")
+        supports = [dag.support(j) for j in order]
+        gates, pairs = [gates[j] for j in order], [pairs[j] for j in order]
+    else:
+        supports = [gate_support(unitary, pair) for unitary, pair in zip(gates, pairs)]
+
+    precision = circuit.precision()
+    closed = []
+    open_blocks = {}  # open block acting on each qubit
+
+    for unitary, pair, support in zip(gates, pairs, supports):
+        qubits, matrix = _operation(unitary, pair, support)
+
+        touched = []
+        for q in qubits:
+            block = open_blocks.get(q)
+            if block is not None and all(block is not other for other in touched):
+                touched.append(block)
+
+        span = set(qubits).union(*(block[0] for block in touched))
+        if len(span) <= max_qubits:
+            # Merge the open blocks on these qubits, which act on disjoint
+            # qubits and therefore commute, and add the gate
+            merged = [span, [op for block in touched for op in block[1]]]
+        else:
+            for block in touched:
+                closed.append(_close(block, precision))
+                for q in block[0]:
+                    del open_blocks[q]
+            merged = [set(qubits), []]
+
+        merged[1].append((qubits, matrix))
+        for q in merged[0]:
+            open_blocks[q] = merged
+
+    # Close the remaining blocks, each once
+    remaining = []
+    for block in open_blocks.values():
+        if all(block is not other for other in remaining):
+            remaining.append(block)
+    closed.extend(_close(block, precision) for block in remaining)
+
+    return FusedCircuit(circuit.n_qubits(), closed, circuit.size(), precision)
@@ -4,18 +4,23 @@ A file consisting of commonly found qubit gates.
 The gates are initialised objects of the 'UnitaryGate' class from the
 'unitary_gate.py' file, which the user can easily call upon.
 
-One qubit gates that define the identity matrix and Pauli matrices are
-defined using numpy arrays.
-
-One qubit gates that define the identity matrix, Pauli and Hadamard 
+One qubit gates that define the identity matrix, Pauli and Hadamard
 matrices are defined using numpy arrays. The CNOT gate is also
 explicitly defined, where cnot1 describes a control on qubit 1 and a NOT gate
 qubit on 2 and cnot2 describes a control on qubit 2 and a NOT gate on qubit 1.
 
+The phase gates S and T, the SWAP gate and the controlled-Z gate CZ are
+also included.
+
+The 'UnitaryGate' objects are only constructed (and checked for unitarity)
+the first time they are accessed, e.g. through 'gate_list.X1'. The result
+is cached, so later accesses return the same object.
+
 '''
 
 import numpy as np
-import unitary_gate
+
+from . import unitary_gate
 
 # Common gate matrices
 
@@ -28,30 +33,84 @@ Z_mat = np.array([[1, 0], [0, -1]])
 # Hadamard gate
 H_mat = 1 / np.sqrt(2) * np.array([[1, 1], [1, -1]])
 
-# Define gates
-X1 = unitary_gate.UnitaryGate(np.kron(X_mat,I_mat))
-X2 = unitary_gate.UnitaryGate(np.kron(I_mat,X_mat))
-Y1 = unitary_gate.UnitaryGate(np.kron(Y_mat,I_mat))
-Y2 = unitary_gate.UnitaryGate(np.kron(I_mat,Y_mat))
-Z1 = unitary_gate.UnitaryGate(np.kron(Z_mat,I_mat))
-Z2 = unitary_gate.UnitaryGate(np.kron(I_mat,Z_mat))
-
-HADAMARD1 = unitary_gate.UnitaryGate(np.kron(H_mat,I_mat))
-HADAMARD2 = unitary_gate.UnitaryGate(np.kron(I_mat,H_mat))
+# Phase gates
+S_mat = np.array([[1, 0], [0, 1j]])
+T_mat = np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]])
 
 # CNOT gate
 C1NOT2 = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
 C2NOT1 = np.array([[1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0]])
 
-CNOT1 = unitary_gate.UnitaryGate(C1NOT2)
-CNOT2 = unitary_gate.UnitaryGate(C2NOT1)
+# SWAP and controlled-Z gates
+SWAP_mat = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+CZ_mat = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, -1]])
+
+# Recipes for the matrix of each gate, evaluated on first access
+_GATE_MATRICES = {
+    "X1": lambda: np.kron(X_mat, I_mat),
+    "X2": lambda: np.kron(I_mat, X_mat),
+    "Y1": lambda: np.kron(Y_mat, I_mat),
+    "Y2": lambda: np.kron(I_mat, Y_mat),
+    "Z1": lambda: np.kron(Z_mat, I_mat),
+    "Z2": lambda: np.kron(I_mat, Z_mat),
+    "HADAMARD1": lambda: np.kron(H_mat, I_mat),
+    "HADAMARD2": lambda: np.kron(I_mat, H_mat),
+    "CNOT1": lambda: C1NOT2,
+    "CNOT2": lambda: C2NOT1,
+    "S1": lambda: np.kron(S_mat, I_mat),
+    "S2": lambda: np.kron(I_mat, S_mat),
+    "T1": lambda: np.kron(T_mat, I_mat),
+    "T2": lambda: np.kron(I_mat, T_mat),
+    "SWAP": lambda: SWAP_mat,
+    "CZ": lambda: CZ_mat,
+}
+
+# Gates that have already been constructed
+_GATE_CACHE = {}
+
+
+def __getattr__(name):
+    """
+    Module-level attribute hook, called when 'name' is not found
+    in the module globals. Builds the requested gate and caches it.
+
+    Args:
+        name (str): Name of the gate, e.g. 'HADAMARD1'.
+
+    Returns:
+        UnitaryGate: The requested gate.
+
+    Raises:
+        AttributeError: If no gate with this name exists.
+    """
+    if name not in _GATE_MATRICES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    if name not in _GATE_CACHE:
+        # Shared gates keep their exact matrices, whatever the default precision
+        _GATE_CACHE[name] = unitary_gate.UnitaryGate(_GATE_MATRICES[name](), dtype = "infer")
+
+    return _GATE_CACHE[name]
+
+
+def __dir__():
+    """
+    Lists the module attributes, including the gates that are
+    only constructed on demand.
+
+    Returns:
+        list: Names of the module attributes.
+    """
+    return sorted(list(globals()) + list(_GATE_MATRICES))
 
 
 # Function to list all UnitaryGate objects
 def list_unitary_gates():
-    # Use globals() to get all global variables
-    all_vars = globals()
-    # Filter for instances of UnitaryGate
-    unitary_gate_names = [name for name, var in all_vars.items() if isinstance(var, unitary_gate.UnitaryGate)]
+    """
+    Lists the names of all predefined UnitaryGate objects.
+    The gates themselves are not constructed by this call.
 
-    return unitary_gate_names
+    Returns:
+        list: Names of the predefined gates.
+    """
+    return list(_GATE_MATRICES)
@@ -0,0 +1,275 @@
+'''
+A registry of the standard gates from 'gate_list.py'.
+
+The registry holds every predefined gate together with its Hermitian
+conjugate, the products of commonly paired gates, and metadata about
+the structure of each gate (diagonal, permutation, Clifford). The gates
+and products are computed once, the first time 'get_registry()' is
+called, and can then be looked up by name or by matrix in O(1). The
+metadata is read from the structure each UnitaryGate already detects,
+so the registry and the simulator never disagree about a gate.
+'''
+
+import numpy as np
+
+from . import gate_list
+from .unitary_gate import UnitaryGate
+from .structure import matrix_key
+
+# Pairs of gates (first applied, second applied) that are fused in advance
+COMMON_PAIRS = (
+    ("HADAMARD1", "CNOT1"), ("HADAMARD2", "CNOT2"),
+    ("CNOT1", "HADAMARD1"), ("CNOT2", "HADAMARD2"),
+    ("HADAMARD1", "HADAMARD2"), ("CNOT1", "CNOT2"), ("CNOT2", "CNOT1"),
+    ("HADAMARD2", "CZ"), ("CZ", "HADAMARD2"),
+    ("S1", "HADAMARD1"), ("S2", "HADAMARD2"),
+    ("HADAMARD1", "S1"), ("HADAMARD2", "S2"),
+)
+
+
+class GateInfo:
+    """
+    Record holding a registered gate and its structural metadata.
+
+    Attributes:
+        name (str): Name of the gate in the registry.
+        gate (UnitaryGate): The gate itself.
+        dagger (str): Name of the Hermitian conjugate of the gate.
+    """
+
+    def __init__(self, name: str, gate: UnitaryGate, dagger: str):
+        """
+        Initialises the record.
+
+        Args:
+            name (str): Name of the gate.
+            gate (UnitaryGate): The gate.
+            dagger (str): Name of the Hermitian conjugate of the gate.
+        """
+        self.name = name
+        self.gate = gate
+        self.dagger = dagger
+
+    @property
+    def diagonal(self) -> bool:
+        """
+        Returns:
+            bool: True if the gate matrix is diagonal, see
+            'UnitaryGate.is_diagonal'.
+        """
+        return self.gate.is_diagonal()
+
+    @property
+    def permutation(self) -> bool:
+        """
+        Returns:
+            bool: True if the gate matrix is a permutation matrix up to
+            phases, see 'UnitaryGate.is_permutation'.
+        """
+        return self.gate.is_permutation()
+
+    @property
+    def clifford(self) -> bool:
+        """
+        Returns:
+            bool: True if the gate is a Clifford gate, see
+            'UnitaryGate.is_clifford'.
+        """
+        return self.gate.is_clifford()
+
+    def __repr__(self):
+        """
+        Overrides the default 'print()' behaviour in python.
+
+        Returns:
+            str: Name and metadata of the gate.
+        """
+        return (f"GateInfo({self.name}, dagger={self.dagger}, " +
+                f"diagonal={self.diagonal}, permutation={self.permutation}, " +
+                f"clifford={self.clifford})")
+
+
+class GateRegistry:
+    """
+    Class holding named gates with O(1) lookup by name or matrix.
+
+    Attributes:
+        _entries (dict): Map of gate names to GateInfo records.
+        _by_matrix (dict): Map of matrix keys to gate names.
+        _fused (dict): Map of (first, second) name pairs to fused gates.
+    """
+
+    def __init__(self):
+        """
+        Initialises an empty registry.
+        """
+        self._entries = {}
+        self._by_matrix = {}
+        self._fused = {}
+
+    def register(self, name: str, gate: UnitaryGate, dagger: str = None):
+        """
+        Adds a gate to the registry, together with its Hermitian conjugate.
+        The conjugate is registered as '<name>_DAG', unless it is already
+        a registered gate (e.g. for self-inverse gates).
+
+        Args:
+            name (str): Name of the gate.
+            gate (UnitaryGate): The gate.
+            dagger (str): Name of the conjugate, if already known.
+
+        Raises:
+            TypeError: If gate is not a UnitaryGate.
+            ValueError: If the name is already taken.
+        """
+        if type(gate) is not UnitaryGate:
+            raise TypeError("Registered gates must be UnitaryGate objects.")
+
+        if name in self._entries:
+            raise ValueError(f"A gate named {name} is already registered.")
+
+        self._by_matrix.setdefault(matrix_key(gate._matrix), name)
+
+        if dagger is None:
+            conj = gate.dagger()
+            dagger = self.identify(conj)
+
+            if dagger is None:
+                dagger = name + "_DAG"
+                self._entries[name] = GateInfo(name, gate, dagger)
+                self.register(dagger, conj, dagger = name)
+                return
+
+        self._entries[name] = GateInfo(name, gate, dagger)
+
+    def get(self, name: str) -> UnitaryGate:
+        """
+        Returns the gate registered under a name.
+
+        Args:
+            name (str): Name of the gate.
+
+        Returns:
+            UnitaryGate: The registered gate.
+
+        Raises:
+            KeyError: If no gate is registered under that name.
+        """
+        return self.info(name).gate
+
+    def info(self, name: str) -> GateInfo:
+        """
+        Returns the record of the gate registered under a name.
+
+        Args:
+            name (str): Name of the gate.
+
+        Returns:
+            GateInfo: The record, with the gate metadata.
+
+        Raises:
+            KeyError: If no gate is registered under that name.
+        """
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"No gate named {name} is registered.") from None
+
+    def dagger(self, name: str) -> UnitaryGate:
+        """
+        Returns the Hermitian conjugate of a registered gate.
+
+        Args:
+            name (str): Name of the gate.
+
+        Returns:
+            UnitaryGate: The conjugate gate.
+        """
+        return self.get(self.info(name).dagger)
+
+    def identify(self, gate) -> str:
+        """
+        Finds the name of a registered gate from its matrix.
+
+        Args:
+            gate (UnitaryGate or numpy.ndarray): The gate, or its matrix.
+
+        Returns:
+            str or None: Name of the gate, or None if it is not registered.
+        """
+        matrix = gate._matrix if type(gate) is UnitaryGate else gate
+        return self._by_matrix.get(matrix_key(matrix))
+
+    def fused(self, first: str, second: str) -> UnitaryGate:
+        """
+        Returns the single gate equivalent to applying 'first' and then
+        'second'. The product is computed once and then cached.
+
+        Args:
+            first (str): Name of the gate applied first.
+            second (str): Name of the gate applied second.
+
+        Returns:
+            UnitaryGate: The fused gate.
+        """
+        key = (first, second)
+        if key not in self._fused:
+            matrix = self.get(second)._matrix @ self.get(first)._matrix
+            self._fused[key] = UnitaryGate._from_matrix(matrix)
+
+        return self._fused[key]
+
+    def names(self) -> list:
+        """
+        Lists the names of all registered gates.
+
+        Returns:
+            list: Names of the registered gates, including conjugates.
+        """
+        return list(self._entries)
+
+    def __contains__(self, name):
+        """
+        Checks if a gate is registered under a name.
+
+        Returns:
+            bool: True if the name is registered.
+        """
+        return name in self._entries
+
+    def __len__(self):
+        """
+        Returns:
+            int: Number of registered gates.
+        """
+        return len(self._entries)
+
+
+# Registry of the standard gates, built on first use
+_REGISTRY = None
+
+
+def get_registry() -> GateRegistry:
+    """
+    Returns the registry of the standard gates from 'gate_list.py'.
+    The registry and its metadata are only computed the first
+    time this function is called.
+
+    Returns:
+        GateRegistry: The registry of standard gates.
+    """
+    global _REGISTRY
+
+    if _REGISTRY is None:
+        registry = GateRegistry()
+        registry.register("I", UnitaryGate(np.eye(4), dtype = "infer"))
+
+        for name in gate_list.list_unitary_gates():
+            registry.register(name, getattr(gate_list, name))
+
+        for first, second in COMMON_PAIRS:
+            registry.fused(first, second)
+
+        _REGISTRY = registry
+
+    return _REGISTRY
@@ -0,0 +1,324 @@
+'''
+Hamiltonians and their time-evolution operators exp(-iHt).
+
+A 'Hamiltonian' is given as a sum of Pauli strings with real coefficients,
+e.g. {"ZZ": 1.0, "XI": 0.5, "IX": 0.5}, the letters I, X, Y and Z standing
+for the matrices of 'gate_list' and the first letter for the most
+significant qubit, or as a Hermitian matrix. Its eigendecomposition
+H = V diag(E) V^dagger is computed once, on first use, and every evolution
+operator after that is exp(-iHt) = V diag(exp(-iEt)) V^dagger, with no
+matrix exponential and no unitarity check:
+
+    h = Hamiltonian({"ZZ": 1.0, "XI": 0.5, "IX": 0.5})
+    times = np.linspace(0, 10, 1000)
+    ops = h.evolution(times)           # (1000, 4, 4), in one call
+    states = h.evolve(state, times)    # (1000, 4), without forming ops
+    gates = h.gates(times)             # list of UnitaryGate
+
+The matrix of a Hamiltonian on n qubits has 4**n entries, so larger
+systems are simulated with Trotter circuits instead: 'trotter' returns a
+Circuit of the exact exponentials of the single Pauli terms, each acting
+on at most two qubits, which 'Circuit.apply' runs gate by gate.
+'''
+
+import itertools
+
+import numpy as np
+
+from .unitary_gate import UnitaryGate
+from .circuit import Circuit
+from .validation import should_validate
+from . import gate_list
+
+# Matrices of the letters of Pauli strings
+_LETTERS = {"I": gate_list.I_mat, "X": gate_list.X_mat,
+            "Y": gate_list.Y_mat, "Z": gate_list.Z_mat}
+
+
+def pauli_string(string: str) -> np.ndarray:
+    """
+    Returns the matrix of a Pauli string.
+
+    Args:
+        string (str): Letters I, X, Y or Z, the first one acting on the
+        most significant qubit.
+
+    Returns:
+        numpy.ndarray: The 2**n x 2**n matrix.
+
+    Raises:
+        ValueError: If the string is empty or has other letters.
+    """
+    if type(string) is not str or not string or set(string) - set(_LETTERS):
+        raise ValueError("Pauli strings must be non-empty strings of I, X, Y and Z.")
+
+    matrix = np.ones((1, 1), dtype = complex)
+    for letter in string:
+        matrix = np.kron(matrix, _LETTERS[letter])
+    return matrix
+
+
+class Hamiltonian:
+    """
+    A Hermitian operator on n qubits, with a cached eigendecomposition.
+
+    Attributes:
+        _n_qubits (int): Number of qubits.
+        _terms (dict): Real coefficient of each Pauli string, or None
+        until needed for Hamiltonians given as a matrix.
+        _matrix (numpy.ndarray): The 2**n x 2**n matrix, or None until needed.
+        _eigen (tuple): Eigenvalues and eigenvectors, or None until needed.
+    """
+
+    def __init__(self, operator):
+        """
+        Initialises a Hamiltonian.
+
+        Args:
+            operator (dict, list or numpy.ndarray): Coefficients of Pauli
+            strings of the same length, or a Hermitian 2**n x 2**n matrix.
+
+        Raises:
+            TypeError: If the operator is not of valid type.
+            ValueError: If the Pauli strings or the matrix are not valid.
+        """
+        self._terms = None
+        self._matrix = None
+        self._eigen = None
+
+        if type(operator) is dict:
+            if not operator:
+                raise ValueError("The Hamiltonian must have at least one term.")
+
+            lengths = set()
+            terms = {}
+            for string, coefficient in operator.items():
+                pauli_string(string)  # checks the letters
+                lengths.add(len(string))
+                if not np.isreal(coefficient):
+                    raise ValueError("Coefficients of Pauli strings must be real.")
+                terms[string] = terms.get(string, 0.0) + float(np.real(coefficient))
+
+            if len(lengths) != 1:
+                raise ValueError("All Pauli strings must have the same length.")
+
+            self._n_qubits = lengths.pop()
+            self._terms = terms
+
+        elif isinstance(operator, (list, np.ndarray)):
+            matrix = np.array(operator, dtype = complex)
+            dim = matrix.shape[0] if matrix.ndim == 2 else 0
+
+            if matrix.shape != (dim, dim) or dim < 2 or dim & (dim - 1):
+                raise ValueError("The matrix must be 2**n x 2**n, with n at least 1.")
+
+            if should_validate() and not np.allclose(matrix, matrix.conj().T):
+                raise ValueError("The matrix must be Hermitian.")
+
+            self._n_qubits = dim.bit_length() - 1
+            self._matrix = matrix
+
+        else:
+            raise TypeError("Operator must be a dict of Pauli strings, a list " +
+                            "or a numpy.ndarray.")
+
+    def n_qubits(self) -> int:
+        """
+        Returns:
+            int: Number of qubits.
+        """
+        return self._n_qubits
+
+    def terms(self) -> dict:
+        """
+        Returns the decomposition of the Hamiltonian in Pauli strings. For
+        Hamiltonians given as a matrix, it is computed on first call, from
+        the 4**n traces Tr(P H) / 2**n.
+
+        Returns:
+            dict: The non-zero real coefficient of each Pauli string.
+        """
+        if self._terms is None:
+            dim = 2 ** self._n_qubits
+            terms = {}
+            for letters in itertools.product("IXYZ", repeat = self._n_qubits):
+                string = "".join(letters)
+                coefficient = np.vdot(pauli_string(string), self._matrix).real / dim
+                if abs(coefficient) > 1.e-12:
+                    terms[string] = float(coefficient)
+            self._terms = terms
+
+        return dict(self._terms)
+
+    def matrix(self) -> np.ndarray:
+        """
+        Returns:
+            numpy.ndarray: Copy of the 2**n x 2**n matrix.
+        """
+        if self._matrix is None:
+            dim = 2 ** self._n_qubits
+            matrix = np.zeros((dim, dim), dtype = complex)
+            for string, coefficient in self._terms.items():
+                matrix += coefficient * pauli_string(string)
+            self._matrix = matrix
+
+        return self._matrix.copy()
+
+    def __eigen(self) -> tuple:
+        """
+        Private method returning the cached eigendecomposition.
+
+        Returns:
+            tuple: Eigenvalues in increasing order, and the matrix of the
+            eigenvectors, as columns.
+        """
+        if self._eigen is None:
+            self._eigen = np.linalg.eigh(self.matrix())
+        return self._eigen
+
+    def eigenvalues(self) -> np.ndarray:
+        """
+        Returns:
+            numpy.ndarray: The eigenvalues (energies), in increasing order.
+        """
+        return self.__eigen()[0].copy()
+
+    def evolution(self, times) -> np.ndarray:
+        """
+        Computes the evolution operators exp(-iHt) for an array of times.
+
+        Args:
+            times (float or numpy.ndarray): A time, or an array of times.
+
+        Returns:
+            numpy.ndarray: Array of shape times.shape + (2**n, 2**n).
+        """
+        energies, vectors = self.__eigen()
+        phases = np.exp(-1j * np.multiply.outer(np.asarray(times, dtype = float), energies))
+        return (vectors * phases[..., None, :]) @ vectors.conj().T
+
+    def evolve(self, states, times) -> np.ndarray:
+        """
+        Evolves states for an array of times, without forming the
+        evolution operators: each state is projected on the eigenvectors
+        once, and every time only multiplies its components by phases.
+
+        Args:
+            states (numpy.ndarray): A state of 2**n entries, or an (N, 2**n)
+            array of N states.
+            times (float or numpy.ndarray): A time, or an array of times.
+
+        Returns:
+            numpy.ndarray: Array of shape times.shape + states.shape.
+
+        Raises:
+            ValueError: If the states are not of correct size.
+        """
+        states = np.asarray(states)
+        dim = 2 ** self._n_qubits
+        if states.ndim not in (1, 2) or states.shape[-1] != dim:
+            raise ValueError(f"States must have {dim} entries.")
+
+        energies, vectors = self.__eigen()
+        components = states @ vectors.conj()  # (..., dim), in the eigenbasis
+        phases = np.exp(-1j * np.multiply.outer(np.asarray(times, dtype = float), energies))
+        if states.ndim == 2:
+            phases = phases[..., None, :]
+        return (phases * components) @ vectors.T
+
+    def gates(self, times) -> list:
+        """
+        Returns the evolution operators of a two-qubit Hamiltonian as gates.
+
+        Args:
+            times (numpy.ndarray): Array of times.
+
+        Returns:
+            list[UnitaryGate]: The gate exp(-iHt) of each time.
+
+        Raises:
+            ValueError: If the Hamiltonian is not on 2 qubits.
+        """
+        if self._n_qubits != 2:
+            raise ValueError("Gates act on 2 qubits; use 'trotter' for larger systems.")
+
+        operators = self.evolution(np.ravel(times))
+        return [UnitaryGate._from_matrix(matrix) for matrix in operators]
+
+    def circuits(self, times, steps: int = 1, order: int = 2) -> list:
+        """
+        Returns circuits implementing the evolution for an array of times:
+        exactly with one gate on 2 qubits, else with Trotter circuits.
+
+        Args:
+            times (numpy.ndarray): Array of times.
+            steps (int): Number of Trotter steps, on more than 2 qubits.
+            order (int): Order of the Trotter formula, 1 or 2.
+
+        Returns:
+            list[Circuit]: A circuit for each time.
+        """
+        if self._n_qubits == 2:
+            return [Circuit([gate]) for gate in self.gates(times)]
+        return [self.trotter(t, steps, order) for t in np.ravel(times)]
+
+    def trotter(self, time: float, steps: int = 1, order: int = 2) -> Circuit:
+        """
+        Builds a Trotter circuit approximating exp(-iHt), as a product of
+        the exact exponentials exp(-i c t P) = cos(ct) I - i sin(ct) P of
+        the Pauli terms, repeated over 'steps' steps of length t / steps.
+        The first order formula applies the terms in order; the second
+        order one applies half steps of them in order, then in reverse.
+
+        Args:
+            time (float): The time t.
+            steps (int): Number of Trotter steps.
+            order (int): Order of the formula, 1 or 2.
+
+        Returns:
+            Circuit: A circuit on max(n, 2) qubits.
+
+        Raises:
+            ValueError: If a term acts on more than 2 qubits, or steps or
+            order is not valid.
+        """
+        if type(steps) is not int or steps < 1:
+            raise ValueError("The number of steps must be a positive integer.")
+
+        if order not in (1, 2):
+            raise ValueError("The order of the Trotter formula must be 1 or 2.")
+
+        n_qubits = max(self._n_qubits, 2)
+        dt = time / steps
+        factors = []
+        for string, coefficient in self.terms().items():
+            support = [q for q, letter in enumerate(string) if letter != "I"]
+            if len(support) > 2:
+                raise ValueError(f"The term {string} acts on more than 2 qubits.")
+            if not support:
+                continue  # a global phase
+
+            if len(support) == 1:
+                # Pair the qubit with a neighbour, on which the gate is the identity
+                other = support[0] + 1 if support[0] + 1 < n_qubits else support[0] - 1
+                pair = (support[0], other)
+            else:
+                pair = tuple(support)
+            pauli = pauli_string("".join(string[q] if q < len(string) else "I" for q in pair))
+            factors.append((coefficient, pauli, pair))
+
+        def exponential(coefficient, pauli, fraction):
+            angle = coefficient * dt * fraction
+            return UnitaryGate._from_matrix(np.cos(angle) * np.eye(4) - 1j * np.sin(angle) * pauli)
+
+        if order == 1:
+            step = [(exponential(c, p, 1), pair) for c, p, pair in factors]
+        else:
+            half = [(exponential(c, p, 0.5), pair) for c, p, pair in factors]
+            step = half + half[::-1]
+
+        circuit = Circuit(n_qubits = n_qubits)
+        for i in range(steps):
+            for gate, pair in step:
+                circuit.append(gate, pair)
+        return circuit
@@ -0,0 +1,402 @@
+'''
+A matrix-product-state (MPS) simulation backend.
+
+An n-qubit state is stored as a chain of n tensors of shape
+(left bond, 2, right bond). States with little entanglement, such as the
+output of shallow circuits of mostly local gates, only need small bond
+dimensions, so that 50 to 100 qubits fit in the memory of a laptop.
+
+Two-qubit gates are applied by contracting the two tensors they act on
+and splitting them again with a singular value decomposition (SVD), in
+which the smallest singular values are discarded. The number of singular
+values kept is limited by a maximum bond dimension and by an error budget
+on the discarded weight. Gates on qubits that are not neighbours in the
+chain are applied by swapping the qubits next to each other first.
+
+Qubits are labelled from 0, with qubit 0 the most significant one, as in
+'UnitaryGate.apply_to_qubits'.
+'''
+
+import sys
+import numpy as np
+
+from .unitary_gate import UnitaryGate
+from .precision import resolve_precision
+from .rng import as_generator
+from . import gate_list
+
+# SWAP gate as a (2, 2, 2, 2) tensor
+_SWAP = np.array(gate_list.SWAP_mat, dtype = complex).reshape(2, 2, 2, 2)
+
+# Single-qubit operators of Pauli strings
+_PAULI_LETTERS = {"X": gate_list.X_mat, "Y": gate_list.Y_mat,
+                  "Z": gate_list.Z_mat, "I": None}
+
+
+class MPSState:
+    """
+    A class representing an n-qubit state as a matrix product state.
+
+    The MPS is kept in mixed canonical form: tensors left of the
+    orthogonality center are left-orthonormal, tensors right of it are
+    right-orthonormal. Truncating singular values at the center is then
+    optimal, and the norm of the state is the norm of the center tensor.
+
+    Attributes:
+        _tensors (list[numpy.ndarray]): The n tensors of the chain.
+        _center (int): Position of the orthogonality center.
+        _max_bond (int): Maximum bond dimension kept after an SVD.
+        _max_error (float): Maximum weight of the singular values
+        discarded in a single SVD.
+        _error (float): Total weight discarded so far.
+        _dtype (numpy.dtype): Precision of the tensors.
+    """
+
+    def __init__(self, n_qubits: int, max_bond: int = 64, max_error: float = 1.e-10,
+                 dtype = None):
+        """
+        Initialises the state |0...0> on n qubits.
+
+        Args:
+            n_qubits (int): Number of qubits.
+            max_bond (int): Maximum bond dimension.
+            max_error (float): Error budget of each truncation, as the sum
+            of the squares of the discarded singular values.
+            dtype (str or numpy.dtype): Precision of the tensors, 'complex64'
+            or 'complex128'. Implicitly, the default precision (see
+            'precision.set_precision'), or complex128 if there is none.
+
+        Raises:
+            ValueError: If an argument is not valid.
+        """
+        if type(n_qubits) is not int or n_qubits < 1:
+            raise ValueError("The number of qubits must be a positive integer.")
+
+        if type(max_bond) is not int or max_bond < 1:
+            raise ValueError("The maximum bond dimension must be a positive integer.")
+
+        if not max_error >= 0:
+            raise ValueError("The error budget must be non-negative.")
+
+        self._dtype = resolve_precision(dtype) or np.dtype(complex)
+        zero = np.zeros((1, 2, 1), dtype = self._dtype)
+        zero[0, 0, 0] = 1
+
+        self._tensors = [zero.copy() for _ in range(n_qubits)]
+        self._center = 0
+        self._max_bond = max_bond
+        self._max_error = max_error
+        self._error = 0.0
+
+    def n_qubits(self) -> int:
+        """
+        Returns:
+            int: Number of qubits of the state.
+        """
+        return len(self._tensors)
+
+    def bond_dimensions(self) -> list:
+        """
+        Returns:
+            list: The n-1 bond dimensions between neighbouring qubits.
+        """
+        return [tensor.shape[2] for tensor in self._tensors[:-1]]
+
+    def truncation_error(self) -> float:
+        """
+        Returns:
+            float: Total weight of the singular values discarded so far,
+            an estimate of the infidelity caused by the truncations.
+        """
+        return self._error
+
+    def copy(self) -> 'MPSState':
+        """
+        Creates and returns a copy of the state.
+
+        Returns:
+            MPSState: Copy of the state.
+        """
+        copied = MPSState.__new__(MPSState)
+        copied._tensors = [tensor.copy() for tensor in self._tensors]
+        copied._center = self._center
+        copied._max_bond = self._max_bond
+        copied._max_error = self._max_error
+        copied._error = self._error
+        copied._dtype = self._dtype
+        return copied
+
+    def apply_gate(self, gate: UnitaryGate, qubits: tuple = (0, 1)):
+        """
+        Applies a two-qubit gate to the state, in place.
+
+        Args:
+            gate (UnitaryGate): The gate.
+            qubits (tuple): The two distinct qubits the gate acts on.
+
+        Raises:
+            TypeError: If gate is not a UnitaryGate.
+            ValueError: If the qubits are not valid.
+        """
+        if type(gate) is not UnitaryGate:
+            raise TypeError("Input must be a UnitaryGate")
+
+        self._apply_matrix(gate._matrix, qubits)
+
+    def _apply_matrix(self, matrix: np.ndarray, qubits: tuple):
+        """
+        Applies a 4x4 matrix to two qubits of the state, in place,
+        swapping the qubits next to each other if needed.
+
+        Args:
+            matrix (numpy.ndarray): The 4x4 matrix.
+            qubits (tuple): The two distinct qubits it acts on.
+
+        Raises:
+            ValueError: If the qubits are not valid.
+        """
+        q1, q2 = qubits
+        n = self.n_qubits()
+        if q1 == q2 or not (0 <= q1 < n and 0 <= q2 < n):
+            raise ValueError("The gate must act on two distinct qubits of the state.")
+
+        gate = np.asarray(matrix, dtype = self._dtype).reshape(2, 2, 2, 2)
+        swap = _SWAP.astype(self._dtype, copy = False)
+        if q1 > q2:
+            # Exchange the roles of the two factors of the gate
+            gate = gate.transpose(1, 0, 3, 2)
+            q1, q2 = q2, q1
+
+        # Move qubit q2 next to q1, apply the gate, and move it back
+        for site in range(q2 - 1, q1, -1):
+            self.__apply_two_site(site, swap)
+
+        self.__apply_two_site(q1, gate)
+
+        for site in range(q1 + 1, q2):
+            self.__apply_two_site(site, swap)
+
+    def __move_center(self, site: int):
+        """
+        Private method moving the orthogonality center to a site,
+        with QR decompositions of the tensors on the way.
+
+        Args:
+            site (int): New position of the center.
+        """
+        while self._center < site:
+            c = self._center
+            left, phys, right = self._tensors[c].shape
+            q, r = np.linalg.qr(self._tensors[c].reshape(left * phys, right))
+            self._tensors[c] = q.reshape(left, phys, -1)
+            self._tensors[c + 1] = np.tensordot(r, self._tensors[c + 1], axes = 1)
+            self._center += 1
+
+        while self._center > site:
+            c = self._center
+            left, phys, right = self._tensors[c].shape
+            q, r = np.linalg.qr(self._tensors[c].reshape(left, phys * right).T)
+            self._tensors[c] = q.T.reshape(-1, phys, right)
+            self._tensors[c - 1] = np.tensordot(self._tensors[c - 1], r.T, axes = 1)
+            self._center -= 1
+
+    def __apply_two_site(self, site: int, gate: np.ndarray):
+        """
+        Private method applying a (2, 2, 2, 2) gate tensor to the
+        neighbouring sites 'site' and 'site + 1', then splitting them
+        with a truncated SVD.
+
+        Args:
+            site (int): First of the two sites.
+            gate (numpy.ndarray): Gate tensor, indexed (out1, out2, in1, in2).
+        """
+        if not site <= self._center <= site + 1:
+            self.__move_center(site)
+
+        first, second = self._tensors[site], self._tensors[site + 1]
+        theta = np.einsum('lam,mbr->labr', first, second)
+        theta = np.einsum('ABab,labr->lABr', gate, theta)
+
+        left, right = first.shape[0], second.shape[2]
+        u, s, vh = np.linalg.svd(theta.reshape(left * 2, 2 * right),
+                                 full_matrices = False)
+
+        # Weight discarded when keeping only the first k singular values
+        weights = s ** 2
+        tail = np.append(np.cumsum(weights[::-1])[::-1], 0.0)
+        keep = int(np.argmax(tail <= self._max_error))
+        keep = max(1, min(keep, self._max_bond))
+
+        self._error += float(tail[keep])
+        kept = s[:keep]
+        if weights[:keep].sum() > 0:
+            # Rescale to keep the norm; a null result (e.g. a projector
+            # with no overlap) stays null
+            kept = kept * np.sqrt(weights.sum() / weights[:keep].sum())
+
+        self._tensors[site] = u[:, :keep].reshape(left, 2, keep)
+        self._tensors[site + 1] = (kept[:, None] * vh[:keep]).reshape(keep, 2, right)
+        self._center = site + 1
+
+    def sample(self, shots: int = 1, rng = None) -> np.ndarray:
+        """
+        Samples measurements of all qubits in the computational basis,
+        without collapsing the state. The qubits are sampled one after the
+        other, conditioned on the outcomes of the previous ones, for all
+        shots at once.
+
+        Args:
+            shots (int): Number of samples.
+            rng (None, int, SeedSequence or Generator): Random number
+            generator, see drmd.rng. Implicitly, a new unseeded one.
+
+        Returns:
+            numpy.ndarray: (shots, n) array of measured bits, qubit 0 first.
+        """
+        if type(shots) is not int or shots < 0:
+            raise ValueError("The number of shots must be a non-negative integer.")
+
+        rng = as_generator(rng)
+
+        # With the center on the first site, the rest of the chain
+        # contributes the identity to the marginal probabilities.
+        self.__move_center(0)
+        norm = np.linalg.norm(self._tensors[0])
+
+        samples = np.zeros((shots, self.n_qubits()), dtype = np.uint8)
+        env = np.full((shots, 1), 1 / norm, dtype = complex)
+        rows = np.arange(shots)
+
+        for site, tensor in enumerate(self._tensors):
+            branches = np.einsum('sl,lbr->sbr', env, tensor)
+            probs = np.sum(np.abs(branches) ** 2, axis = 2)
+            probs /= probs.sum(axis = 1, keepdims = True)
+
+            bits = (rng.random(shots) >= probs[:, 0]).astype(np.uint8)
+            samples[:, site] = bits
+            env = branches[rows, bits] / np.sqrt(probs[rows, bits])[:, None]
+
+        return samples
+
+    def expectation(self, observable, qubits = None) -> complex:
+        """
+        Computes the expectation value <psi|O|psi> of an observable.
+
+        Args:
+            observable (str or numpy.ndarray or UnitaryGate): A Pauli string
+            of n letters from 'IXYZ' (qubit 0 first), a 2x2 matrix acting
+            on one qubit, or a 4x4 matrix or UnitaryGate acting on two
+            qubits.
+            qubits (int or tuple): The qubit a 2x2 matrix acts on, or the
+            pair of qubits a 4x4 matrix acts on. Not needed for Pauli strings.
+
+        Returns:
+            complex: The expectation value (real for Hermitian observables).
+
+        Raises:
+            ValueError: If the observable or qubits are not valid.
+        """
+        n = self.n_qubits()
+
+        if type(observable) is str:
+            if len(observable) != n or not set(observable) <= set(_PAULI_LETTERS):
+                raise ValueError(f"Pauli strings must have {n} letters from 'IXYZ'.")
+            return self.__product_expectation([_PAULI_LETTERS[c] for c in observable])
+
+        if type(observable) is UnitaryGate:
+            observable = observable._matrix
+        observable = np.asarray(observable)
+
+        if observable.shape == (2, 2):
+            if type(qubits) is not int or not 0 <= qubits < n:
+                raise ValueError("A 2x2 observable needs the qubit it acts on.")
+            ops = [None] * n
+            ops[qubits] = observable
+            return self.__product_expectation(ops)
+
+        if observable.shape == (4, 4):
+            if qubits is None:
+                raise ValueError("A 4x4 observable needs the qubits it acts on.")
+            # Apply the observable exactly on a copy, then take the overlap
+            acted = self.copy()
+            acted._max_bond = sys.maxsize
+            acted._max_error = 0.0
+            acted._apply_matrix(observable, qubits)
+            return self.overlap(acted) / self.overlap(self)
+
+        raise ValueError("The observable must be a Pauli string, " +
+                         "a 2x2 matrix or a 4x4 matrix.")
+
+    def __product_expectation(self, ops: list) -> complex:
+        """
+        Private method computing the expectation value of a tensor product
+        of single-qubit operators, by contracting transfer matrices along
+        the chain.
+
+        Args:
+            ops (list): One 2x2 matrix per qubit, or None for the identity.
+
+        Returns:
+            complex: The expectation value.
+        """
+        value = np.ones((1, 1), dtype = complex)
+        norm = np.ones((1, 1), dtype = complex)
+
+        for tensor, op in zip(self._tensors, ops):
+            acted = tensor if op is None else np.einsum('st,ltr->lsr', op, tensor)
+            value = np.einsum('ab,asc,bsd->cd', value, tensor.conj(), acted)
+            norm = np.einsum('ab,asc,bsd->cd', norm, tensor.conj(), tensor)
+
+        return complex(value[0, 0] / norm[0, 0])
+
+    def overlap(self, other: 'MPSState') -> complex:
+        """
+        Computes the inner product <self|other> of two states.
+
+        Args:
+            other (MPSState): A state on the same number of qubits.
+
+        Returns:
+            complex: The inner product.
+
+        Raises:
+            TypeError: If other is not an MPSState.
+            ValueError: If the numbers of qubits differ.
+        """
+        if type(other) is not MPSState:
+            raise TypeError("Input must be an MPSState")
+
+        if other.n_qubits() != self.n_qubits():
+            raise ValueError("The states must have the same number of qubits.")
+
+        env = np.ones((1, 1), dtype = complex)
+        for mine, theirs in zip(self._tensors, other._tensors):
+            env = np.einsum('ab,asc,bsd->cd', env, mine.conj(), theirs)
+
+        return complex(env[0, 0])
+
+    def to_statevector(self) -> np.ndarray:
+        """
+        Returns the state as a dense vector of 2**n amplitudes.
+        Only meant for small numbers of qubits.
+
+        Returns:
+            numpy.ndarray: The state vector.
+        """
+        state = np.ones((1, 1), dtype = complex)
+        for tensor in self._tensors:
+            state = np.tensordot(state, tensor, axes = 1)
+            state = state.reshape(-1, tensor.shape[2])
+
+        state = state.reshape(-1)
+        return state / np.linalg.norm(state)
+
+    def __repr__(self):
+        """
+        Overrides the default 'print()' behaviour in python.
+
+        Returns:
+            str: Number of qubits and bond dimensions of the state.
+        """
+        return (f"MPSState({self.n_qubits()} qubits, " +
+                f"bond dimensions {self.bond_dimensions()})")
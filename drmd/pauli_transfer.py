@@ -0,0 +1,491 @@
+'''
+Pauli transfer matrices of two-qubit channels, for the composition of
+noisy and unitary operations.
+
+A two-qubit density matrix rho is described by its Pauli vector, the 16
+real numbers r_i = Tr(P_i rho), P_i being the two-qubit Paulis of
+'structure.PAULIS' (r_0 = Tr(rho) = 1). Any channel E, unitary or given
+by Kraus operators, acts on Pauli vectors as a real 16x16 matrix, its
+Pauli transfer matrix (PTM):
+
+    R_ij = Tr(P_i E(P_j)) / 4
+
+Applying a channel is then a real matrix-vector product, and composing
+channels a real matrix product, so a deep noisy circuit reduces to one
+16x16 matrix:
+
+    noise = PauliTransferMatrix.depolarizing(0.01)
+    channel = PauliTransferMatrix.from_circuit(circuit, noise = noise)
+    out = channel.apply(pauli_vector(states))       # (N, 16)
+    f = process_fidelity(channel, circuit.unitary())
+
+The PTMs of gates are cached, keyed by their matrix, so circuits of
+standard gates only compute each of them once. The module functions
+work on stacks of PTMs and of Pauli vectors, with no Python loop over
+the batch.
+'''
+
+import numpy as np
+
+from .unitary_gate import UnitaryGate
+from .circuit import Circuit
+from .structure import PAULIS, matrix_key
+from .validation import should_validate
+
+# PTMs of the gates seen so far, by matrix and pair of qubits
+_GATE_PTMS = {}
+
+# Largest size of the PTM cache
+_MAX_GATE_PTMS = 4096
+
+
+def unitary_ptm(matrices) -> np.ndarray:
+    """
+    Computes the Pauli transfer matrices of unitaries.
+
+    Args:
+        matrices (numpy.ndarray): A 4x4 unitary, or an (N, 4, 4) array of N
+        unitaries.
+
+    Returns:
+        numpy.ndarray: The 16x16 PTM, or the (N, 16, 16) PTMs.
+    """
+    matrices = np.asarray(matrices)
+    single = matrices.ndim == 2
+    matrices = matrices.reshape(-1, 4, 4)
+
+    # Images U P_j U^dagger of the Paulis, decomposed in the Pauli basis
+    images = matrices[:, None] @ PAULIS[None] @ matrices.conj().transpose(0, 2, 1)[:, None]
+    ptms = np.einsum('iab,njba->nij', PAULIS, images).real / 4
+
+    return ptms[0] if single else ptms
+
+
+def kraus_ptm(kraus) -> np.ndarray:
+    """
+    Computes the Pauli transfer matrix of the channel
+    rho -> sum_k K_k rho K_k^dagger.
+
+    Args:
+        kraus (list or numpy.ndarray): The Kraus operators, as a (K, 4, 4)
+        array.
+
+    Returns:
+        numpy.ndarray: The 16x16 PTM.
+
+    Raises:
+        ValueError: If the operators are not 4x4, or do not preserve the
+        trace (sum_k K_k^dagger K_k = I).
+    """
+    kraus = np.asarray(kraus)
+    if kraus.ndim == 2:
+        kraus = kraus[None]
+
+    if kraus.ndim != 3 or kraus.shape[1:] != (4, 4) or len(kraus) == 0:
+        raise ValueError("Kraus operators must be a (K, 4, 4) array.")
+
+    if should_validate():
+        if not np.allclose(np.einsum('kba,kbc->ac', kraus.conj(), kraus), np.eye(4)):
+            raise ValueError("Kraus operators must preserve the trace.")
+
+    images = np.einsum('kab,jbc,kdc->jad', kraus, PAULIS, kraus.conj())
+    return np.einsum('iab,jba->ij', PAULIS, images).real / 4
+
+
+def compose(ptms) -> np.ndarray:
+    """
+    Composes sequences of channels, the first of each sequence applied
+    first. Matrices are multiplied pairwise in a balanced tree, so L
+    channels need log2(L) batched products.
+
+    Args:
+        ptms (numpy.ndarray): (..., L, 16, 16) array of the PTMs of one or
+        more sequences of L channels.
+
+    Returns:
+        numpy.ndarray: (..., 16, 16) array of the PTM of each sequence.
+
+    Raises:
+        ValueError: If the array is not of correct shape.
+    """
+    ptms = np.asarray(ptms)
+    if ptms.ndim < 3 or ptms.shape[-2:] != (16, 16) or ptms.shape[-3] == 0:
+        raise ValueError("PTMs must be a (..., L, 16, 16) array with L > 0.")
+
+    while ptms.shape[-3] > 1:
+        if ptms.shape[-3] % 2:
+            # The last channel waits for the next level
+            last = ptms[..., -1:, :, :]
+            ptms = np.concatenate([ptms[..., 1:-1:2, :, :] @ ptms[..., 0:-1:2, :, :], last],
+                                  axis = -3)
+        else:
+            ptms = ptms[..., 1::2, :, :] @ ptms[..., 0::2, :, :]
+
+    return ptms[..., 0, :, :]
+
+
+def pauli_vector(states) -> np.ndarray:
+    """
+    Computes the Pauli vectors r_i = Tr(P_i rho) of states.
+
+    Args:
+        states (numpy.ndarray): A 4x1 state vector, an (N, 4) array of N
+        state vectors, or an (N, 4, 4) array of N density matrices.
+
+    Returns:
+        numpy.ndarray: The (16,) Pauli vector, or the (N, 16) Pauli vectors.
+
+    Raises:
+        ValueError: If the states are not of correct shape.
+    """
+    states = np.asarray(states)
+
+    if states.ndim == 3 and states.shape[1:] == (4, 4):
+        return np.einsum('iab,nba->ni', PAULIS, states).real
+
+    if states.ndim not in (1, 2) or states.shape[-1] != 4:
+        raise ValueError("States must be a 4x1 array, an (N, 4) array of " +
+                         "state vectors or an (N, 4, 4) array of density matrices.")
+
+    return np.einsum('...a,iab,...b->...i', states.conj(), PAULIS, states).real
+
+
+def density_matrix(vectors) -> np.ndarray:
+    """
+    Converts Pauli vectors back to density matrices,
+    rho = sum_i r_i P_i / 4.
+
+    Args:
+        vectors (numpy.ndarray): A (16,) Pauli vector, or an (N, 16) array.
+
+    Returns:
+        numpy.ndarray: The 4x4 density matrix, or the (N, 4, 4) matrices.
+    """
+    return np.einsum('...i,iab->...ab', np.asarray(vectors), PAULIS) / 4
+
+
+def process_fidelity(a, b):
+    """
+    Computes the process fidelity Tr(R_a^T R_b) / 16 of channels, one of
+    which must be unitary (the fidelity of general channels needs their
+    Choi matrices). Arguments broadcast against each other.
+
+    Args:
+        a (PauliTransferMatrix or numpy.ndarray): A channel, a 4x4 unitary,
+        or a (..., 16, 16) array of PTMs.
+        b (PauliTransferMatrix or numpy.ndarray): Same.
+
+    Returns:
+        float or numpy.ndarray: The process fidelity, of broadcast shape.
+    """
+    a, b = _as_ptms(a), _as_ptms(b)
+    fidelity = np.einsum('...ij,...ij->...', a, b) / 16
+    return float(fidelity) if np.ndim(fidelity) == 0 else fidelity
+
+
+def average_gate_fidelity(a, b):
+    """
+    Computes the average gate fidelity (4 F + 1) / 5 of channels, F being
+    their process fidelity, one of the channels being unitary.
+
+    Args:
+        a (PauliTransferMatrix or numpy.ndarray): See 'process_fidelity'.
+        b (PauliTransferMatrix or numpy.ndarray): Same.
+
+    Returns:
+        float or numpy.ndarray: The average gate fidelity.
+    """
+    return (4 * process_fidelity(a, b) + 1) / 5
+
+
+def _as_ptms(operation) -> np.ndarray:
+    """
+    Converts channels given by the user to PTMs.
+
+    Raises:
+        ValueError: If arrays are neither 4x4 unitaries nor 16x16 PTMs.
+    """
+    if type(operation) is PauliTransferMatrix:
+        return operation._matrix
+    if type(operation) is UnitaryGate:
+        return _gate_ptm(operation, (0, 1))
+
+    operation = np.asarray(operation)
+    if operation.shape[-2:] == (4, 4):
+        return unitary_ptm(operation)
+    if operation.shape[-2:] == (16, 16):
+        return operation
+    raise ValueError("Channels must be 4x4 unitaries or 16x16 Pauli transfer matrices.")
+
+
+def _gate_ptm(unitary: UnitaryGate, qubits: tuple) -> np.ndarray:
+    """
+    Returns the cached PTM of a gate applied to a pair of qubits of a
+    two-qubit register.
+
+    Args:
+        unitary (UnitaryGate): The gate.
+        qubits (tuple): (0, 1), or (1, 0) for the gate with its qubits swapped.
+
+    Returns:
+        numpy.ndarray: The 16x16 PTM. It must not be modified.
+    """
+    key = (matrix_key(unitary._matrix), tuple(qubits))
+    if key not in _GATE_PTMS:
+        matrix = unitary.apply_to_qubits(np.eye(4, dtype = complex), qubits).T
+        if len(_GATE_PTMS) >= _MAX_GATE_PTMS:
+            _GATE_PTMS.clear()
+        _GATE_PTMS[key] = unitary_ptm(matrix)
+        _GATE_PTMS[key].flags.writeable = False
+    return _GATE_PTMS[key]
+
+
+class PauliTransferMatrix:
+    """
+    A two-qubit channel, as its 16x16 Pauli transfer matrix.
+
+    Attributes:
+        _matrix (numpy.ndarray): The real 16x16 PTM.
+    """
+
+    def __init__(self, operation):
+        """
+        Builds the PTM of a channel.
+
+        Args:
+            operation (UnitaryGate, Circuit, PauliTransferMatrix, list or
+            numpy.ndarray): A gate, a circuit on 2 qubits, a channel, a 4x4
+            unitary, a (K, 4, 4) array of Kraus operators, or a real 16x16 PTM.
+
+        Raises:
+            TypeError: If the operation is not of valid type.
+            ValueError: If the circuit is not on 2 qubits, or the array is
+            not of valid shape or does not describe a channel.
+        """
+        if type(operation) is PauliTransferMatrix:
+            self._matrix = operation._matrix.copy()
+        elif type(operation) is UnitaryGate:
+            self._matrix = _gate_ptm(operation, (0, 1)).copy()
+        elif type(operation) is Circuit:
+            self._matrix = PauliTransferMatrix.from_circuit(operation)._matrix
+        elif isinstance(operation, (list, tuple, np.ndarray)):
+            matrix = np.asarray(operation)
+            if not np.issubdtype(matrix.dtype, np.number):
+                raise TypeError("All elements of the operation must be numbers.")
+
+            if matrix.shape == (16, 16):
+                if should_validate():
+                    if not np.allclose(matrix.imag, 0):
+                        raise ValueError("Pauli transfer matrices must be real.")
+                    if not np.allclose(matrix[0], np.eye(16)[0]):
+                        raise ValueError("The first row of a Pauli transfer matrix " +
+                                         "must be (1, 0, ..., 0).")
+                self._matrix = np.array(matrix.real, dtype = float)
+            elif matrix.shape == (4, 4):
+                self._matrix = unitary_ptm(UnitaryGate(matrix)._matrix)
+            else:
+                self._matrix = kraus_ptm(matrix)
+        else:
+            raise TypeError("Operation must be a UnitaryGate, Circuit, " +
+                            "PauliTransferMatrix, list or numpy.ndarray.")
+
+    @classmethod
+    def _from_array(cls, matrix: np.ndarray) -> 'PauliTransferMatrix':
+        """
+        Trusted constructor from a 16x16 PTM, without any check.
+        """
+        channel = cls.__new__(cls)
+        channel._matrix = matrix
+        return channel
+
+    @classmethod
+    def from_circuit(cls, circuit: Circuit, noise = None) -> 'PauliTransferMatrix':
+        """
+        Builds the channel of a two-qubit circuit, with an optional noise
+        channel applied after each gate.
+
+        Args:
+            circuit (Circuit): A circuit on 2 qubits.
+            noise (PauliTransferMatrix): Channel applied after every gate.
+
+        Returns:
+            PauliTransferMatrix: The channel of the circuit.
+
+        Raises:
+            TypeError: If circuit is not a Circuit, or noise is not a
+            PauliTransferMatrix.
+            ValueError: If the circuit is not on 2 qubits.
+        """
+        if type(circuit) is not Circuit:
+            raise TypeError("Input must be a Circuit")
+
+        if circuit.n_qubits() != 2:
+            raise ValueError("Pauli transfer matrices describe circuits on 2 qubits.")
+
+        if noise is not None and type(noise) is not PauliTransferMatrix:
+            raise TypeError("Noise must be a PauliTransferMatrix.")
+
+        ptms = [_gate_ptm(unitary, qubits)
+                for unitary, qubits in zip(circuit._gates, circuit._qubits)]
+        if noise is not None:
+            ptms = [matrix for ptm in ptms for matrix in (ptm, noise._matrix)]
+
+        if not ptms:
+            return cls._from_array(np.eye(16))
+        return cls._from_array(compose(np.array(ptms)))
+
+    @classmethod
+    def depolarizing(cls, p: float) -> 'PauliTransferMatrix':
+        """
+        Two-qubit depolarizing channel, rho -> (1 - p) rho + p I / 4.
+
+        Args:
+            p (float): Probability of depolarizing, between 0 and 16/15.
+
+        Returns:
+            PauliTransferMatrix: The channel.
+
+        Raises:
+            ValueError: If p is out of range.
+        """
+        if not 0 <= p <= 16 / 15:
+            raise ValueError("The depolarizing probability must be between 0 and 16/15.")
+
+        return cls._from_array(np.diag([1.] + [1 - p] * 15))
+
+    @classmethod
+    def dephasing(cls, p: float, qubit: int) -> 'PauliTransferMatrix':
+        """
+        Dephasing of one qubit, which applies Z with probability p.
+
+        Args:
+            p (float): Probability of the phase flip, between 0 and 1.
+            qubit (int): The qubit, 1 or 2.
+
+        Returns:
+            PauliTransferMatrix: The channel.
+
+        Raises:
+            ValueError: If p or qubit is out of range.
+        """
+        if not 0 <= p <= 1:
+            raise ValueError("The dephasing probability must be between 0 and 1.")
+
+        z = np.array([[1, 0], [0, -1]])
+        return cls._from_array(kraus_ptm(_on_qubit([np.sqrt(1 - p) * np.eye(2),
+                                                     np.sqrt(p) * z], qubit)))
+
+    @classmethod
+    def amplitude_damping(cls, gamma: float, qubit: int) -> 'PauliTransferMatrix':
+        """
+        Amplitude damping of one qubit, which decays from |1> to |0> with
+        probability gamma.
+
+        Args:
+            gamma (float): Probability of decay, between 0 and 1.
+            qubit (int): The qubit, 1 or 2.
+
+        Returns:
+            PauliTransferMatrix: The channel.
+
+        Raises:
+            ValueError: If gamma or qubit is out of range.
+        """
+        if not 0 <= gamma <= 1:
+            raise ValueError("The damping probability must be between 0 and 1.")
+
+        kraus = [np.array([[1, 0], [0, np.sqrt(1 - gamma)]]),
+                 np.array([[0, np.sqrt(gamma)], [0, 0]])]
+        return cls._from_array(kraus_ptm(_on_qubit(kraus, qubit)))
+
+    def matrix(self) -> np.ndarray:
+        """
+        Returns:
+            numpy.ndarray: Copy of the 16x16 PTM.
+        """
+        return self._matrix.copy()
+
+    def __matmul__(self, other: 'PauliTransferMatrix') -> 'PauliTransferMatrix':
+        """
+        Composes two channels, as matrices: (a @ b) applies b, then a.
+
+        Args:
+            other (PauliTransferMatrix): The channel applied first.
+
+        Returns:
+            PauliTransferMatrix: The composed channel.
+        """
+        if type(other) is not PauliTransferMatrix:
+            return NotImplemented
+        return PauliTransferMatrix._from_array(self._matrix @ other._matrix)
+
+    def then(self, *others) -> 'PauliTransferMatrix':
+        """
+        Composes this channel with the channels applied after it.
+
+        Args:
+            *others (PauliTransferMatrix): The channels, in order of application.
+
+        Returns:
+            PauliTransferMatrix: The composed channel.
+        """
+        for other in others:
+            if type(other) is not PauliTransferMatrix:
+                raise TypeError("Channels must be PauliTransferMatrix objects.")
+        return PauliTransferMatrix._from_array(
+            compose(np.array([self._matrix] + [other._matrix for other in others])))
+
+    def apply(self, vectors) -> np.ndarray:
+        """
+        Applies the channel to Pauli vectors.
+
+        Args:
+            vectors (numpy.ndarray): A (16,) Pauli vector, or an (N, 16)
+            array of N Pauli vectors (see 'pauli_vector').
+
+        Returns:
+            numpy.ndarray: The output Pauli vectors, of same shape.
+
+        Raises:
+            ValueError: If the vectors are not of correct size.
+        """
+        vectors = np.asarray(vectors)
+        if vectors.ndim not in (1, 2) or vectors.shape[-1] != 16:
+            raise ValueError("Pauli vectors must be a (16,) or an (N, 16) array.")
+        return vectors @ self._matrix.T
+
+    def is_unital(self, atol: float = 1.e-8) -> bool:
+        """
+        Returns:
+            bool: True if the channel maps the identity to itself.
+        """
+        return bool(np.allclose(self._matrix[:, 0], np.eye(16)[0], atol = atol))
+
+    def is_unitary(self, atol: float = 1.e-8) -> bool:
+        """
+        Returns:
+            bool: True if the channel is unitary, i.e. its PTM is orthogonal.
+        """
+        return bool(np.allclose(self._matrix.T @ self._matrix, np.eye(16), atol = atol))
+
+
+def _on_qubit(kraus: list, qubit: int) -> np.ndarray:
+    """
+    Extends single-qubit Kraus operators to the two-qubit register.
+
+    Args:
+        kraus (list): The 2x2 Kraus operators.
+        qubit (int): The qubit they act on, 1 or 2.
+
+    Returns:
+        numpy.ndarray: (K, 4, 4) array of Kraus operators.
+
+    Raises:
+        ValueError: If the qubit is not 1 or 2.
+    """
+    if type(qubit) is not int or qubit not in (1, 2):
+        raise ValueError("The qubit must be 1 or 2.")
+
+    if qubit == 1:
+        return np.array([np.kron(k, np.eye(2)) for k in kraus])
+    return np.array([np.kron(np.eye(2), k) for k in kraus])
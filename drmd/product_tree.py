@@ -0,0 +1,207 @@
+'''
+A balanced tree of partial products of a sequence of matrices.
+
+The matrices of the gates of a circuit are stored in order in a treap
+(a randomised balanced binary search tree indexed by position). Every node
+also stores the product of all matrices in its subtree, so the product of
+the whole sequence is available at the root. Inserting, removing or
+replacing a matrix only updates the products along one root-to-leaf path,
+which costs O(log n) matrix multiplications on average, instead of the
+O(n) needed to multiply everything again.
+'''
+
+import random
+
+import numpy as np
+
+
+class _Node:
+    """
+    A node of the tree, holding one matrix of the sequence.
+
+    Attributes:
+        matrix (numpy.ndarray): The matrix at this position.
+        product (numpy.ndarray): Product of all matrices in the subtree,
+        in order of application (the last matrix is leftmost).
+        priority (float): Random heap priority, keeping the tree balanced.
+        size (int): Number of matrices in the subtree.
+        left (_Node): Subtree of the earlier matrices.
+        right (_Node): Subtree of the later matrices.
+    """
+
+    __slots__ = ("matrix", "product", "priority", "size", "left", "right")
+
+    def __init__(self, matrix: np.ndarray, priority: float):
+        self.matrix = matrix
+        self.product = matrix
+        self.priority = priority
+        self.size = 1
+        self.left = None
+        self.right = None
+
+
+def _size(node: _Node) -> int:
+    """
+    Returns:
+        int: Number of matrices in a subtree, 0 for an empty one.
+    """
+    return node.size if node is not None else 0
+
+
+def _update(node: _Node) -> _Node:
+    """
+    Recomputes the size and product of a node from its children.
+
+    Returns:
+        _Node: The updated node.
+    """
+    product = node.matrix
+    if node.left is not None:
+        product = product @ node.left.product
+    if node.right is not None:
+        product = node.right.product @ product
+
+    node.product = product
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return node
+
+
+def _split(node: _Node, count: int) -> tuple:
+    """
+    Splits a subtree into its first 'count' matrices and the rest.
+
+    Returns:
+        tuple: The two subtrees (either may be None).
+    """
+    if node is None:
+        return None, None
+
+    if _size(node.left) >= count:
+        first, node.left = _split(node.left, count)
+        return first, _update(node)
+
+    node.right, rest = _split(node.right, count - _size(node.left) - 1)
+    return _update(node), rest
+
+
+def _merge(first: _Node, second: _Node) -> _Node:
+    """
+    Joins two subtrees, the matrices of 'first' coming before those
+    of 'second'.
+
+    Returns:
+        _Node: The joined subtree.
+    """
+    if first is None:
+        return second
+    if second is None:
+        return first
+
+    if first.priority > second.priority:
+        first.right = _merge(first.right, second)
+        return _update(first)
+
+    second.left = _merge(first, second.left)
+    return _update(second)
+
+
+class ProductTree:
+    """
+    Class maintaining the product M[n-1] @ ... @ M[1] @ M[0] of a
+    sequence of square matrices under insertions, removals and
+    replacements.
+
+    Attributes:
+        _root (_Node): Root of the tree, None if the sequence is empty.
+        _dim (int): Dimension of the matrices.
+        _dtype (numpy.dtype): dtype of the identity of an empty sequence.
+        _random (random.Random): Generator of the node priorities.
+    """
+
+    def __init__(self, matrices: list, dim: int, dtype = complex):
+        """
+        Builds a balanced tree from a list of matrices, with O(n)
+        matrix multiplications.
+
+        Args:
+            matrices (list[numpy.ndarray]): The matrices, in order of
+            application.
+            dim (int): Dimension of the matrices.
+            dtype (numpy.dtype): dtype of the product of an empty sequence.
+        """
+        self._dim = dim
+        self._dtype = dtype
+        self._random = random.Random(0)
+
+        # Priorities handed out in pre-order keep the heap property
+        priorities = sorted((self._random.random() for _ in matrices), reverse = True)
+        priorities = iter(priorities)
+
+        def build(lo, hi):
+            if lo >= hi:
+                return None
+            mid = (lo + hi) // 2
+            node = _Node(matrices[mid], next(priorities))
+            node.left = build(lo, mid)
+            node.right = build(mid + 1, hi)
+            return _update(node)
+
+        self._root = build(0, len(matrices))
+
+    def __len__(self):
+        """
+        Returns:
+            int: Number of matrices in the sequence.
+        """
+        return _size(self._root)
+
+    def product(self) -> np.ndarray:
+        """
+        Returns the product of the whole sequence, in O(1).
+
+        Returns:
+            numpy.ndarray: The product (identity for an empty sequence).
+        """
+        if self._root is None:
+            return np.eye(self._dim, dtype = self._dtype)
+        return self._root.product
+
+    def insert(self, index: int, matrix: np.ndarray):
+        """
+        Inserts a matrix so that it becomes the one at position index.
+
+        Args:
+            index (int): Position, between 0 and the length of the sequence.
+            matrix (numpy.ndarray): The matrix.
+        """
+        first, rest = _split(self._root, index)
+        node = _Node(matrix, self._random.random())
+        self._root = _merge(_merge(first, node), rest)
+
+    def pop(self, index: int) -> np.ndarray:
+        """
+        Removes the matrix at position index.
+
+        Args:
+            index (int): Position, between 0 and the length minus 1.
+
+        Returns:
+            numpy.ndarray: The removed matrix.
+        """
+        first, rest = _split(self._root, index)
+        node, rest = _split(rest, 1)
+        self._root = _merge(first, rest)
+        return node.matrix
+
+    def replace(self, index: int, matrix: np.ndarray):
+        """
+        Replaces the matrix at position index.
+
+        Args:
+            index (int): Position, between 0 and the length minus 1.
+            matrix (numpy.ndarray): The new matrix.
+        """
+        first, rest = _split(self._root, index)
+        node, rest = _split(rest, 1)
+        node.matrix = matrix
+        self._root = _merge(_merge(first, _update(node)), rest)
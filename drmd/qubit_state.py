@@ -1,4 +1,9 @@
 import numpy as np
+
+from .precision import INFER, resolve_precision
+from .validation import should_validate
+from .rng import as_generator
+
 np.set_printoptions(legacy='1.21')  # For more intuitive float print messages
 
 
@@ -10,6 +15,10 @@ class QubitState:
     Once a user has initialised a qubitstate object, it can be applied
     to unitary operations or measurements.
 
+    Instances have no attribute dictionary (see '__slots__'), and the
+    initial and current states share one array when they are equal, so
+    that programs can keep millions of states alive at a small cost.
+
     Attributes:
         __qb_matrix (numpy.ndarray): the matrix representation of the
         current two-qubit state. Private variable to make it immutable
@@ -17,10 +26,14 @@ class QubitState:
         __qb_init (numpy.ndarray): the matrix representation of the
         original two-qubit state. Private variable to make it immutable
         outside of the class.
+        __precision (numpy.dtype): precision of the state (see the
+        'precision' module), or None if the dtype is inferred by NumPy.
     """
 
+    __slots__ = ("__qb_init", "__qb_matrix", "__precision")
+
     # Constructor for qubit state input matrices
-    def __init__(self, matrix1, matrix2 = None):  
+    def __init__(self, matrix1, matrix2 = None, dtype = None):  
         """
         Initialises the QubitState object, ensuring all requirements
         of a valid quantum state are met. Constructs the two-qubit 
@@ -31,12 +44,45 @@ class QubitState:
             only first qubit state.
             matrix2 (list): A 2x1 matrix representation for the
             second qubit state, if necessary.
+            dtype (str or numpy.dtype): Precision of the state, 'complex64'
+            or 'complex128', or 'infer' to keep the dtype of the input.
+            Implicitly, the default precision (see 'precision.set_precision').
         
         Raises:
             TypeError: Checks if 'matrix' parameters are a list, tuple or 
             numpy array.
             ValueError: Checks if 'matrix1' parameter is correct size.
             ValueError: Checks if 'matrix2' parameter is correct size.
+            ValueError: Checks if 'dtype' is a valid precision.
+        """
+        # The checks may be skipped, see the 'validation' module
+        checked = should_validate()
+        if checked:
+            matrix = self.__check_input(matrix1, matrix2)
+        elif matrix2 is None:
+            matrix = np.asarray(matrix1)
+        else:
+            matrix = np.kron(matrix1, matrix2)
+
+        self.__store(matrix, resolve_precision(dtype), checked)
+
+    def __check_input(self, matrix1, matrix2) -> np.ndarray:
+        """
+        Private method running the checks of the constructor on its input.
+
+        Args:
+            matrix1 (list): Matrix representation for the qubit state, or
+            only first qubit state.
+            matrix2 (list): A 2x1 matrix representation for the
+            second qubit state, or None.
+
+        Returns:
+            numpy.ndarray: The 4x1 qubit state.
+
+        Raises:
+            TypeError: If an input is not a list, tuple or numpy array
+            of numbers.
+            ValueError: If an input is not of correct size.
         """
         # Checks if there was a single two-qubit state input or two
         # single-qubit inputs
@@ -101,21 +147,63 @@ class QubitState:
             # Combine the two single-qubit states
             matrix = np.kron(matrix1, matrix2)
 
+        return matrix
+
+    def __store(self, matrix: np.ndarray, precision, check: bool):
+        """
+        Private method storing a checked or trusted qubit state, in the
+        given precision, and normalising it.
+
+        Args:
+            matrix (numpy.ndarray): The 4x1 qubit state.
+            precision (numpy.dtype): Precision of the state, or None.
+            check (bool): Whether to check that the state is not null.
+
+        Raises:
+            ValueError: If the state is null and check is True.
+        """
+        self.__precision = precision
+        if precision is not None:
+            matrix = matrix.astype(precision)
 
         self.__qb_init = matrix  # storing initial state in private variable
 
         # Check normalisation
-        total_sum = np.sum(np.conjugate(matrix)*matrix)
+        total_sum = np.vdot(matrix, matrix).real
 
         # Check for null state
-        if total_sum == 0:
+        if check and total_sum == 0:
             raise ValueError("The qubit state must have some non-zero entries.")
         
-        if not np.isclose(total_sum, 1.0, atol=1e-7):  # tolerance for floating-point errors
+        # tolerance for floating-point errors, as in np.isclose(total_sum, 1.0, atol=1e-7)
+        if abs(total_sum - 1.0) > 1e-7 + 1e-5 and total_sum != 0:
             matrix = matrix/np.sqrt(total_sum)  # renormalise
         
+        # Unless renormalised, the current state shares the initial state's
+        # array; neither is ever modified in place.
         self.__qb_matrix = matrix
 
+    @classmethod
+    def _from_array(cls, matrix: np.ndarray, dtype = INFER) -> 'QubitState':
+        """
+        Builds a state from a 4x1 array computed by DrMD itself, e.g. by
+        applying a gate to a valid state. The checks of the constructor
+        only run at the 'strict' validation level.
+
+        Args:
+            matrix (numpy.ndarray): The 4x1 qubit state.
+            dtype (str or numpy.dtype): Precision of the state.
+
+        Returns:
+            QubitState: The state.
+        """
+        if should_validate(internal = True):
+            return cls(matrix, dtype = dtype)
+
+        state = cls.__new__(cls)
+        state.__store(np.asarray(matrix), resolve_precision(dtype), False)
+        return state
+
     def get_initial(self):
         """
         Function to give the qubit state used to initialise this
@@ -127,6 +215,14 @@ class QubitState:
         """
         return np.copy(self.__qb_init)
     
+    def precision(self):
+        """
+        Returns:
+            numpy.dtype: Precision of the state, or None if its dtype
+            was inferred by NumPy.
+        """
+        return self.__precision
+
     def peek(self):
         """
         Function to show the current qubit state probabilities in the
@@ -146,43 +242,56 @@ class QubitState:
         Returns:
             QubitState: copy of current state object.
         """
-        temp_qs = QubitState(np.copy(self.__qb_matrix))
+        temp_qs = QubitState._from_array(np.copy(self.__qb_matrix), self.__precision or INFER)
         return temp_qs
     
-    def compare(self, other_state):
+    def compare(self, other_state, up_to_phase = False):
         """
         Function to compare two QubitState objects or to compare
         current QubitState object with a qubit array.
+        See the 'distance' module to compare batches of states.
 
         Args:
             other_state (QubitState or valid constructor arguments): Qubit
             state to compare against.
+            up_to_phase (bool): Whether states differing by a global
+            phase are considered equal.
         Returns:
             bool: Outcome of comparison.
+
+        Raises:
+            ValueError: If other_state is not a valid qubit state.
         """
         # Check if argument state is a QubitState object
         if isinstance(other_state, QubitState):
-            q_state_other = other_state
+            other = other_state.__qb_matrix
 
         else:
-            try:
-                # Attempt to create a QubitState object, suppressing any errors raised inside
-                q_state_other = None
-                try:
-                    q_state_other = QubitState(other_state)
-                except:
-                    pass  # Suppress any exception raised by the QubitState constructor
-
-                if q_state_other is None:
-                    # Raise an error if QubitState could not be constructed
-                    raise ValueError("Comparison state needs to be a valid numerical qubit" +
-                                    " input state as a QubitState, NumPy array, list or tuple.")
-            except ValueError as error:
-                # Reraise ValueError to ensure external handling aligns with expected behavior
-                raise error
-
-        # Perform the comparison if no exception was raised
-        return np.allclose(self.peek(), q_state_other.peek())
+            # Normalise the array as the constructor would, without
+            # building a QubitState
+            other = None
+            if isinstance(other_state, (tuple, list, np.ndarray)):
+                other = np.asarray(other_state)
+                if other.shape != (4,) or not np.issubdtype(other.dtype, np.number):
+                    other = None
+
+            if other is not None:
+                total_sum = np.vdot(other, other).real
+                if total_sum == 0:
+                    other = None
+                elif abs(total_sum - 1.0) > 1e-7 + 1e-5:
+                    other = other/np.sqrt(total_sum)
+
+            if other is None:
+                raise ValueError("Comparison state needs to be a valid numerical qubit" +
+                                " input state as a QubitState, NumPy array, list or tuple.")
+
+        if up_to_phase:
+            from .distance import equal_up_to_phase
+            return equal_up_to_phase(self.__qb_matrix, other)
+
+        # Same test as np.allclose, without its overhead on 4 entries
+        return bool(np.all(np.abs(self.__qb_matrix - other) <= 1e-8 + 1e-5 * np.abs(other)))
 
     def set_state(self, matrix1, matrix2 = None):
         """
@@ -199,8 +308,9 @@ class QubitState:
         Returns:
             numpy.ndarray: 4x1 array qubit state representation.
         """
-        # Call the constructor to internally set the new qubit state.
-        self.__init__(matrix1, matrix2)
+        # Call the constructor to internally set the new qubit state,
+        # keeping the precision of the state.
+        self.__init__(matrix1, matrix2, dtype = self.__precision or INFER)
 
         return self.peek()
 
@@ -218,7 +328,8 @@ class QubitState:
     def measure_stats(self, to_measure = 12):
         """
         A description of the statistics for a  measurement of the qubit
-        state in the computational basis.
+        state in the computational basis. See 'measure_arrays' for the
+        same statistics as arrays, in full precision.
 
         Args:
             to_measure (int): Which qubit to measure or whether to
@@ -231,6 +342,9 @@ class QubitState:
         # List to hold states and probabilities
         stats = []
 
+        # The post-measurement states keep the precision of the state
+        precision = self.__precision or INFER
+
         # Pre-compute the probabilties for each possible basis state.
         prob = np.round(np.conjugate(self.__qb_matrix)*self.__qb_matrix,4)
 
@@ -243,12 +357,12 @@ class QubitState:
 
                 # Only add non-zero states
                 if not prob_0 == 0:
-                    stats.append((QubitState(np.array([self.__qb_matrix[0],
-                                                        self.__qb_matrix[1], 0, 0])), prob_0))
+                    stats.append((QubitState._from_array(np.array([self.__qb_matrix[0],
+                                                        self.__qb_matrix[1], 0, 0]), precision), prob_0))
                 
                 if not prob_1 == 0:
-                    stats.append((QubitState(np.array([0, 0, self.__qb_matrix[2],
-                                                        self.__qb_matrix[3]])), prob_1))
+                    stats.append((QubitState._from_array(np.array([0, 0, self.__qb_matrix[2],
+                                                        self.__qb_matrix[3]]), precision), prob_1))
 
             # Measure state 2
             case 2:
@@ -257,28 +371,28 @@ class QubitState:
 
                 # Only add non-zero states
                 if not prob_0 == 0:
-                    stats.append((QubitState(np.array([self.__qb_matrix[0], 0,
-                                                        self.__qb_matrix[2], 0])), prob_0))
+                    stats.append((QubitState._from_array(np.array([self.__qb_matrix[0], 0,
+                                                        self.__qb_matrix[2], 0]), precision), prob_0))
                 
                 if not prob_1 == 0:
-                    stats.append((QubitState(np.array([0, self.__qb_matrix[1], 0,
-                                                        self.__qb_matrix[3]])), prob_1))
+                    stats.append((QubitState._from_array(np.array([0, self.__qb_matrix[1], 0,
+                                                        self.__qb_matrix[3]]), precision), prob_1))
                 
 
             # Measure both states
             case 12:
                 # Only add non-zero states
                 if not prob[0] == 0:
-                    stats.append((QubitState(np.array([1,0,0,0])), prob[0]))
+                    stats.append((QubitState._from_array(np.array([1,0,0,0]), precision), prob[0]))
                 
                 if not prob[1] == 0:
-                    stats.append((QubitState(np.array([0,1,0,0])), prob[1]))
+                    stats.append((QubitState._from_array(np.array([0,1,0,0]), precision), prob[1]))
                 
                 if not prob[2] == 0:
-                    stats.append((QubitState(np.array([0,0,1,0])), prob[2]))
+                    stats.append((QubitState._from_array(np.array([0,0,1,0]), precision), prob[2]))
                 
                 if not prob[3] == 0:
-                    stats.append((QubitState(np.array([0,0,0,1])), prob[3]))
+                    stats.append((QubitState._from_array(np.array([0,0,0,1]), precision), prob[3]))
 
             # Handle any other user input    
             case _:
@@ -288,7 +402,23 @@ class QubitState:
         
         return stats
     
-    def measure_collapse(self, to_measure = 12):
+    def measure_arrays(self, to_measure = 12):
+        """
+        The statistics of a measurement in the computational basis, as
+        arrays in full precision rather than QubitState objects. See the
+        module function 'measure_arrays' for batches of states.
+
+        Args:
+            to_measure (int): Which qubit to measure or whether to
+            measure the two-qubit state.
+
+        Returns:
+            tuple: The (k,) probabilities of the k outcomes, and the (k, 4)
+            array of the post-measurement states.
+        """
+        return measure_arrays(self.__qb_matrix, to_measure)
+
+    def measure_collapse(self, to_measure = 12, rng = None):
         """
         A measurement of the qubit state in the computational basis.
         Collapses the current qubit state to one of the z-basis states.
@@ -296,6 +426,8 @@ class QubitState:
         Args:
             to_measure (int): Which qubit to measure or whether to
             measure the two-qubit state.
+            rng (None, int, SeedSequence or Generator): Random number
+            generator, see drmd.rng. Implicitly, a new unseeded one.
         
         Returns:
             QubitState: The qubit state as a result of the measurement.
@@ -306,8 +438,299 @@ class QubitState:
         states, probs = zip(*stats)
 
         # Randomly choose measurement state based on z-basis probabilities
-        self.__qb_matrix = np.random.choice(states, p=probs).peek()
+        outcome = as_generator(rng).choice(len(states), p=probs)
+        self.__qb_matrix = states[outcome].peek()
 
         # Return a QubitState object
         return self.copy()
-    
\ No newline at end of file
+    
+    def reduced_density_matrix(self, qubit = 1):
+        """
+        The density matrix of one qubit, tracing out the other.
+        See the 'entanglement' module for batches of states.
+
+        Args:
+            qubit (int): The qubit kept, 1 or 2.
+
+        Returns:
+            numpy.ndarray: 2x2 density matrix of the qubit.
+        """
+        from .entanglement import reduced_density_matrix
+        return reduced_density_matrix(self, qubit)
+
+    def purity(self):
+        """
+        Returns:
+            float: Purity of the reduced state of either qubit, 1 for
+            product states and 1/2 for maximally entangled states.
+        """
+        from .entanglement import purity
+        return purity(self)
+
+    def entropy(self, base = 2):
+        """
+        The entanglement entropy of the state, the von Neumann entropy
+        of the reduced state of either qubit.
+
+        Args:
+            base (float): Base of the logarithm. Implicitly, 2.
+
+        Returns:
+            float: The entropy, 1 for maximally entangled states.
+        """
+        from .entanglement import entropy
+        return entropy(self, base)
+
+    def concurrence(self):
+        """
+        Returns:
+            float: Concurrence of the state, 0 for product states and 1
+            for maximally entangled states.
+        """
+        from .entanglement import concurrence
+        return concurrence(self)
+
+
+def _as_qubit_rows(matrix, name: str) -> np.ndarray:
+    """
+    Checks an (N, 2) array of single-qubit states.
+
+    Args:
+        matrix (list or numpy.ndarray): The states.
+        name (str): Name of the argument, for error messages.
+
+    Returns:
+        numpy.ndarray: The (N, 2) array.
+
+    Raises:
+        TypeError: If the states are not a list, tuple or array of numbers.
+        ValueError: If the states are not of shape (N, 2), or are null.
+    """
+    if not isinstance(matrix, (tuple, list, np.ndarray)):
+        raise TypeError(f"The {name} qubit states must be a tuple, list or NumPy array.")
+
+    matrix = np.asarray(matrix)
+    if not np.issubdtype(matrix.dtype, np.number):
+        raise TypeError(f"All elements of the {name} qubit states must be numbers.")
+
+    if matrix.ndim != 2 or matrix.shape[1] != 2:
+        raise ValueError(f"The {name} qubit states should be an (N, 2) array.")
+
+    if np.any(np.all(matrix == 0, axis = 1)):
+        raise ValueError(f"The {name} qubit states must have some non-zero entries.")
+
+    return matrix
+
+
+def product_states(matrix1, matrix2, dtype = None) -> np.ndarray:
+    """
+    Builds a batch of product states, the vectorised equivalent of
+    QubitState(matrix1[i], matrix2[i]) for every i.
+
+    Args:
+        matrix1 (list or numpy.ndarray): (N, 2) array of the first qubit states.
+        matrix2 (list or numpy.ndarray): (N, 2) array of the second qubit states.
+        dtype (str or numpy.dtype): Precision of the states, as in the
+        QubitState constructor.
+
+    Returns:
+        numpy.ndarray: (N, 4) array of the normalised product states.
+
+    Raises:
+        TypeError: If an input is not a list, tuple or array of numbers.
+        ValueError: If an input is not of shape (N, 2), or a state is null.
+    """
+    precision = resolve_precision(dtype)
+
+    if should_validate():
+        matrix1 = _as_qubit_rows(matrix1, "first")
+        matrix2 = _as_qubit_rows(matrix2, "second")
+        if len(matrix1) != len(matrix2):
+            raise ValueError("There must be as many first as second qubit states.")
+    else:
+        matrix1, matrix2 = np.asarray(matrix1), np.asarray(matrix2)
+
+    # Batched outer product, kron of each pair of rows
+    states = (matrix1[:, :, None] * matrix2[:, None, :]).reshape(-1, 4)
+    if precision is not None:
+        states = states.astype(precision)
+
+    norms = np.sqrt(np.einsum('ni,ni->n', states.conj(), states).real)
+    return states / norms[:, None]
+
+
+def basis_states(indices, n_qubits = 2, dtype = None) -> np.ndarray:
+    """
+    Builds a batch of computational basis states, qubit 0 being the most
+    significant bit of their index: index 1 of 2 qubits is |01>.
+
+    Args:
+        indices (int, list or numpy.ndarray): The N indices of the states.
+        n_qubits (int): Number of qubits n. Implicitly, 2.
+        dtype (str or numpy.dtype): Precision of the states. Implicitly,
+        the default precision, or complex if it is not set.
+
+    Returns:
+        numpy.ndarray: (N, 2**n) array of the basis states.
+
+    Raises:
+        TypeError: If the indices are not integers.
+        ValueError: If an index is not between 0 and 2**n - 1.
+    """
+    if type(n_qubits) is not int or n_qubits < 1:
+        raise ValueError("The number of qubits must be a positive integer.")
+
+    indices = np.asarray(indices).reshape(-1)
+    dim = 2 ** n_qubits
+
+    if should_validate():
+        if len(indices) and not np.issubdtype(indices.dtype, np.integer):
+            raise TypeError("The basis state indices must be integers.")
+        if np.any((indices < 0) | (indices >= dim)):
+            raise ValueError(f"The basis state indices must be between 0 and {dim - 1}.")
+
+    # An empty list gives a float array, which cannot index
+    indices = indices.astype(int, copy = False)
+
+    states = np.zeros((len(indices), dim), dtype = resolve_precision(dtype) or complex)
+    states[np.arange(len(indices)), indices] = 1
+    return states
+
+
+def bloch_states(theta, phi, dtype = None) -> np.ndarray:
+    """
+    Builds a batch of product states from the Bloch sphere angles of
+    their qubits, each qubit being cos(theta/2)|0> + e^{i phi} sin(theta/2)|1>.
+
+    Args:
+        theta (list or numpy.ndarray): (N, 2) array of the polar angles
+        of the first and second qubits.
+        phi (list or numpy.ndarray): (N, 2) array of their azimuthal angles.
+        dtype (str or numpy.dtype): Precision of the states. Implicitly,
+        the default precision, or complex if it is not set.
+
+    Returns:
+        numpy.ndarray: (N, 4) array of the product states.
+
+    Raises:
+        TypeError: If the angles are not real numbers.
+        ValueError: If the angles are not of shape (N, 2).
+    """
+    theta, phi = np.asarray(theta), np.asarray(phi)
+
+    if should_validate():
+        for angles in (theta, phi):
+            if not np.issubdtype(angles.dtype, np.integer) and \
+               not np.issubdtype(angles.dtype, np.floating):
+                raise TypeError("The Bloch sphere angles must be real numbers.")
+            if angles.ndim != 2 or angles.shape[1] != 2 or angles.shape != theta.shape:
+                raise ValueError("The Bloch sphere angles should be two (N, 2) arrays.")
+
+    # qubits[n, k] is the single-qubit state of qubit k+1 of state n
+    qubits = np.stack([np.cos(theta / 2), np.exp(1j * phi) * np.sin(theta / 2)], axis = 2)
+    states = (qubits[:, 0, :, None] * qubits[:, 1, None, :]).reshape(-1, 4)
+    return states.astype(resolve_precision(dtype) or complex, copy = False)
+
+
+def _measured_axes(to_measure, n_qubits: int) -> list:
+    """
+    Converts the qubits to measure to axes of a state tensor.
+
+    Args:
+        to_measure (int, tuple or list): 1, 2 or 12 (both) as in
+        'QubitState.measure_stats', or the qubits to measure, numbered
+        from 1 (most significant) to n.
+        n_qubits (int): Number of qubits n of the states.
+
+    Returns:
+        list[int]: Indices of the measured qubits, from 0 to n - 1.
+
+    Raises:
+        ValueError: If the qubits are not valid.
+    """
+    if to_measure == 12 and type(to_measure) is int and n_qubits == 2:
+        to_measure = (1, 2)
+    elif type(to_measure) is int:
+        to_measure = (to_measure,)
+
+    if not isinstance(to_measure, (tuple, list)) or not to_measure or \
+       any(type(q) is not int or not 1 <= q <= n_qubits for q in to_measure) or \
+       len(set(to_measure)) != len(to_measure):
+        raise ValueError("The qubits to be measured must be distinct integers " +
+                         f"between 1 and {n_qubits}, or 12 (both) for two qubits.")
+
+    return [q - 1 for q in to_measure]
+
+
+def measure_arrays(states, to_measure = 12) -> tuple:
+    """
+    The statistics of a measurement in the computational basis of some
+    qubits of a batch of states, as arrays: the vectorised, full precision
+    equivalent of 'QubitState.measure_stats', without any Python loop over
+    the states or QubitState objects.
+
+    Outcomes are numbered by the bits of the measured qubits, the first
+    qubit of to_measure being the most significant: measuring (1, 2)
+    gives the outcomes |00>, |01>, |10> and |11>, in this order. Every
+    outcome is kept, including those of probability 0. Post-measurement
+    states are the normalised projections of the states, so they keep the
+    phases of their amplitudes.
+
+    Args:
+        states (QubitState, list or numpy.ndarray): A state of 2**n
+        entries, or an (N, 2**n) array of N states, normalised or not.
+        to_measure (int, tuple or list): 1, 2 or 12 (both) for states of
+        two qubits, or the qubits to measure, numbered from 1 to n.
+
+    Returns:
+        tuple: The probabilities of the k = 2**m outcomes of the m measured
+        qubits, of shape (k,) or (N, k), and the normalised post-measurement
+        states of each outcome, of shape (k, 2**n) or (N, k, 2**n), with
+        rows of zeros for the outcomes of probability 0.
+
+    Raises:
+        TypeError: If the states are not of valid type.
+        ValueError: If the states are not of correct size or are null, or
+        the qubits are not valid.
+    """
+    if type(states) is QubitState:
+        states = states.peek()
+
+    if should_validate():
+        if not isinstance(states, (tuple, list, np.ndarray)):
+            raise TypeError("States must be a QubitState, a list or a numpy.ndarray.")
+        states = np.asarray(states)
+        if not np.issubdtype(states.dtype, np.number):
+            raise TypeError("All elements of the states must be numbers.")
+    else:
+        states = np.asarray(states)
+
+    dim = states.shape[-1] if states.ndim in (1, 2) else 0
+    if dim < 2 or dim & (dim - 1):
+        raise ValueError("States must be arrays of 2**n entries, or (N, 2**n) arrays.")
+
+    n_qubits = dim.bit_length() - 1
+    axes = _measured_axes(to_measure, n_qubits)
+    single = states.ndim == 1
+    batch = states.reshape(-1, dim)
+    batch = batch.astype(np.result_type(batch.dtype, np.complex64), copy = False)
+
+    norms = np.einsum('ni,ni->n', batch.conj(), batch).real
+    if np.any(norms == 0):
+        raise ValueError("The qubit states must have some non-zero entries.")
+
+    # Outcome of each basis state: the bits of the measured qubits
+    bits = (np.arange(dim)[:, None] >> (n_qubits - 1 - np.array(axes))) & 1
+    outcomes = bits @ (1 << np.arange(len(axes))[::-1])
+    masks = outcomes[None, :] == np.arange(2 ** len(axes))[:, None]  # (k, dim)
+
+    weights = (batch.conj() * batch).real / norms[:, None]
+    probs = weights @ masks.T.astype(weights.dtype)                   # (N, k)
+
+    branches = batch[:, None, :] * masks[None, :, :]                  # (N, k, dim)
+    scale = np.sqrt(probs * norms[:, None])
+    np.divide(branches, scale[:, :, None], out = branches, where = scale[:, :, None] > 0)
+
+    if single:
+        return probs[0], branches[0]
+    return probs, branches
@@ -0,0 +1,83 @@
+'''
+Random number generators of the stochastic functions of DrMD.
+
+Every function drawing random numbers (random gates and circuits,
+measurements and sampling) takes an 'rng' argument, which may be:
+
+    - None, for a new generator seeded with fresh entropy from the
+      operating system;
+    - an int seed or a numpy.random.SeedSequence, for a new generator;
+    - a numpy.random.Generator (or a legacy numpy.random.RandomState,
+      e.g. to reproduce the streams of earlier versions), used as is.
+
+Parallel workers should not share one generator. 'spawn' derives any
+number of statistically independent child generators from one seed,
+which makes batched and parallel runs reproducible without locks:
+
+    rngs = spawn(1234, n_workers)
+    results = pool.map(lambda rng: circuit.sample(1000, rng = rng), rngs)
+'''
+
+import numpy as np
+
+
+def as_generator(rng = None):
+    """
+    Converts an 'rng' argument to a random number generator.
+
+    Args:
+        rng (None, int, SeedSequence, Generator or RandomState): The
+        generator, its seed, or None for a new unseeded generator.
+
+    Returns:
+        numpy.random.Generator or numpy.random.RandomState: A generator
+        with 'random' and 'choice' methods.
+
+    Raises:
+        TypeError: If rng is not of a valid type.
+    """
+    if rng is None:
+        return np.random.default_rng()
+
+    if isinstance(rng, (np.random.Generator, np.random.RandomState)):
+        return rng
+
+    if isinstance(rng, (int, np.integer, np.random.SeedSequence)) and not isinstance(rng, bool):
+        return np.random.default_rng(rng)
+
+    raise TypeError("rng must be None, an int seed, a numpy.random.SeedSequence " +
+                    "or a numpy.random.Generator.")
+
+
+def spawn(rng, n: int) -> list:
+    """
+    Derives independent child generators, e.g. one per parallel worker
+    or per batch.
+
+    Args:
+        rng (None, int, SeedSequence or Generator): The parent seed or
+        generator. None uses fresh entropy from the operating system.
+        n (int): Number of children.
+
+    Returns:
+        list[numpy.random.Generator]: The n child generators. The same
+        parent seed always gives the same children.
+
+    Raises:
+        TypeError: If rng is not of a valid type.
+        ValueError: If n is negative.
+    """
+    if type(n) is not int or n < 0:
+        raise ValueError("The number of generators must be a non-negative integer.")
+
+    if isinstance(rng, np.random.Generator):
+        seeds = rng.bit_generator.seed_seq.spawn(n)
+    elif rng is None or isinstance(rng, (int, np.integer)) and not isinstance(rng, bool):
+        seeds = np.random.SeedSequence(rng).spawn(n)
+    elif isinstance(rng, np.random.SeedSequence):
+        seeds = rng.spawn(n)
+    else:
+        raise TypeError("rng must be None, an int seed, a numpy.random.SeedSequence " +
+                        "or a numpy.random.Generator.")
+
+    return [np.random.default_rng(seed) for seed in seeds]
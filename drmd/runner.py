@@ -0,0 +1,339 @@
+'''
+An asyncio-friendly runner for serving many small simulation jobs.
+
+Calling 'Circuit.apply' from a coroutine blocks the event loop for the
+duration of the computation. An 'AsyncRunner' instead offloads the work
+to an executor (a thread pool by default), and merges the jobs that
+arrive within a short delay for the same circuit into one vectorised
+apply on an (N, 2**n) batch of states:
+
+    runner = AsyncRunner(max_batch = 256, max_delay = 0.001)
+
+    async def handler(circuit, state):
+        return await runner.run(circuit, state, shots = 100)
+
+Jobs are batched by circuit object, so concurrent requests should share
+the same Circuit instance, which must not be modified while jobs are
+pending. At most 'max_pending' states are queued or being computed at
+once; further calls to 'run' wait for room, which slows down producers
+instead of letting the queue grow without bound.
+'''
+
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+from .circuit import Circuit
+from .qubit_state import QubitState
+from .precision import INFER
+from .rng import as_generator
+
+
+def _sample_rows(states: np.ndarray, shots: int, n_qubits: int, rng = None) -> np.ndarray:
+    """
+    Samples measurements of all qubits of each state of a batch.
+
+    Args:
+        states (numpy.ndarray): (N, 2**n) array of states.
+        shots (int): Number of samples per state.
+        n_qubits (int): Number of qubits n.
+        rng (numpy.random.Generator): Random number generator, see drmd.rng.
+
+    Returns:
+        numpy.ndarray: (N, shots, n) array of measured bits, qubit 0 first.
+    """
+    probs = np.abs(states) ** 2
+    cdf = np.cumsum(probs, axis = 1)
+    cdf /= cdf[:, -1:]
+
+    uniform = as_generator(rng).random((len(states), shots))
+    outcomes = np.empty((len(states), shots), dtype = np.int64)
+    for row in range(len(states)):
+        outcomes[row] = np.searchsorted(cdf[row], uniform[row], side = "right")
+    np.minimum(outcomes, states.shape[1] - 1, out = outcomes)
+
+    shifts = np.arange(n_qubits - 1, -1, -1)
+    return ((outcomes[..., None] >> shifts) & 1).astype(np.uint8)
+
+
+class _Job:
+    """
+    A request waiting to be computed.
+
+    Attributes:
+        states (numpy.ndarray): (k, 2**n) array of the input states.
+        kind (str): 'qubit_state', 'single' or 'batch', the form of the input.
+        shots (int): Number of samples per state, or None for the states.
+        rng (numpy.random.Generator): Generator of the samples.
+        future (asyncio.Future): Future receiving the result.
+        start (float): Time at which the job was submitted.
+    """
+
+    def __init__(self, states: np.ndarray, kind: str, shots: int, rng,
+                 future: asyncio.Future, start: float):
+        self.states = states
+        self.kind = kind
+        self.shots = shots
+        self.rng = rng
+        self.future = future
+        self.start = start
+
+
+class AsyncRunner:
+    """
+    Runs circuits on states from coroutines, in micro-batches computed
+    by an executor.
+
+    Attributes:
+        _max_batch (int): Number of states at which a batch is computed
+        without waiting for more jobs.
+        _max_delay (float): Longest time, in seconds, a job waits for
+        others to join its batch.
+        _max_pending (int): Largest number of states queued or being
+        computed at once.
+        _executor (concurrent.futures.Executor): Executor running the
+        computations, or None for the default executor of the event loop.
+        _room (asyncio.Condition): Condition notified when pending states
+        complete, created on first use.
+        _in_flight (int): Number of states queued or being computed.
+        _batches (dict): Jobs waiting to be computed, by circuit id, as
+        [circuit, jobs, number of states, timer] lists.
+        _running (set): Tasks computing batches.
+        _latencies (collections.deque): Latencies of the latest jobs,
+        in seconds.
+        _batch_sizes (collections.deque): Number of states of the latest
+        batches.
+        _completed (int): Number of jobs completed.
+    """
+
+    def __init__(self, max_batch: int = 256, max_delay: float = 0.001,
+                 max_pending: int = 4096, executor = None, window: int = 10000):
+        """
+        Initialises a runner with no pending jobs.
+
+        Args:
+            max_batch (int): Number of states at which a batch is computed
+            without waiting for more jobs.
+            max_delay (float): Longest time, in seconds, a job waits for
+            others to join its batch.
+            max_pending (int): Largest number of states queued or being
+            computed at once. Jobs of more states are rejected.
+            executor (concurrent.futures.Executor): Executor running the
+            computations. Implicitly, the default executor of the event loop.
+            window (int): Number of latest jobs and batches kept for 'stats'.
+
+        Raises:
+            ValueError: If an argument is not positive.
+        """
+        for name, value in (("max_batch", max_batch), ("max_pending", max_pending),
+                            ("window", window)):
+            if type(value) is not int or value < 1:
+                raise ValueError(f"{name} must be a positive integer.")
+
+        if max_delay < 0:
+            raise ValueError("max_delay must be non-negative.")
+
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._max_pending = max_pending
+        self._executor = executor
+        self._room = None
+        self._in_flight = 0
+        self._batches = {}
+        self._running = set()
+        self._latencies = deque(maxlen = window)
+        self._batch_sizes = deque(maxlen = window)
+        self._completed = 0
+
+    async def run(self, circuit: Circuit, states, shots: int = None, rng = None):
+        """
+        Applies a circuit to a state or a batch of states, without blocking
+        the event loop, and returns the output states or measurement samples.
+
+        Args:
+            circuit (Circuit): The circuit.
+            states (QubitState or numpy.ndarray): A state, or an (N, 2**n)
+            array of N states.
+            shots (int): If given, the number of measurements of all qubits
+            sampled from each output state, instead of returning the states.
+            rng (None, int, SeedSequence or Generator): Random number
+            generator of the samples, see drmd.rng. Each job samples from
+            its own generator, so seeded results do not depend on how jobs
+            are batched.
+
+        Returns:
+            QubitState or numpy.ndarray: The output state(s), of same type
+            and shape as the input, or, if shots is given, a (shots, n)
+            array of measured bits, qubit 0 first, per state (of shape
+            (N, shots, n) for a batch).
+
+        Raises:
+            TypeError: If the circuit, the states or rng are not of valid type.
+            ValueError: If the states are not of correct size, if shots is
+            not a positive integer, or if there are more states than
+            max_pending.
+        """
+        job_states, kind = self.__check_job(circuit, states, shots)
+        rng = as_generator(rng)
+        count = len(job_states)
+        if count > self._max_pending:
+            raise ValueError(f"A job may hold at most {self._max_pending} states.")
+
+        if self._room is None:
+            self._room = asyncio.Condition()
+
+        # Backpressure: wait until the pending states leave room for the job
+        async with self._room:
+            await self._room.wait_for(lambda: self._in_flight + count <= self._max_pending)
+            self._in_flight += count
+
+        loop = asyncio.get_running_loop()
+        job = _Job(job_states, kind, shots, rng, loop.create_future(), time.perf_counter())
+        self.__enqueue(circuit, job)
+
+        try:
+            return await job.future
+        finally:
+            async with self._room:
+                self._in_flight -= count
+                self._room.notify_all()
+
+    def __check_job(self, circuit: Circuit, states, shots: int) -> tuple:
+        """
+        Private method checking the arguments of a job.
+
+        Returns:
+            tuple: The (k, 2**n) array of states, and the form of the input.
+        """
+        if type(circuit) is not Circuit:
+            raise TypeError("Input must be a Circuit")
+
+        if shots is not None and (type(shots) is not int or shots < 1):
+            raise ValueError("The number of shots must be a positive integer.")
+
+        dim = 2 ** circuit.n_qubits()
+
+        if type(states) is QubitState:
+            if dim != 4:
+                raise TypeError("QubitState inputs need a circuit on 2 qubits.")
+            # The current state, which differs from the initial one after a collapse
+            return states.peek()[None, :], "qubit_state"
+
+        if type(states) is not np.ndarray:
+            raise TypeError("Input must be numpy.ndarray or QubitState.")
+
+        if states.ndim not in (1, 2) or states.shape[-1] != dim:
+            raise ValueError("Wrong size of state. Input states need to have " +
+                             f"{dim} entries.")
+
+        if states.ndim == 1:
+            return states[None, :], "single"
+        return states, "batch"
+
+    def __enqueue(self, circuit: Circuit, job: _Job):
+        """
+        Private method adding a job to the batch of its circuit, and
+        scheduling the computation of the batch.
+        """
+        key = id(circuit)
+        if key not in self._batches:
+            loop = asyncio.get_running_loop()
+            timer = loop.call_later(self._max_delay, self.__flush, key)
+            self._batches[key] = [circuit, [], 0, timer]
+
+        batch = self._batches[key]
+        batch[1].append(job)
+        batch[2] += len(job.states)
+
+        if batch[2] >= self._max_batch:
+            self.__flush(key)
+
+    def __flush(self, key: int):
+        """
+        Private method starting the computation of the batch of a circuit.
+        """
+        circuit, jobs, count, timer = self._batches.pop(key)
+        timer.cancel()
+
+        task = asyncio.ensure_future(self.__compute(circuit, jobs))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def __compute(self, circuit: Circuit, jobs: list):
+        """
+        Private method computing a batch in the executor, and handing
+        each job its share of the results.
+        """
+        loop = asyncio.get_running_loop()
+        inputs = np.concatenate([job.states for job in jobs])
+
+        def work():
+            outputs = circuit.apply(inputs)
+            results = []
+            start = 0
+            for job in jobs:
+                rows = outputs[start:start + len(job.states)]
+                start += len(job.states)
+                if job.shots is not None:
+                    rows = _sample_rows(rows, job.shots, circuit.n_qubits(), job.rng)
+                results.append(rows)
+            return results
+
+        try:
+            results = await loop.run_in_executor(self._executor, work)
+        except Exception as error:
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(error)
+            return
+
+        end = time.perf_counter()
+        self._batch_sizes.append(len(inputs))
+
+        for job, rows in zip(jobs, results):
+            if job.future.done():  # cancelled by the caller
+                continue
+
+            if job.kind == "batch":
+                result = rows
+            elif job.kind == "qubit_state" and job.shots is None:
+                result = QubitState._from_array(rows[0].copy(), circuit.precision() or INFER)
+            else:
+                result = rows[0]
+
+            job.future.set_result(result)
+            self._latencies.append(end - job.start)
+            self._completed += 1
+
+    async def drain(self):
+        """
+        Computes all pending jobs immediately and waits for them to finish.
+        """
+        for key in list(self._batches):
+            self.__flush(key)
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions = True)
+
+    def stats(self) -> dict:
+        """
+        Returns statistics of the latest jobs.
+
+        Returns:
+            dict: Number of completed jobs, 50th, 90th and 99th percentiles
+            and mean of the job latency in seconds (None if no job
+            completed), and mean number of states per batch.
+        """
+        stats = {"completed": self._completed,
+                 "p50": None, "p90": None, "p99": None, "mean": None,
+                 "mean_batch": None}
+
+        if self._latencies:
+            latencies = np.fromiter(self._latencies, dtype = float)
+            stats["p50"], stats["p90"], stats["p99"] = np.percentile(latencies, [50, 90, 99])
+            stats["mean"] = latencies.mean()
+            stats["mean_batch"] = float(np.mean(self._batch_sizes))
+
+        return stats
@@ -0,0 +1,349 @@
+'''
+A stabilizer (Clifford) simulation backend.
+
+Circuits made only of Clifford gates (e.g. Hadamard, CNOT, Pauli and S
+gates) map stabilizer states to stabilizer states. Such states on n qubits
+can be stored as a tableau of 2n Pauli operators, following Aaronson and
+Gottesman, "Improved simulation of stabilizer circuits" (2004). Applying a
+gate and measuring a qubit then cost polynomial time in n, instead of the
+exponential cost of a state vector.
+
+Qubits are labelled from 0, with qubit 0 the most significant one, as in
+'UnitaryGate.apply_to_qubits'.
+'''
+
+import numpy as np
+
+from .unitary_gate import UnitaryGate
+from .structure import single_pauli
+from .rng import as_generator
+
+
+def _phase_exponents(x1, z1, x2, z2):
+    """
+    Exponent of i picked up when multiplying single-qubit Paulis
+    P(x1, z1) P(x2, z2), elementwise over arrays of bits.
+
+    Returns:
+        numpy.ndarray: Exponents, in {-1, 0, 1}.
+    """
+    x1, z1, x2, z2 = (np.asarray(a, dtype = np.int8) for a in (x1, z1, x2, z2))
+    return np.where(x1 & z1, z2 - x2,
+                    np.where(x1, z2 * (2 * x2 - 1),
+                             np.where(z1, x2 * (1 - 2 * z2), 0)))
+
+
+def _rowsum(x, z, r, targets, source):
+    """
+    Multiplies the rows 'targets' of a tableau by the row 'source'
+    (which must not be one of the targets), tracking the signs.
+    The tableau arrays are modified in place.
+
+    Args:
+        x (numpy.ndarray): X bits of the tableau rows.
+        z (numpy.ndarray): Z bits of the tableau rows.
+        r (numpy.ndarray): Sign bits of the tableau rows.
+        targets (numpy.ndarray): Indices of the rows to update.
+        source (int): Index of the row multiplied in.
+    """
+    if len(targets) == 0:
+        return
+
+    exponents = _phase_exponents(x[source], z[source], x[targets], z[targets])
+    total = (2 * r[targets].astype(np.int64) + 2 * int(r[source]) +
+             exponents.sum(axis = 1))
+    r[targets] = (total % 4) // 2
+    x[targets] ^= x[source]
+    z[targets] ^= z[source]
+
+
+class StabilizerState:
+    """
+    A class representing an n-qubit stabilizer state as a tableau.
+
+    Rows 0 to n-1 of the tableau are the destabilizers and rows n to 2n-1
+    the stabilizers of the state. Row k is the Pauli operator
+    (-1)^r[k] P(x[k, 0], z[k, 0]) ... P(x[k, n-1], z[k, n-1]).
+
+    Attributes:
+        _x (numpy.ndarray): (2n, n) array of X bits.
+        _z (numpy.ndarray): (2n, n) array of Z bits.
+        _r (numpy.ndarray): (2n,) array of sign bits.
+        _support (tuple): Cached (offset, basis) of the measurement
+        outcomes, see 'sample'. None if not computed yet.
+    """
+
+    def __init__(self, n_qubits: int):
+        """
+        Initialises the stabilizer state |0...0> on n qubits.
+
+        Args:
+            n_qubits (int): Number of qubits.
+
+        Raises:
+            ValueError: If n_qubits is not a positive integer.
+        """
+        if type(n_qubits) is not int or n_qubits < 1:
+            raise ValueError("The number of qubits must be a positive integer.")
+
+        eye = np.eye(n_qubits, dtype = np.uint8)
+        zeros = np.zeros((n_qubits, n_qubits), dtype = np.uint8)
+
+        # Destabilizers X_i and stabilizers Z_i
+        self._x = np.concatenate([eye, zeros])
+        self._z = np.concatenate([zeros, eye])
+        self._r = np.zeros(2 * n_qubits, dtype = np.uint8)
+        self._support = None
+
+    def n_qubits(self) -> int:
+        """
+        Returns:
+            int: Number of qubits of the state.
+        """
+        return self._x.shape[1]
+
+    def copy(self) -> 'StabilizerState':
+        """
+        Creates and returns a copy of the state.
+
+        Returns:
+            StabilizerState: Copy of the state.
+        """
+        copied = StabilizerState.__new__(StabilizerState)
+        copied._x = self._x.copy()
+        copied._z = self._z.copy()
+        copied._r = self._r.copy()
+        copied._support = self._support
+        return copied
+
+    def apply_gate(self, gate: UnitaryGate, qubits: tuple = (0, 1)):
+        """
+        Applies a two-qubit Clifford gate to the state, in place.
+
+        Every tableau row is conjugated by the gate, using the action
+        of the gate on the 16 two-qubit Paulis.
+
+        Args:
+            gate (UnitaryGate): A Clifford gate.
+            qubits (tuple): The two distinct qubits the gate acts on.
+
+        Raises:
+            TypeError: If gate is not a UnitaryGate.
+            ValueError: If the gate is not a Clifford gate, or the
+            qubits are not valid.
+        """
+        if type(gate) is not UnitaryGate:
+            raise TypeError("Input must be a UnitaryGate")
+
+        table = gate._pauli_table()
+        if table is None:
+            raise ValueError("Only Clifford gates can be applied to a stabilizer state.")
+        images, signs = table
+
+        q1, q2 = qubits
+        n = self.n_qubits()
+        if q1 == q2 or not (0 <= q1 < n and 0 <= q2 < n):
+            raise ValueError("The gate must act on two distinct qubits of the state.")
+
+        # Label of the local Pauli of each row on the two qubits
+        labels = (self._x[:, q1] | (self._z[:, q1] << 1) |
+                  (self._x[:, q2] << 2) | (self._z[:, q2] << 3))
+        new = images[labels]
+
+        self._r ^= signs[labels]
+        self._x[:, q1] = new & 1
+        self._z[:, q1] = (new >> 1) & 1
+        self._x[:, q2] = (new >> 2) & 1
+        self._z[:, q2] = (new >> 3) & 1
+        self._support = None
+
+    def measure(self, qubit: int, rng = None) -> int:
+        """
+        Measures one qubit in the computational basis, collapsing the state.
+
+        Args:
+            qubit (int): The qubit to measure.
+            rng (None, int, SeedSequence or Generator): Random number
+            generator, see drmd.rng. Implicitly, a new unseeded one.
+
+        Returns:
+            int: The measurement outcome, 0 or 1.
+
+        Raises:
+            ValueError: If the qubit is not valid.
+        """
+        n = self.n_qubits()
+        if type(qubit) is not int or not 0 <= qubit < n:
+            raise ValueError("The qubit to be measured must be an integer " +
+                             f"between 0 and {n - 1}.")
+
+        x, z, r = self._x, self._z, self._r
+        anti = np.nonzero(x[n:, qubit])[0]
+
+        if len(anti) == 0:
+            # Deterministic outcome: Z is (up to sign) a product of stabilizers.
+            # Accumulate the product in an extra scratch row.
+            x = np.concatenate([x, np.zeros((1, n), dtype = np.uint8)])
+            z = np.concatenate([z, np.zeros((1, n), dtype = np.uint8)])
+            r = np.concatenate([r, np.zeros(1, dtype = np.uint8)])
+            scratch = np.array([2 * n])
+
+            for i in np.nonzero(x[:n, qubit])[0]:
+                _rowsum(x, z, r, scratch, i + n)
+
+            return int(r[2 * n])
+
+        # Random outcome: a stabilizer anticommutes with Z on this qubit
+        p = n + anti[0]
+        others = np.nonzero(x[:, qubit])[0]
+        _rowsum(x, z, r, others[others != p], p)
+
+        # Replace the stabilizer by +-Z and keep the old one as destabilizer
+        x[p - n], z[p - n], r[p - n] = x[p], z[p], r[p]
+        x[p] = 0
+        z[p] = 0
+        z[p, qubit] = 1
+        r[p] = as_generator(rng).random() < 0.5
+        self._support = None
+
+        return int(r[p])
+
+    def measure_all(self, rng = None) -> np.ndarray:
+        """
+        Measures every qubit in the computational basis, collapsing
+        the state to a basis state.
+
+        Args:
+            rng (None, int, SeedSequence or Generator): Random number
+            generator, see drmd.rng. Implicitly, a new unseeded one.
+
+        Returns:
+            numpy.ndarray: The n measured bits, qubit 0 first.
+        """
+        rng = as_generator(rng)
+        return np.array([self.measure(q, rng) for q in range(self.n_qubits())],
+                        dtype = np.uint8)
+
+    def sample(self, shots: int = 1, rng = None) -> np.ndarray:
+        """
+        Samples measurements of all qubits in the computational basis,
+        without collapsing the state.
+
+        The outcomes of a stabilizer state are uniformly distributed over
+        an affine subspace 'offset + span(basis)' of bit strings. The
+        subspace is found once by Gaussian elimination, in O(n^3) time,
+        after which each shot only costs a product of random bits with
+        the basis.
+
+        Args:
+            shots (int): Number of samples.
+            rng (None, int, SeedSequence or Generator): Random number
+            generator, see drmd.rng. Implicitly, a new unseeded one.
+
+        Returns:
+            numpy.ndarray: (shots, n) array of measured bits, qubit 0 first.
+        """
+        if type(shots) is not int or shots < 0:
+            raise ValueError("The number of shots must be a non-negative integer.")
+
+        if self._support is None:
+            self._support = self.__find_support()
+        offset, basis = self._support
+
+        bits = (as_generator(rng).random((shots, len(basis))) < 0.5).astype(np.int64)
+        flips = (bits @ basis.astype(np.int64)) & 1
+        return (flips ^ offset).astype(np.uint8)
+
+    def __find_support(self):
+        """
+        Private method finding the bit strings with non-zero amplitude.
+
+        The X parts of the stabilizers span the flips between these bit
+        strings. Stabilizers without X part are +-Z products, which fix
+        the parity of some bits and give the offset.
+
+        Returns:
+            tuple: (offset, basis) with offset an (n,) array and basis
+            a (k, n) array of bits.
+        """
+        n = self.n_qubits()
+        x, z, r = self._x[n:].copy(), self._z[n:].copy(), self._r[n:].copy()
+
+        # Bring the X part of the stabilizers to row echelon form
+        rank = 0
+        for col in range(n):
+            pivots = np.nonzero(x[rank:, col])[0]
+            if len(pivots) == 0:
+                continue
+
+            p = rank + pivots[0]
+            for arr in (x, z, r):
+                arr[[rank, p]] = arr[[p, rank]]
+
+            others = np.nonzero(x[:, col])[0]
+            _rowsum(x, z, r, others[others != rank], rank)
+            rank += 1
+
+            if rank == n:
+                break
+
+        # Solve the parity constraints z . bits = r of the Z-type stabilizers
+        system = np.concatenate([z[rank:], r[rank:, None]], axis = 1)
+        offset = np.zeros(n, dtype = np.uint8)
+        row = 0
+        pivot_cols = []
+        for col in range(n):
+            pivots = np.nonzero(system[row:, col])[0]
+            if len(pivots) == 0:
+                continue
+
+            p = row + pivots[0]
+            system[[row, p]] = system[[p, row]]
+            others = np.nonzero(system[:, col])[0]
+            others = others[others != row]
+            system[others] ^= system[row]
+            pivot_cols.append(col)
+            row += 1
+
+            if row == len(system):
+                break
+
+        offset[pivot_cols] = system[:len(pivot_cols), -1]
+
+        return offset, x[:rank]
+
+    def to_statevector(self) -> np.ndarray:
+        """
+        Returns the state as a dense vector of 2**n amplitudes, up to a
+        global phase. Only meant for small numbers of qubits.
+
+        Returns:
+            numpy.ndarray: The state vector.
+        """
+        n = self.n_qubits()
+        projector = np.eye(2 ** n, dtype = complex)
+
+        for k in range(n, 2 * n):
+            stabilizer = np.array([[(-1) ** int(self._r[k])]], dtype = complex)
+            for q in range(n):
+                pauli = single_pauli(int(self._x[k, q]), int(self._z[k, q]))
+                stabilizer = np.kron(stabilizer, pauli)
+            projector = projector @ (np.eye(2 ** n) + stabilizer) / 2
+
+        column = projector[:, np.argmax(np.linalg.norm(projector, axis = 0))]
+        return column / np.linalg.norm(column)
+
+    def __repr__(self):
+        """
+        Overrides the default 'print()' behaviour in python.
+
+        Returns:
+            str: The stabilizer generators of the state.
+        """
+        letters = np.array([["I", "Z"], ["X", "Y"]])
+        n = self.n_qubits()
+        rows = []
+        for k in range(n, 2 * n):
+            sign = "-" if self._r[k] else "+"
+            rows.append(sign + "".join(letters[self._x[k], self._z[k]]))
+        return "\n".join(rows)
@@ -0,0 +1,268 @@
+'''
+Execution of gate streams that are too long to be stored as a Circuit.
+
+A 'Circuit' keeps a copy of every gate, which is wasteful for generated
+circuits of millions of gates. The functions of this module instead
+consume gates one at a time from any iterable (a list, a generator, a
+Circuit or a gate file) and fold them into a state or a running product,
+so that the gates never have to be held in memory all at once:
+
+    def layers():
+        for step in range(10 ** 6):
+            yield gl.CNOT1, (step % 5, (step + 1) % 5)
+
+    final = stream_apply(layers(), state, checkpoint = save, every = 10000)
+
+Gates can be given as UnitaryGate objects or 4x4 matrices, optionally in a
+(gate, qubits) pair; gates given alone act on qubits (0, 1).
+
+Gate files store one fixed-size record per gate (its matrix and qubits).
+They are written incrementally by 'write_gates' and read back through a
+memory map by 'read_gates', so only the gates being applied are loaded.
+'''
+
+import os
+
+import numpy as np
+
+from .unitary_gate import UnitaryGate
+from .circuit import Circuit
+from .qubit_state import QubitState
+from .precision import INFER
+from .stabilizer import StabilizerState
+from .mps import MPSState
+
+# Layout of one gate in a gate file
+GATE_RECORD = np.dtype([("matrix", np.complex128, (4, 4)), ("qubits", np.int32, (2,))])
+
+
+def _as_gate(item) -> tuple:
+    """
+    Normalises one element of a gate stream.
+
+    Args:
+        item: A UnitaryGate, a 4x4 matrix, or a (gate, qubits) pair.
+
+    Returns:
+        tuple: The UnitaryGate and the pair of qubits it acts on.
+
+    Raises:
+        TypeError: If the element is not a gate.
+    """
+    qubits = (0, 1)
+    if type(item) is tuple and len(item) == 2:
+        item, qubits = item
+
+    if type(item) is not UnitaryGate:
+        if not isinstance(item, (list, np.ndarray)):
+            raise TypeError("Gate streams must contain UnitaryGate objects, " +
+                            "4x4 matrices, or (gate, qubits) pairs.")
+        item = UnitaryGate(item)
+
+    return item, tuple(int(q) for q in qubits)
+
+
+def _iter_gates(gates):
+    """
+    Iterates over the gates of a stream, a Circuit or a gate file.
+
+    Args:
+        gates: An iterable of gates, a Circuit, or the path of a gate file.
+
+    Yields:
+        tuple: Each UnitaryGate with the pair of qubits it acts on.
+    """
+    if isinstance(gates, (str, os.PathLike)):
+        yield from read_gates(gates)
+    elif type(gates) is Circuit:
+        yield from zip(gates._gates, gates._qubits)
+    else:
+        for item in gates:
+            yield _as_gate(item)
+
+
+def write_gates(path, gates, chunk: int = 4096) -> int:
+    """
+    Writes a stream of gates to a gate file, a chunk at a time.
+    The file is overwritten if it exists.
+
+    Args:
+        path (str): Path of the gate file.
+        gates: An iterable of gates, or a Circuit.
+        chunk (int): Number of gates buffered before each write.
+
+    Returns:
+        int: Number of gates written.
+
+    Raises:
+        ValueError: If chunk is not a positive integer.
+    """
+    if type(chunk) is not int or chunk < 1:
+        raise ValueError("The chunk size must be a positive integer.")
+
+    buffer = np.zeros(chunk, dtype = GATE_RECORD)
+    count = 0
+
+    with open(path, "wb") as file:
+        filled = 0
+        for gate, qubits in _iter_gates(gates):
+            buffer[filled]["matrix"] = gate._matrix
+            buffer[filled]["qubits"] = qubits
+            filled += 1
+
+            if filled == chunk:
+                buffer.tofile(file)
+                count += filled
+                filled = 0
+
+        buffer[:filled].tofile(file)
+        count += filled
+
+    return count
+
+
+def read_gates(path, start: int = 0):
+    """
+    Reads the gates of a gate file through a memory map, one at a time.
+
+    Args:
+        path (str): Path of the gate file.
+        start (int): Index of the first gate read, e.g. to resume from
+        a checkpoint.
+
+    Yields:
+        tuple: Each UnitaryGate with the pair of qubits it acts on.
+
+    Raises:
+        ValueError: If the file is not a gate file.
+    """
+    size = os.path.getsize(path)
+    if size % GATE_RECORD.itemsize != 0:
+        raise ValueError(f"{path} is not a gate file.")
+    if size == 0:
+        return
+
+    records = np.memmap(path, dtype = GATE_RECORD, mode = "r")
+    for index in range(start, len(records)):
+        record = records[index]
+        yield UnitaryGate(np.array(record["matrix"])), tuple(int(q) for q in record["qubits"])
+
+
+def _fold(gates, state, apply_gate, checkpoint, every: int):
+    """
+    Applies a stream of gates to a state, calling the checkpoint
+    function every 'every' gates.
+
+    Args:
+        gates: An iterable of gates, a Circuit, or the path of a gate file.
+        state: The state, modified or replaced by apply_gate.
+        apply_gate (callable): Function (state, gate, qubits) -> state.
+        checkpoint (callable): Function (count, state), or None.
+        every (int): Number of gates between checkpoints.
+
+    Returns:
+        The final state.
+
+    Raises:
+        ValueError: If every is not a positive integer.
+    """
+    if type(every) is not int or every < 1:
+        raise ValueError("The checkpoint interval must be a positive integer.")
+
+    count = 0
+    for gate, qubits in _iter_gates(gates):
+        state = apply_gate(state, gate, qubits)
+        count += 1
+
+        if checkpoint is not None and count % every == 0:
+            checkpoint(count, state)
+
+    return state
+
+
+def stream_apply(gates, state, checkpoint = None, every: int = 1000):
+    """
+    Applies a stream of gates to a state, consuming the gates one at
+    a time. The input state is not modified.
+
+    Args:
+        gates: An iterable of gates (see the module documentation),
+        a Circuit, or the path of a gate file.
+        state (QubitState, np.array, StabilizerState or MPSState): The
+        input state. Arrays may hold one state of 2**n entries, or an
+        (N, 2**n) array of N states.
+        checkpoint (callable): Function called as checkpoint(count, state)
+        after every 'every' gates, with the number of gates applied so far
+        and the current state, e.g. to save progress. The state must not
+        be modified.
+        every (int): Number of gates between checkpoints.
+
+    Returns:
+        QubitState, np.array, StabilizerState or MPSState: The final state,
+        of same type as the input.
+
+    Raises:
+        TypeError: If the state or a gate is not of a valid type.
+        ValueError: If a gate does not act on two distinct qubits of
+        the state, or the array state is not of correct size.
+    """
+    if type(state) in (StabilizerState, MPSState):
+        def apply_gate(current, gate, qubits):
+            current.apply_gate(gate, qubits)
+            return current
+
+        return _fold(gates, state.copy(), apply_gate, checkpoint, every)
+
+    if type(state) is QubitState:
+        # Gates are applied to the current state, as by 'Circuit.apply'
+        precision = state.precision() or INFER
+        if checkpoint is not None:
+            inner = checkpoint
+            checkpoint = lambda count, current: inner(count,
+                                                      QubitState._from_array(current, precision))
+
+        final = stream_apply(gates, state.peek(), checkpoint, every)
+        return QubitState._from_array(final, precision)
+
+    if type(state) is not np.ndarray:
+        raise TypeError("Input must be numpy.ndarray, QubitState, " +
+                        "StabilizerState or MPSState.")
+
+    def apply_gate(current, gate, qubits):
+        return gate.apply_to_qubits(current, qubits)
+
+    final = _fold(gates, state, apply_gate, checkpoint, every)
+    return final.copy() if final is state else final
+
+
+def stream_unitary(gates, n_qubits: int = 2, checkpoint = None, every: int = 1000) -> np.ndarray:
+    """
+    Computes the matrix of a stream of gates, i.e. their product, folding
+    the gates into a running product one at a time.
+
+    Args:
+        gates: An iterable of gates (see the module documentation),
+        a Circuit, or the path of a gate file.
+        n_qubits (int): Number of qubits of the register, at least 2.
+        checkpoint (callable): Function called as checkpoint(count, matrix)
+        after every 'every' gates, with the number of gates applied so far
+        and the product of these gates. The matrix must not be modified.
+        every (int): Number of gates between checkpoints.
+
+    Returns:
+        np.array: The 2**n x 2**n unitary matrix of the stream.
+
+    Raises:
+        ValueError: If n_qubits is smaller than 2, or a gate does not act
+        on two distinct qubits of the register.
+    """
+    if type(n_qubits) is not int or n_qubits < 2:
+        raise ValueError("The number of qubits must be an integer of at least 2.")
+
+    # Rows of the product's transpose are the images of the basis states
+    if checkpoint is not None:
+        inner = checkpoint
+        checkpoint = lambda count, rows: inner(count, rows.T)
+
+    rows = stream_apply(gates, np.eye(2 ** n_qubits, dtype = complex), checkpoint, every)
+    return rows.T
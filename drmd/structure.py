@@ -0,0 +1,196 @@
+'''
+A file of helper functions that detect the structure of gate matrices.
+
+These functions work on plain 4x4 NumPy arrays, and are used to find out
+whether a gate is diagonal, a permutation (up to phases) or a Clifford
+gate, so that cheaper ways of applying or simulating it can be chosen.
+
+Two-qubit Pauli operators are labelled by an integer 'v' from 0 to 15,
+whose bits are (x1, z1, x2, z2) from least to most significant. The
+operator is the tensor product of P(x1, z1) and P(x2, z2), where
+P(x, z) = i^(x*z) X^x Z^z, i.e. I, X, Z or Y.
+'''
+
+import numpy as np
+
+# Single-qubit Pauli matrices indexed by (x, z): I, Z, X, Y
+_SINGLE_PAULIS = {
+    (0, 0): np.array([[1, 0], [0, 1]], dtype = complex),
+    (0, 1): np.array([[1, 0], [0, -1]], dtype = complex),
+    (1, 0): np.array([[0, 1], [1, 0]], dtype = complex),
+    (1, 1): np.array([[0, -1j], [1j, 0]]),
+}
+
+
+def single_pauli(x: int, z: int) -> np.ndarray:
+    """
+    Returns the 2x2 matrix of the single-qubit Pauli P(x, z).
+
+    Args:
+        x (int): X bit of the Pauli, 0 or 1.
+        z (int): Z bit of the Pauli, 0 or 1.
+
+    Returns:
+        numpy.ndarray: I, Z, X or Y.
+    """
+    return _SINGLE_PAULIS[(x, z)]
+
+
+def pauli_matrix(v: int) -> np.ndarray:
+    """
+    Returns the 4x4 matrix of the two-qubit Pauli operator labelled by v.
+
+    Args:
+        v (int): Label of the Pauli operator, from 0 to 15.
+
+    Returns:
+        numpy.ndarray: 4x4 matrix of the Pauli operator.
+    """
+    x1, z1, x2, z2 = v & 1, (v >> 1) & 1, (v >> 2) & 1, (v >> 3) & 1
+    return np.kron(_SINGLE_PAULIS[(x1, z1)], _SINGLE_PAULIS[(x2, z2)])
+
+
+# All 16 two-qubit Paulis, stacked in order of their label
+PAULIS = np.array([pauli_matrix(v) for v in range(16)])
+
+
+def matrix_key(matrix: np.ndarray, decimals: int = 8) -> bytes:
+    """
+    Returns a hashable key for a matrix, so that matrices that agree
+    up to 'decimals' decimal places get the same key.
+
+    Args:
+        matrix (numpy.ndarray): The matrix.
+        decimals (int): Number of decimals kept before hashing.
+
+    Returns:
+        bytes: The key of the matrix.
+    """
+    rounded = np.round(np.asarray(matrix, dtype = complex), decimals)
+    rounded = rounded + 0.0  # turns -0.0 into 0.0
+    return rounded.tobytes()
+
+
+def canonical_phase(matrix: np.ndarray) -> np.ndarray:
+    """
+    Removes the global phase of a matrix, so that matrices equal up to
+    a global phase become equal. The phase is fixed by making the first
+    entry of large magnitude (at least half the largest one) real and
+    positive.
+
+    Args:
+        matrix (numpy.ndarray): A non-zero matrix, or a (..., r, c) stack
+        of non-zero matrices, each given its own phase.
+
+    Returns:
+        numpy.ndarray: The matrix, or each matrix of the stack, times a phase.
+    """
+    matrix = np.asarray(matrix, dtype = complex)
+    flat = matrix.reshape(matrix.shape[:-2] + (-1,))
+    magnitudes = np.abs(flat)
+    first = np.argmax(magnitudes >= magnitudes.max(axis = -1, keepdims = True) / 2, axis = -1)
+    pivot = np.take_along_axis(flat, first[..., None], axis = -1)
+    return matrix * (np.abs(pivot) / pivot)[..., None]
+
+
+def is_diagonal(matrix: np.ndarray, atol: float = 1.e-8) -> bool:
+    """
+    Checks if a matrix is diagonal.
+
+    Args:
+        matrix (numpy.ndarray): A square matrix.
+        atol (float): Absolute tolerance for off-diagonal entries.
+
+    Returns:
+        bool: True if all off-diagonal entries vanish.
+    """
+    matrix = np.asarray(matrix)
+    off_diag = matrix - np.diag(np.diag(matrix))
+    return bool(np.all(np.abs(off_diag) <= atol))
+
+
+def monomial_form(matrix: np.ndarray, atol: float = 1.e-8):
+    """
+    Checks if a matrix is a permutation matrix times a diagonal of phases,
+    i.e. has exactly one non-zero entry in every row and column.
+
+    If it is, applying the matrix to a vector 'state' is the same as
+    'phases * state[perm]'.
+
+    Args:
+        matrix (numpy.ndarray): A square matrix.
+        atol (float): Absolute tolerance for zero entries.
+
+    Returns:
+        tuple or None: (perm, phases) as numpy arrays, or None if the matrix
+        is not of this form.
+    """
+    matrix = np.asarray(matrix)
+    non_zero = np.abs(matrix) > atol
+
+    # Exactly one non-zero entry per row and per column
+    if not (np.all(non_zero.sum(axis = 0) == 1) and
+            np.all(non_zero.sum(axis = 1) == 1)):
+        return None
+
+    perm = np.argmax(non_zero, axis = 1)
+    phases = matrix[np.arange(matrix.shape[0]), perm]
+    return perm, phases
+
+
+def is_permutation(matrix: np.ndarray, atol: float = 1.e-8) -> bool:
+    """
+    Checks if a matrix is a permutation matrix, up to phases.
+
+    Args:
+        matrix (numpy.ndarray): A square matrix.
+        atol (float): Absolute tolerance for zero entries.
+
+    Returns:
+        bool: True if the matrix is a permutation times a diagonal of phases.
+    """
+    return monomial_form(matrix, atol) is not None
+
+
+def clifford_table(matrix: np.ndarray, atol: float = 1.e-6):
+    """
+    Finds how a two-qubit gate U acts on Pauli operators by conjugation.
+    For a Clifford gate, U P_v U^dagger = (-1)^sign P_w for every Pauli P_v.
+
+    Args:
+        matrix (numpy.ndarray): A 4x4 unitary matrix.
+        atol (float): Absolute tolerance of the check.
+
+    Returns:
+        tuple or None: (images, signs), two integer arrays of length 16 such
+        that Pauli v is mapped to Pauli images[v] with sign (-1)^signs[v].
+        None if the gate is not a Clifford gate.
+    """
+    matrix = np.asarray(matrix, dtype = complex)
+    conjugated = matrix @ PAULIS @ matrix.conj().T
+
+    # Decompose each image in the Pauli basis: coeffs[v, w] = Tr(P_w C_v) / 4
+    coeffs = np.einsum('wij,vji->vw', PAULIS, conjugated) / 4
+
+    images = np.argmax(np.abs(coeffs), axis = 1)
+    leading = coeffs[np.arange(16), images]
+    if not np.allclose(np.abs(leading), 1, atol = atol):
+        return None
+
+    signs = (leading.real < 0).astype(np.uint8)
+    return images, signs
+
+
+def is_clifford(matrix: np.ndarray, atol: float = 1.e-6) -> bool:
+    """
+    Checks if a two-qubit gate is a Clifford gate, i.e. maps
+    Pauli operators to Pauli operators by conjugation.
+
+    Args:
+        matrix (numpy.ndarray): A 4x4 unitary matrix.
+        atol (float): Absolute tolerance of the check.
+
+    Returns:
+        bool: True if the gate is a Clifford gate.
+    """
+    return clifford_table(matrix, atol) is not None
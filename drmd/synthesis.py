@@ -0,0 +1,319 @@
+'''
+Synthesis of short circuits implementing a given two-qubit unitary.
+
+'synthesize' returns a Circuit whose unitary is within an operator-norm
+tolerance of a 4x4 target, up to a global phase, in two stages:
+
+    1. Exact search over a discrete gate set, by default the gates of
+    the registry (see 'gate_registry'). All products of up to
+    ceil(max_depth / 2) gates are computed once per gate set, and
+    indexed by a hash of their matrix with the global phase removed.
+    Meet-in-the-middle then finds the shortest sequences of up to
+    max_depth gates: for each product B of the table, the remaining
+    product A = U B^dagger is looked up in the same table, so that a
+    depth 2d search costs two depth d enumerations instead of one of
+    depth 2d.
+
+    2. If no sequence is found, numerical optimisation over circuits of
+    single-qubit rotations interleaved with k = 0, 1, 2, 3 CNOT gates,
+    with k increasing from the smallest number of CNOT gates the target
+    needs ('cnot_count'), since any two-qubit unitary needs at most three.
+
+    circuit = synthesize(target, tol = 1.e-8)
+    assert operator_distance(circuit.unitary(), target) <= 1.e-8
+'''
+
+import numpy as np
+
+from .unitary_gate import UnitaryGate
+from .circuit import Circuit
+from .gate_registry import get_registry
+from .structure import canonical_phase, matrix_key
+from .rng import as_generator
+from . import gate_list
+
+# Tables of gate products, by gate set and depth
+_TABLES = {}
+
+# Decimals kept when hashing matrices
+_DECIMALS = 6
+
+
+def operator_distance(u: np.ndarray, v: np.ndarray) -> float:
+    """
+    Computes the operator norm distance of two unitaries, up to a global
+    phase. The phase aligning v with u is the phase of Tr(v^dagger u).
+
+    Args:
+        u (numpy.ndarray): A unitary matrix.
+        v (numpy.ndarray): A unitary matrix of the same shape.
+
+    Returns:
+        float: The largest singular value of u - e^{i phi} v.
+    """
+    u, v = np.asarray(u), np.asarray(v)
+    overlap = np.vdot(v, u)
+    phase = overlap / abs(overlap) if abs(overlap) > 0 else 1
+    return float(np.linalg.norm(u - phase * v, 2))
+
+
+def _phase_keys(matrices: np.ndarray) -> list:
+    """
+    Hashes matrices with their global phase removed, so that matrices
+    equal up to a phase get the same key. The phase is fixed as in
+    'Circuit.content_hash', by 'structure.canonical_phase'.
+
+    Args:
+        matrices (numpy.ndarray): (N, 4, 4) array of matrices.
+
+    Returns:
+        list[bytes]: The N keys.
+    """
+    return [matrix_key(matrix, _DECIMALS) for matrix in canonical_phase(matrices)]
+
+
+def _table(matrices: np.ndarray, depth: int) -> tuple:
+    """
+    Computes, or returns from the cache, the shortest products of up to
+    'depth' gates of a gate set, one per distinct matrix up to a phase.
+
+    Args:
+        matrices (numpy.ndarray): (G, 4, 4) array of the gate matrices.
+        depth (int): Largest number of gates in a product.
+
+    Returns:
+        tuple: Map of matrix keys to entry indices, list of the gate
+        sequences of the entries (indices into the gate set, first applied
+        first), and (N, 4, 4) array of their products.
+    """
+    cache_key = (matrices.tobytes(), depth)
+    if cache_key in _TABLES:
+        return _TABLES[cache_key]
+
+    products = [np.eye(4, dtype = complex)]
+    sequences = [()]
+    index = {_phase_keys(products[0][None])[0]: 0}
+    frontier = [0]
+
+    for level in range(depth):
+        if not frontier:
+            break
+
+        # Apply every gate after every product of the previous level
+        grown = np.einsum('gij,fjk->fgik', matrices, np.array([products[f] for f in frontier]))
+        grown = grown.reshape(-1, 4, 4)
+        keys = _phase_keys(grown)
+
+        new_frontier = []
+        for position, key in enumerate(keys):
+            if key in index:
+                continue
+            parent, gate = divmod(position, len(matrices))
+            index[key] = len(products)
+            new_frontier.append(len(products))
+            products.append(grown[position])
+            sequences.append(sequences[frontier[parent]] + (gate,))
+        frontier = new_frontier
+
+    table = (index, sequences, np.array(products))
+    _TABLES[cache_key] = table
+    return table
+
+
+def _search(target: np.ndarray, matrices: np.ndarray, max_depth: int, tol: float):
+    """
+    Meet-in-the-middle search of the shortest gate sequence implementing
+    a target unitary.
+
+    Returns:
+        tuple: Indices of the gates of the sequence, first applied first,
+        or None if no sequence of up to max_depth gates is found.
+    """
+    index, sequences, products = _table(matrices, (max_depth + 1) // 2)
+
+    # target = A B, B applied first: look A = target B^dagger up in the table
+    remainders = target[None, :, :] @ products.conj().transpose(0, 2, 1)
+    keys = _phase_keys(remainders)
+
+    best = None
+    for first, key in enumerate(keys):
+        second = index.get(key)
+        if second is None:
+            continue
+
+        sequence = sequences[first] + sequences[second]
+        if len(sequence) > max_depth or (best is not None and len(sequence) >= len(best)):
+            continue
+
+        # Hash collisions and rounding only give candidates; check them
+        if operator_distance(products[second] @ products[first], target) <= tol:
+            best = sequence
+
+    return best
+
+
+def _u3(theta: float, phi: float, lam: float) -> np.ndarray:
+    """
+    Returns the general single-qubit rotation U3(theta, phi, lambda).
+
+    Returns:
+        numpy.ndarray: The 2x2 unitary matrix.
+    """
+    cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+    return np.array([[cos, -np.exp(1j * lam) * sin],
+                     [np.exp(1j * phi) * sin, np.exp(1j * (phi + lam)) * cos]])
+
+
+def _layers(params: np.ndarray, n_cnots: int) -> list:
+    """
+    Builds the gate matrices of a rotation and CNOT circuit.
+
+    Args:
+        params (numpy.ndarray): 6 angles per layer of rotations, for the
+        n_cnots + 1 layers.
+        n_cnots (int): Number of CNOT gates.
+
+    Returns:
+        list[numpy.ndarray]: 4x4 matrices of the gates, first applied first.
+    """
+    matrices = []
+    for layer in range(n_cnots + 1):
+        angles = params[6 * layer:6 * layer + 6]
+        matrices.append(np.kron(_u3(*angles[:3]), _u3(*angles[3:])))
+        if layer < n_cnots:
+            matrices.append(gate_list.C1NOT2)
+    return matrices
+
+
+def cnot_count(target: np.ndarray, atol: float = 1.e-8) -> int:
+    """
+    Computes the smallest number of CNOT gates of a circuit implementing
+    a two-qubit unitary with single-qubit gates, from the characteristic
+    polynomial of gamma = U (Y x Y) U^T (Y x Y), U being normalised to
+    determinant 1 (Shende, Markov and Bullock, 2004).
+
+    Args:
+        target (numpy.ndarray): The 4x4 unitary.
+        atol (float): Tolerance of the tests on gamma.
+
+    Returns:
+        int: The number of CNOT gates, from 0 to 3.
+    """
+    target = np.asarray(target, dtype = complex)
+    target = target / np.linalg.det(target) ** 0.25
+    yy = np.kron(gate_list.Y_mat, gate_list.Y_mat)
+    gamma = target @ yy @ target.T @ yy
+    poly = np.poly(gamma)  # characteristic polynomial of gamma
+
+    if np.allclose(poly, [1, -4, 6, -4, 1], atol = atol) or \
+       np.allclose(poly, [1, 4, 6, 4, 1], atol = atol):
+        return 0
+    if np.allclose(poly, [1, 0, 2, 0, 1], atol = atol):
+        return 1
+    if np.allclose(poly.imag, 0, atol = atol):
+        return 2
+    return 3
+
+
+def _optimise(target: np.ndarray, tol: float, restarts: int, rng) -> list:
+    """
+    Fits rotation and CNOT circuits to a target unitary, with the fewest
+    CNOT gates reaching the tolerance, starting from the number given by
+    'cnot_count'.
+
+    Returns:
+        list[numpy.ndarray]: 4x4 matrices of the gates, first applied first,
+        or None if no fit is within the tolerance.
+    """
+    # scipy is slow to import, so only load it on first use.
+    from scipy.optimize import least_squares
+
+    for n_cnots in range(cnot_count(target, atol = tol), 4):
+        def residuals(params):
+            product = np.eye(4)
+            for matrix in _layers(params[:-1], n_cnots):
+                product = matrix @ product
+            difference = target - np.exp(1j * params[-1]) * product
+            return np.concatenate([difference.real.ravel(), difference.imag.ravel()])
+
+        for attempt in range(restarts):
+            start = rng.uniform(0, 2 * np.pi, 6 * (n_cnots + 1) + 1)
+            fit = least_squares(residuals, start, xtol = 1.e-15, ftol = 1.e-15, gtol = 1.e-15)
+            matrices = _layers(fit.x[:-1], n_cnots)
+
+            product = np.eye(4)
+            for matrix in matrices:
+                product = matrix @ product
+            if operator_distance(product, target) <= tol:
+                return matrices
+
+    return None
+
+
+def synthesize(target, gates = None, tol: float = 1.e-8, max_depth: int = 6,
+               rotations: bool = True, restarts: int = 8, rng = None) -> Circuit:
+    """
+    Finds a short circuit implementing a two-qubit unitary, up to a
+    global phase.
+
+    Args:
+        target (UnitaryGate or numpy.ndarray): The 4x4 unitary.
+        gates (list[str or UnitaryGate]): The discrete gate set, as gates
+        or names of registered gates. Implicitly, every registered gate.
+        tol (float): Largest operator norm distance to the target.
+        max_depth (int): Largest number of gates of the discrete search.
+        rotations (bool): Whether to fall back to numerical optimisation
+        over single-qubit rotations and CNOT gates.
+        restarts (int): Number of random starting points of each
+        numerical optimisation.
+        rng (None, int, SeedSequence or Generator): Random number
+        generator of the starting points, see drmd.rng.
+
+    Returns:
+        Circuit: A circuit on 2 qubits implementing the target.
+
+    Raises:
+        TypeError: If the target or a gate is not of valid type.
+        ValueError: If the target is not unitary, an argument is not
+        valid, or no circuit within the tolerance is found.
+    """
+    if type(target) is not UnitaryGate:
+        target = UnitaryGate(target)
+    target = np.asarray(target._matrix, dtype = complex)
+
+    if type(max_depth) is not int or max_depth < 0:
+        raise ValueError("The maximum depth must be a non-negative integer.")
+
+    if not tol > 0:
+        raise ValueError("The tolerance must be positive.")
+
+    if type(restarts) is not int or restarts < 1:
+        raise ValueError("The number of restarts must be a positive integer.")
+
+    registry = get_registry()
+    if gates is None:
+        gates = [name for name in registry.names() if name != "I"]
+
+    gate_objects = []
+    for gate in gates:
+        if type(gate) is str:
+            gate = registry.get(gate)
+        elif type(gate) is not UnitaryGate:
+            raise TypeError("Gates must be UnitaryGate objects or names of registered gates.")
+        gate_objects.append(gate)
+
+    matrices = np.array([np.asarray(gate._matrix, dtype = complex) for gate in gate_objects])
+    matrices = matrices.reshape(-1, 4, 4)
+
+    if len(matrices):
+        sequence = _search(target, matrices, max_depth, tol)
+        if sequence is not None:
+            return Circuit([gate_objects[i] for i in sequence])
+
+    if rotations:
+        found = _optimise(target, tol, restarts, as_generator(rng))
+        if found is not None:
+            return Circuit([gate_list.CNOT1 if matrix is gate_list.C1NOT2 else
+                            UnitaryGate._from_matrix(matrix) for matrix in found])
+
+    raise ValueError("No circuit within the tolerance was found.")
@@ -1,9 +1,12 @@
 import numpy as np
 from numpy import allclose
 from typing import TypeVar
-from scipy.stats import unitary_group as ug
 
-from qubit_state import QubitState
+from .qubit_state import QubitState
+from .structure import is_diagonal, monomial_form, clifford_table
+from .precision import INFER, resolve_precision, cast
+from .validation import should_validate
+from .rng import as_generator
 
 # Creates an range of valid input types for testing.
 apply_type = TypeVar("state", np.ndarray, QubitState)
@@ -16,13 +19,38 @@ class UnitaryGate:
     quantum computing protocols. This includes methods to find the effect
     of applying these unitaries to arbitrary quantum states.
 
+    The structure of the gate is detected at construction. Diagonal gates
+    are applied as an elementwise multiplication by phases, and permutation
+    gates (up to phases, e.g. CNOT, SWAP or the Paulis) as an index gather,
+    instead of a dense matrix multiplication.
+
+    Instances have no attribute dictionary (see '__slots__'). Copies made
+    without checks (see the 'validation' module) reuse the structure
+    detected for the original gate.
+
     Attributes:
         _matrix (numpy.ndarray): The matrix representation of 
         the unitary gate.
+        _kind (str): Structure of the gate, one of 'diagonal',
+        'permutation' or 'dense'.
+        _perm (numpy.ndarray): Column of the non-zero entry in each row,
+        for diagonal and permutation gates.
+        _phases (numpy.ndarray): Value of the non-zero entry in each row,
+        for diagonal and permutation gates. None for permutation gates
+        whose non-zero entries are all 1.
+        _index_cache (dict): Gather indices and phases of the gate acting
+        on given qubits of n-qubit states, or None until first needed.
+        _clifford (tuple or bool): Action of the gate on Pauli operators
+        if it is a Clifford gate, False if it is not, None if unknown yet.
+        _precision (numpy.dtype): Precision of the gate (see the 'precision'
+        module), or None if the dtype of the matrix is inferred by NumPy.
         
     """
 
-    def __init__(self, matrix1, matrix2 = None):  
+    __slots__ = ("_matrix", "_precision", "_kind", "_perm", "_phases",
+                 "_index_cache", "_clifford")
+
+    def __init__(self, matrix1, matrix2 = None, dtype = None):  
         """
         Initialises the UnitaryGate object, taking in the matrix representation.
         Ensures all requirements of a valid unitary gate are met. Constructs the
@@ -33,12 +61,46 @@ class UnitaryGate:
             only first unitary gate.
             matrix2 (list): A 2x2 matrix representation for the second
             unitary gate, if necessary.
+            dtype (str or numpy.dtype): Precision of the gate, 'complex64'
+            or 'complex128', or 'infer' to keep the dtype of the matrix.
+            Implicitly, the default precision (see 'precision.set_precision').
         
         Raises:
             TypeError: Checks if 'matrix' parameters are a list, tuple or 
             numpy array.
             ValueError: Checks if 'matrix1' parameter is correct size.
             ValueError: Checks if 'matrix2' parameter is correct size.
+            ValueError: Checks if 'dtype' is a valid precision.
+        """
+        # The checks may be skipped, see the 'validation' module
+        if should_validate():
+            uni_mat = self.__check_input(matrix1, matrix2)
+        elif matrix2 is None:
+            uni_mat = np.asarray(matrix1)
+        else:
+            uni_mat = np.kron(matrix1, matrix2)
+
+        self._precision = resolve_precision(dtype)
+        self._matrix = np.array(uni_mat, dtype = self._precision)
+        self.__detect_structure()
+
+    def __check_input(self, matrix1, matrix2) -> np.ndarray:
+        """
+        Private method running the checks of the constructor on its input.
+
+        Args:
+            matrix1 (list): Matrix representation for the unitary gate, or
+            only first unitary gate.
+            matrix2 (list): A 2x2 matrix representation for the second
+            unitary gate, or None.
+
+        Returns:
+            numpy.ndarray: The 4x4 unitary matrix.
+
+        Raises:
+            TypeError: If an input is not a list, tuple or numpy array.
+            ValueError: If an input is not of correct size, or the matrix
+            is not unitary.
         """
         # Checks if there was a single two-qubit unitary gate input or two
         # single-qubit inputs
@@ -50,9 +112,9 @@ class UnitaryGate:
                 raise TypeError("The unitary gate matrix must be a tuple, " +
                                 "list or NumPy array.")
             
-            # Convert list or tuple to np matrix
+            # Convert list or tuple to np array
             if isinstance(uni_mat, (list, tuple, np.ndarray)):
-                uni_mat = np.matrix(uni_mat)
+                uni_mat = np.array(uni_mat)
             
             # Check dimensions of matrix parameter
             if uni_mat.shape != (4,4):
@@ -68,12 +130,12 @@ class UnitaryGate:
                 raise TypeError("The second unitary gate matrix must be a " +
                                 "tuple, list or NumPy array.")
             
-            # Convert list or tuple to np matrix
+            # Convert list or tuple to np array
             if isinstance(matrix1, (list, tuple, np.ndarray)):
-                matrix1 = np.matrix(matrix1)
+                matrix1 = np.array(matrix1)
 
             if isinstance(matrix2, (list, tuple, np.ndarray)):
-                matrix2 = np.matrix(matrix2)
+                matrix2 = np.array(matrix2)
             
             # Check dimensions of matrix parameters
             if  matrix1.shape != (2, 2):
@@ -90,18 +152,155 @@ class UnitaryGate:
 
         # Check if the input is unitary
         I_mat = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
-        l =  uni_mat@uni_mat.getH()
+        l =  uni_mat@uni_mat.conj().T
         if not allclose(l, I_mat, atol = 1.e-5):
             raise ValueError("The unitary gate matrix should be unitary.")
+
+        return uni_mat
+
+    @classmethod
+    def _from_matrix(cls, matrix: np.ndarray, dtype = INFER) -> 'UnitaryGate':
+        """
+        Builds a gate from a 4x4 unitary matrix computed by DrMD itself,
+        e.g. the product of valid gates. The checks of the constructor
+        only run at the 'strict' validation level.
+
+        Args:
+            matrix (numpy.ndarray): The 4x4 unitary matrix.
+            dtype (str or numpy.dtype): Precision of the gate.
+
+        Returns:
+            UnitaryGate: The gate.
+        """
+        if should_validate(internal = True):
+            return cls(matrix, dtype = dtype)
+
+        gate = cls.__new__(cls)
+        gate._precision = resolve_precision(dtype)
+        gate._matrix = np.array(matrix, dtype = gate._precision)
+        gate.__detect_structure()
+        return gate
+
+    def __detect_structure(self):
+        """
+        Private method finding whether the gate is diagonal, a permutation
+        (up to phases) or dense, and storing what the fast kernels need.
+        """
+        self._index_cache = None
+        self._clifford = None
+
+        if is_diagonal(self._matrix):
+            self._kind = "diagonal"
+            self._perm = np.arange(4)
+            self._phases = np.diag(self._matrix).copy()
+            return
+
+        form = monomial_form(self._matrix)
+        if form is not None:
+            self._kind = "permutation"
+            self._perm, self._phases = form
+
+            # Pure permutations need no multiplication by phases
+            if allclose(self._phases, 1, rtol = 0, atol = 1.e-12):
+                self._phases = None
+        else:
+            self._kind = "dense"
+            self._perm = None
+            self._phases = None
+
+    def precision(self):
+        """
+        Returns:
+            numpy.dtype: Precision of the gate, or None if the dtype of
+            its matrix was inferred by NumPy.
+        """
+        return self._precision
+
+    def astype(self, dtype) -> 'UnitaryGate':
+        """
+        Returns a copy of the gate in another precision.
+
+        Args:
+            dtype (str or numpy.dtype): 'complex64', 'complex128' or 'infer'.
+
+        Returns:
+            UnitaryGate: The gate in the given precision.
+
+        Raises:
+            ValueError: If dtype is not a valid precision.
+        """
+        return UnitaryGate._from_matrix(self._matrix, dtype if dtype is not None else INFER)
+
+    def is_diagonal(self) -> bool:
+        """
+        Returns:
+            bool: True if the gate matrix is diagonal.
+        """
+        return self._kind == "diagonal"
+
+    def is_permutation(self) -> bool:
+        """
+        Returns:
+            bool: True if the gate matrix is a permutation matrix up to 
+            phases, which includes diagonal gates.
+        """
+        return self._kind != "dense"
+
+    def is_clifford(self) -> bool:
+        """
+        Checks if the gate is a Clifford gate, i.e. maps Pauli operators
+        to Pauli operators. The check is only done once, then cached.
+
+        Returns:
+            bool: True if the gate is a Clifford gate.
+        """
+        return self._pauli_table() is not None
+
+    def _pauli_table(self):
+        """
+        Returns the action of a Clifford gate on Pauli operators, as 
+        computed by 'structure.clifford_table'. The result is cached.
+
+        Returns:
+            tuple or None: (images, signs) arrays, or None if the gate
+            is not a Clifford gate.
+        """
+        if self._clifford is None:
+            table = clifford_table(self._matrix)
+            self._clifford = False if table is None else table
         
-        self._matrix = np.matrix.copy(uni_mat) 
+        return self._clifford or None
+
+    def _apply_array(self, state: np.ndarray) -> np.ndarray:
+        """
+        Applies the gate to the last axis of an array of states, with
+        the kernel matching the structure of the gate. No checks are
+        performed.
+
+        Args:
+            state (numpy.ndarray): Array of shape (..., 4).
+
+        Returns:
+            numpy.ndarray: The states after applying the gate.
+        """
+        if self._kind == "diagonal":
+            return state * self._phases
+        
+        if self._kind == "permutation":
+            gathered = np.take(state, self._perm, axis = -1)
+            if self._phases is None:
+                return gathered
+            return gathered * self._phases
+        
+        return state @ self._matrix.T
 
     def apply(self, state: apply_type) -> apply_type:
         """
         Applies a unitary gate to a state. 
 
         Args:
-            state (QubitState or numpy.ndarray): An input qubit state.
+            state (QubitState or numpy.ndarray): An input qubit state, or
+            an (N, 4) array whose rows are N states.
 
         Returns:
             QubitState or numpy.ndarray: The final state (same type as input).
@@ -112,19 +311,203 @@ class UnitaryGate:
         """
 
         if type(state) == np.ndarray:
-            if state.shape != (4,) or state.ndim != 1:
-                raise ValueError("Wrong size of state. Input states need to be a 4x1 array.")
+            if state.ndim not in (1, 2) or state.shape[-1] != 4:
+                raise ValueError("Wrong size of state. Input states need to be a 4x1 array" +
+                                 " or an (N, 4) array of states.")
             
-            return np.array(self._matrix @ state)[0]
+            return self._apply_array(cast(state, self._precision))
         
         elif type(state) == QubitState:
-            state_array = state.get_initial()
-            state_array = np.array(self._matrix @ state_array)[0]
-            return QubitState(state_array)
+            # The output keeps the precision of the gate, or else of the state
+            precision = self._precision or state.precision() or INFER
+            state_array = cast(state.get_initial(), self._precision)
+            state_array = self._apply_array(state_array)
+            return QubitState._from_array(state_array, precision)
         
         else:
             raise TypeError("Input must be numpy.ndarray or QubitState.")
 
+    def apply_to_qubits(self, state: np.ndarray, qubits: tuple) -> np.ndarray:
+        """
+        Applies the gate to two qubits of an n-qubit state. Qubit 0 is the
+        most significant one, so for n = 2 and qubits = (0, 1) this is the
+        same as 'apply'. The first qubit in 'qubits' is the one the first
+        factor of the gate acts on.
+
+        Args:
+            state (numpy.ndarray): State of shape (2**n,), or an array
+            (N, 2**n) of N states.
+            qubits (tuple): The two distinct qubits the gate acts on.
+
+        Returns:
+            numpy.ndarray: The final state (same shape as input).
+
+        Raises:
+            ValueError: If the state size is not a power of two, or the
+            qubits are not valid.
+            TypeError: If the state is not a numpy.ndarray.
+        """
+        n_qubits = self.__check_state(state, qubits)
+        q1, q2 = qubits
+        
+        state = cast(state, self._precision)
+        if self._kind != "dense":
+            perm, phases = self.__full_indices(n_qubits, (q1, q2))
+            if self._kind == "diagonal":
+                return state * phases
+            
+            gathered = np.take(state, perm, axis = -1)
+            if phases is None:
+                return gathered
+            return gathered * phases
+
+        # Dense gate: contract the gate with the two target axes
+        batch = state.ndim - 1
+        psi = state.reshape(state.shape[:-1] + (2,) * n_qubits)
+        out = np.tensordot(psi, self._matrix.reshape(2, 2, 2, 2),
+                           axes = ((batch + q1, batch + q2), (2, 3)))
+        out = np.moveaxis(out, (-2, -1), (batch + q1, batch + q2))
+        return out.reshape(state.shape)
+
+    def apply_into(self, state: np.ndarray, out: np.ndarray, 
+                   qubits: tuple = (0, 1)) -> np.ndarray:
+        """
+        Applies the gate to two qubits of an n-qubit state, as in
+        'apply_to_qubits', writing the result into a preallocated array
+        instead of allocating a new one.
+
+        Args:
+            state (numpy.ndarray): State of shape (2**n,), or an array
+            (N, 2**n) of N states. It is not modified.
+            out (numpy.ndarray): C-contiguous array of the same shape as
+            the state, receiving the final state. Its dtype must be able
+            to hold the result (e.g. complex for complex gates).
+            qubits (tuple): The two distinct qubits the gate acts on.
+
+        Returns:
+            numpy.ndarray: The array out.
+
+        Raises:
+            ValueError: If the state size is not a power of two, the qubits
+            are not valid, or out is not a valid output array.
+            TypeError: If the state or out is not a numpy.ndarray.
+        """
+        n_qubits = self.__check_state(state, qubits)
+        _check_out(state, out)
+        self._apply_into(state, out, n_qubits, tuple(qubits))
+        return out
+
+    def _apply_into(self, state: np.ndarray, out: np.ndarray, n_qubits: int,
+                    qubits: tuple):
+        """
+        Applies the gate to two qubits of a state, writing into out,
+        without allocating memory. No checks are performed.
+
+        Args:
+            state (numpy.ndarray): Array of shape (..., 2**n).
+            out (numpy.ndarray): C-contiguous array of the same shape,
+            not overlapping the state.
+            n_qubits (int): Number of qubits n.
+            qubits (tuple): The two qubits the gate acts on.
+        """
+        if n_qubits == 2 and qubits == (0, 1):
+            perm, phases = self._perm, self._phases
+            if self._kind == "dense":
+                np.matmul(state, self._matrix.T, out = out)
+                return
+        elif self._kind != "dense":
+            perm, phases = self.__full_indices(n_qubits, qubits)
+        else:
+            # Contract the gate with the two target axes, into a view of out
+            batch = state.ndim - 1
+            shape = state.shape[:-1] + (2,) * n_qubits
+            axes = list(range(batch + n_qubits))
+            outputs = list(axes)
+            outputs[batch + qubits[0]] = batch + n_qubits
+            outputs[batch + qubits[1]] = batch + n_qubits + 1
+            gate_axes = [batch + n_qubits, batch + n_qubits + 1,
+                         batch + qubits[0], batch + qubits[1]]
+
+            np.einsum(state.reshape(shape), axes, self._matrix.reshape(2, 2, 2, 2),
+                      gate_axes, outputs, out = out.reshape(shape))
+            return
+
+        if self._kind == "diagonal":
+            np.multiply(state, phases, out = out)
+            return
+
+        # 'wrap' avoids the buffering of np.take's default 'raise' mode
+        np.take(state, perm, axis = -1, out = out, mode = "wrap")
+        if phases is not None:
+            np.multiply(out, phases, out = out)
+
+    def __check_state(self, state: np.ndarray, qubits: tuple) -> int:
+        """
+        Private method checking that the gate can act on two qubits
+        of a state.
+
+        Args:
+            state (numpy.ndarray): State of shape (2**n,) or (N, 2**n).
+            qubits (tuple): The two qubits the gate acts on.
+
+        Returns:
+            int: The number of qubits n.
+
+        Raises:
+            ValueError: If the state size is not a power of two, or the
+            qubits are not valid.
+            TypeError: If the state is not a numpy.ndarray.
+        """
+        if type(state) != np.ndarray:
+            raise TypeError("Input must be numpy.ndarray.")
+
+        dim = state.shape[-1] if state.ndim in (1, 2) else 0
+        n_qubits = dim.bit_length() - 1
+        if dim < 4 or dim != 2 ** n_qubits:
+            raise ValueError("Wrong size of state. Input states need to have " +
+                             "2**n entries, with n at least 2.")
+
+        q1, q2 = qubits
+        if q1 == q2 or not (0 <= q1 < n_qubits and 0 <= q2 < n_qubits):
+            raise ValueError("The gate must act on two distinct qubits of the state.")
+        
+        return n_qubits
+
+    def __full_indices(self, n_qubits: int, qubits: tuple):
+        """
+        Private method computing the gather indices and phases of a 
+        diagonal or permutation gate acting on two qubits of an n-qubit
+        state. The result is cached.
+
+        Args:
+            n_qubits (int): Number of qubits of the state.
+            qubits (tuple): The two qubits the gate acts on.
+
+        Returns:
+            tuple: (perm, phases) arrays of length 2**n.
+        """
+        key = (n_qubits, qubits)
+        if self._index_cache is None:
+            self._index_cache = {}
+
+        if key not in self._index_cache:
+            index = np.arange(2 ** n_qubits)
+            shift1 = n_qubits - 1 - qubits[0]
+            shift2 = n_qubits - 1 - qubits[1]
+
+            # Local index of each basis state on the two target qubits
+            local = 2 * ((index >> shift1) & 1) + ((index >> shift2) & 1)
+
+            # Replace the target bits with those of the gathered local index
+            source = self._perm[local]
+            rest = index & ~((1 << shift1) | (1 << shift2))
+            perm = rest | ((source >> 1) << shift1) | ((source & 1) << shift2)
+
+            phases = None if self._phases is None else self._phases[local]
+            self._index_cache[key] = (perm, phases)
+        
+        return self._index_cache[key]
+
     def __repr__(self):
         """
         Overrides the default 'print()' behaviour in python.
@@ -141,7 +524,7 @@ class UnitaryGate:
         Returns:
             UnitaryGate: the hermitian conjugate of the input.
         """
-        return UnitaryGate(self._matrix.getH())
+        return UnitaryGate._from_matrix(self._matrix.conj().T, self._precision or INFER)
  
     def copy(self) -> 'UnitaryGate':
         """
@@ -151,8 +534,19 @@ class UnitaryGate:
             UnitaryGate: Copy of current gate.
         """
 
-        mat = self._matrix.copy()
-        return UnitaryGate(mat)
+        if should_validate(internal = True):
+            mat = self._matrix.copy()
+            return UnitaryGate(mat, dtype = self._precision or INFER)
+
+        # A copy has the same structure, which need not be detected again
+        copied = UnitaryGate.__new__(UnitaryGate)
+        for name in UnitaryGate.__slots__:
+            setattr(copied, name, getattr(self, name))
+
+        copied._matrix = self._matrix.copy()
+        if self._index_cache is not None:
+            copied._index_cache = dict(self._index_cache)
+        return copied
 
     def compare(self, gate: 'UnitaryGate') -> bool:
         """
@@ -168,15 +562,51 @@ class UnitaryGate:
         mat2 = self._matrix
         return allclose(mat1, mat2, atol = 1.e-5)
         
-def random_unitary() -> UnitaryGate:
+def _check_out(state: np.ndarray, out: np.ndarray):
+    """
+    Checks that an array can receive the result of applying a gate
+    or a circuit to a state.
+
+    Args:
+        state (numpy.ndarray): The input state.
+        out (numpy.ndarray): The output array.
+
+    Raises:
+        TypeError: If out is not a numpy.ndarray.
+        ValueError: If out does not have the shape of the state, is not
+        writeable and C-contiguous, or overlaps the state.
+    """
+    if type(out) is not np.ndarray:
+        raise TypeError("The output buffer must be a numpy.ndarray.")
+
+    if out.shape != state.shape:
+        raise ValueError("The output buffer must have the shape of the state.")
+
+    if not (out.flags.c_contiguous and out.flags.writeable):
+        raise ValueError("The output buffer must be writeable and C-contiguous.")
+
+    if np.may_share_memory(out, state):
+        raise ValueError("The output buffer must not overlap the state.")
+
+
+def random_unitary(dtype = None, rng = None) -> UnitaryGate:
     """
     Function that returns a random UnitaryGate object.
 
+    Args:
+        dtype (str or numpy.dtype): Precision of the gate, as in the
+        UnitaryGate constructor.
+        rng (None, int, SeedSequence or Generator): Random number
+        generator, see drmd.rng. Implicitly, a new unseeded one.
+
     Returns:
         UnitaryGate: A random unitary gate.
     """
+    # scipy.stats is slow to import, so only load it on first use.
+    from scipy.stats import unitary_group as ug
+
     # Generate a random unitary matrix.
-    uni = ug.rvs(4)
+    uni = ug.rvs(4, random_state = as_generator(rng))
 
-    return UnitaryGate(uni)
+    return UnitaryGate._from_matrix(uni, dtype)
   
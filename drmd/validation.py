@@ -0,0 +1,123 @@
+'''
+Control of the input checks run by the constructors of states and gates.
+
+The constructors of QubitState and UnitaryGate check the type, shape and
+values of their input, and that gate matrices are unitary. These checks
+protect interactive use, but can dominate the runtime of loops creating
+many small objects. Three validation levels are available:
+
+    'strict' (default): every construction is checked, including the
+    states and gates DrMD creates internally (copies, gate outputs,
+    measurement outcomes...).
+    'fast': only objects created by the user are checked; objects built
+    internally from already checked ones are not.
+    'off': no checks at all. Invalid inputs then give wrong results
+    instead of errors. Checks can still be run on a random fraction of
+    constructions, as a debugging aid, with the 'sample_rate' argument.
+
+The level can be set for the whole program or for a block of code:
+
+    set_validation("fast")
+
+    with use_validation("off", sample_rate = 0.01):
+        states = [QubitState(row) for row in batch]
+'''
+
+import contextlib
+import contextvars
+import random
+
+# Valid validation levels
+LEVELS = ("strict", "fast", "off")
+
+_global_validation = ("strict", 0.0)
+
+# Level set by use_validation in the current thread or task
+_UNSET = object()
+_scoped_validation = contextvars.ContextVar("drmd_validation", default = _UNSET)
+
+
+def _as_validation(level: str, sample_rate: float) -> tuple:
+    """
+    Checks a validation level and sample rate.
+
+    Returns:
+        tuple: The level and the sample rate.
+
+    Raises:
+        ValueError: If the level or the sample rate is not valid.
+    """
+    if level not in LEVELS:
+        raise ValueError("The validation level must be 'strict', 'fast' or 'off'.")
+
+    if not 0 <= sample_rate <= 1:
+        raise ValueError("The sample rate must be between 0 and 1.")
+
+    return (level, float(sample_rate))
+
+
+def set_validation(level: str, sample_rate: float = 0.0):
+    """
+    Sets the validation level of the whole program, in all threads.
+
+    Args:
+        level (str): 'strict', 'fast' or 'off'.
+        sample_rate (float): Fraction of the constructions checked anyway
+        when checks are skipped.
+
+    Raises:
+        ValueError: If the level or the sample rate is not valid.
+    """
+    global _global_validation
+    _global_validation = _as_validation(level, sample_rate)
+
+
+def get_validation() -> tuple:
+    """
+    Returns the current validation level.
+
+    Returns:
+        tuple: The level, 'strict', 'fast' or 'off', and the sample rate.
+    """
+    scoped = _scoped_validation.get()
+    return _global_validation if scoped is _UNSET else scoped
+
+
+@contextlib.contextmanager
+def use_validation(level: str, sample_rate: float = 0.0):
+    """
+    Context manager setting the validation level within a block, in the
+    current thread or asyncio task only.
+
+    Args:
+        level (str): 'strict', 'fast' or 'off'.
+        sample_rate (float): Fraction of the constructions checked anyway
+        when checks are skipped.
+
+    Raises:
+        ValueError: If the level or the sample rate is not valid.
+    """
+    token = _scoped_validation.set(_as_validation(level, sample_rate))
+    try:
+        yield
+    finally:
+        _scoped_validation.reset(token)
+
+
+def should_validate(internal: bool = False) -> bool:
+    """
+    Decides whether a construction should run its checks.
+
+    Args:
+        internal (bool): True for objects DrMD builds from already
+        checked objects, False for objects created by the user.
+
+    Returns:
+        bool: True if the checks should run.
+    """
+    level, sample_rate = get_validation()
+
+    if level == "strict" or (level == "fast" and not internal):
+        return True
+
+    return sample_rate > 0 and random.random() < sample_rate
@@ -1,13 +1,13 @@
 import sys
 import os
 
-# Add the package's source directory to sys.path
-sys.path.insert(0, os.path.abspath('../drmd'))
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pytest
 import numpy as np
 
-import qubit_state as qs
+from drmd import qubit_state as qs
 
 """
 A testing python file using the pytest framework for the QubitState class.
@@ -152,6 +152,53 @@ def test_measurements():
     assert np.isclose(probs[1], 0.5)
 
 
+def test_measure_arrays():
+    """
+    Function to test the array statistics of measurements, on single
+    states, batches and subsets of qubits.
+    """
+    q_state = qs.QubitState([1,1j,0,2])
+
+    # Same branches as measure_stats up to a phase, in full precision
+    for to_measure in (1, 2, 12):
+        probs, branches = q_state.measure_arrays(to_measure)
+        stats = q_state.measure_stats(to_measure)
+        kept = probs > 0
+        assert np.allclose(probs[kept], [p for _, p in stats], atol = 1.e-4)
+        for branch, (state, _) in zip(branches[kept], stats):
+            assert state.compare(branch, up_to_phase = True)
+        assert np.allclose(branches[~kept], 0)
+    assert np.isclose(q_state.measure_arrays(12)[0][3], 4 / 6, rtol = 1.e-12)
+
+    # Batches of 3-qubit states, measuring qubits 3 and 1
+    rng = np.random.default_rng(0)
+    states = rng.normal(size = (5, 8)) + 1j * rng.normal(size = (5, 8))
+    probs, branches = qs.measure_arrays(states, (3, 1))
+    assert probs.shape == (5, 4) and branches.shape == (5, 4, 8)
+    assert np.allclose(probs.sum(axis = 1), 1)
+
+    # Outcome 1 is qubit 3 in |0> and qubit 1 in |1>: indices 4 and 6
+    weights = np.abs(states) ** 2 / np.sum(np.abs(states) ** 2, axis = 1)[:, None]
+    assert np.allclose(probs[:, 1], weights[:, 4] + weights[:, 6])
+    assert np.allclose(branches[:, 1, [0, 1, 2, 3, 5, 7]], 0)
+    assert np.allclose(np.linalg.norm(branches, axis = 2), 1)
+
+    single_probs, single_branches = qs.measure_arrays(states[2], (3, 1))
+    assert np.allclose(single_probs, probs[2])
+    assert np.allclose(single_branches, branches[2])
+
+    with pytest.raises(ValueError):
+        qs.measure_arrays(states, 12)
+    with pytest.raises(ValueError):
+        qs.measure_arrays(states, (1, 1))
+    with pytest.raises(ValueError):
+        qs.measure_arrays(np.ones(6))
+    with pytest.raises(ValueError):
+        qs.measure_arrays(np.zeros((2, 4)))
+    with pytest.raises(TypeError):
+        qs.measure_arrays("frog")
+
+
 def test_set():
     """
     Function to test the modification of a qubit state after initialisation.
@@ -176,4 +223,69 @@ def test_compare():
                         "to be a valid numerical qubit input state as a " +
                         "QubitState, NumPy array, list or tuple.")):
         q_state.compare("error")
-    
\ No newline at end of file
+    
+
+def test_lightweight():
+    """
+    Function to test that qubit states have no attribute dictionary, and
+    that the initial and current states share an array when equal.
+    """
+    q_state = qs.QubitState([0,1,0,0])
+    assert not hasattr(q_state, "__dict__")
+
+    with pytest.raises(AttributeError):
+        q_state.extra = 1
+
+    # Shared buffer, without renormalisation
+    assert q_state._QubitState__qb_init is q_state._QubitState__qb_matrix
+
+    # Renormalised states keep their initial state separately
+    q_state = qs.QubitState([1,1,0,0])
+    assert np.allclose(q_state.get_initial(), [1,1,0,0])
+    assert np.isclose(np.linalg.norm(q_state.peek()), 1)
+
+    # Collapsing the state does not modify the initial state
+    q_state = qs.QubitState([1,0,0,1])
+    q_state.measure_collapse()
+    assert np.allclose(q_state.get_initial(), [1,0,0,1])
+
+
+def test_batch_constructors():
+    """
+    Function to test the batched constructors of product, basis and
+    Bloch sphere states against the QubitState constructor.
+    """
+    rng = np.random.default_rng(0)
+    first = rng.normal(size = (10, 2)) + 1j * rng.normal(size = (10, 2))
+    second = rng.normal(size = (10, 2))
+
+    states = qs.product_states(first, second)
+    assert states.shape == (10, 4)
+    for i in range(10):
+        assert qs.QubitState(list(first[i]), list(second[i])).compare(states[i])
+
+    assert np.array_equal(qs.basis_states([0, 3, 1]),
+                          np.eye(4, dtype = complex)[[0, 3, 1]])
+    assert qs.basis_states(5, n_qubits = 3)[0, 5] == 1
+    assert qs.basis_states([1], dtype = "complex64").dtype == np.complex64
+    assert qs.basis_states([]).shape == (0, 4)
+    assert qs.basis_states(np.array([], dtype = int), n_qubits = 3).shape == (0, 8)
+
+    theta = np.array([[0, np.pi], [np.pi / 2, np.pi / 2]])
+    phi = np.array([[0, 0], [0, np.pi / 2]])
+    bloch = qs.bloch_states(theta, phi)
+    assert np.allclose(bloch[0], [0, 1, 0, 0])
+    assert np.allclose(bloch[1], np.kron([1, 1], [1, 1j]) / 2)
+
+    with pytest.raises(ValueError):
+        qs.product_states(first, second[:5])
+    with pytest.raises(ValueError):
+        qs.product_states([[0, 0]], [[1, 0]])
+    with pytest.raises(TypeError):
+        qs.product_states("frog", second)
+    with pytest.raises(ValueError):
+        qs.basis_states([4])
+    with pytest.raises(TypeError):
+        qs.basis_states([0.5])
+    with pytest.raises(ValueError):
+        qs.bloch_states(theta, phi[:1])
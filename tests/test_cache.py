@@ -0,0 +1,145 @@
+'''
+A testing python file using the pytest framework for the ResultCache class.
+
+Tests that cached results match direct computations, that hits and misses
+are counted, that the least recently used entries are evicted first, and
+that cached results cannot be modified by the caller.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.cache import ResultCache
+from drmd.circuit import Circuit, random_circuit
+from drmd.qubit_state import QubitState
+from drmd.unitary_gate import UnitaryGate
+
+
+def test_apply():
+    """
+    Function to test cached application of circuits to states.
+    """
+    cache = ResultCache(maxsize = 4)
+    circ = random_circuit(3)
+    state = QubitState([1, 0, 1, 0])
+
+    first = cache.apply(circ, state)
+    second = cache.apply(circ, state)
+    assert first.compare(circ.apply(state))
+    assert second.compare(first) and second is not first
+
+    # A separately built but equal circuit shares the entry
+    assert np.allclose(cache.apply(circ.copy(), np.array([0, 1, 0, 0])),
+                       circ.apply(np.array([0, 1, 0, 0])))
+    cache.apply(circ.copy(), np.array([0, 1, 0, 0]))  # hit
+
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+    assert stats["size"] == 2 and stats["hit_rate"] == 0.5
+
+    # Circuits differing by a global phase give different output states
+    phased = Circuit(UnitaryGate(-1 * gl.C1NOT2))
+    plain = Circuit(gl.CNOT1)
+    state = np.array([1, 0, 0, 0])
+    assert np.allclose(cache.apply(plain, state), state)
+    assert np.allclose(cache.apply(phased, state), -state)
+
+    with pytest.raises(TypeError):
+        cache.apply(circ, [1, 0, 0, 0])
+
+    # Large circuits are keyed by their gates, without building the unitary
+    large = Circuit(n_qubits = 12)
+    large.append(gl.CNOT1, (0, 11))
+    basis = np.zeros(2 ** 12)
+    basis[2 ** 11] = 1
+    cache.apply(large, basis)
+    hits = cache.stats()["hits"]
+    assert np.allclose(cache.apply(large.copy(), basis), large.apply(basis))
+    assert cache.stats()["hits"] == hits + 1
+    assert large._tree is None
+
+    # A collapsed state does not share the entry of its initial state
+    circ = Circuit([gl.HADAMARD1, gl.CNOT1])
+    state = QubitState([1, 1, 1, 1])
+    cache.apply(circ, state)
+    state.measure_collapse(rng = 0)
+    assert cache.apply(circ, state).compare(circ.apply(state))
+
+
+def test_results_are_copies():
+    """
+    Function to test that modifying a returned result does not
+    modify the cached one.
+    """
+    cache = ResultCache()
+    circ = Circuit(gl.X1)
+    state = np.array([1.0, 0, 0, 0])
+
+    out = cache.apply(circ, state)
+    out[:] = 0
+    assert np.allclose(cache.apply(circ, state), [0, 0, 1, 0])
+
+
+def test_measure_stats_and_expectation():
+    """
+    Function to test cached measurement statistics and expectation values.
+    """
+    cache = ResultCache()
+    circ = Circuit([gl.HADAMARD1, gl.CNOT1])
+    state = QubitState([1, 0, 0, 0])
+
+    for _ in range(2):
+        states, probs = zip(*cache.measure_stats(circ, state, 12))
+        assert np.allclose(probs, [0.5, 0.5])
+        assert states[1].compare([0, 0, 0, 1])
+
+        zz = np.kron(gl.Z_mat, gl.Z_mat)
+        assert np.isclose(cache.expectation(circ, state, zz), 1)
+        assert np.isclose(cache.expectation(circ, state, gl.Z1), 0)
+
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 3
+
+    with pytest.raises(TypeError):
+        cache.measure_stats(circ, np.array([1, 0, 0, 0]))
+
+    # Circuits differing by a global phase give different branches
+    state = QubitState([1, 0, 0, 0])
+    cache.measure_stats(Circuit(gl.CNOT1), state, 1)
+    states, _ = zip(*cache.measure_stats(Circuit(UnitaryGate(-1 * gl.C1NOT2)), state, 1))
+    assert states[0].compare([-1, 0, 0, 0])
+
+
+def test_eviction():
+    """
+    Function to test that the least recently used entry is evicted
+    when the cache is full.
+    """
+    cache = ResultCache(maxsize = 2)
+    circ = Circuit(gl.HADAMARD2)
+    basis = [np.eye(4)[i] for i in range(3)]
+
+    cache.apply(circ, basis[0])
+    cache.apply(circ, basis[1])
+    cache.apply(circ, basis[0])  # basis[1] is now least recently used
+    cache.apply(circ, basis[2])  # evicts basis[1]
+
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+    cache.apply(circ, basis[0])
+    assert cache.stats()["hits"] == 2
+    cache.apply(circ, basis[1])
+    assert cache.stats()["misses"] == 4
+
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["hits"] == 0
+
+    with pytest.raises(ValueError):
+        ResultCache(0)
@@ -1,18 +1,19 @@
 import sys
 import os
 
-# Add the package's source directory to sys.path
-sys.path.insert(0, os.path.abspath('../drmd'))
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pytest
+import tracemalloc
 import random as rand
 from scipy.stats import unitary_group as ug
 import numpy as np
 
-from circuit import Circuit, random_circuit
-import gate_list as gl
-from unitary_gate import UnitaryGate, random_unitary
-from qubit_state import QubitState
+from drmd.circuit import Circuit, random_circuit
+from drmd import gate_list as gl
+from drmd.unitary_gate import UnitaryGate, random_unitary
+from drmd.qubit_state import QubitState
 
 """
 A testing python file using the pytest framework for the Circuit class.
@@ -396,3 +397,272 @@ def test_apply():
                 out_circ = QubitState(out_circ)
             
             assert out_circ.compare(out_uni)    
+
+
+def test_n_qubits():
+    """
+    Function that tests circuits acting on more than two qubits,
+    with gates placed on given pairs of qubits.
+    """
+    with pytest.raises(ValueError) as too_small:
+        Circuit(n_qubits = 1)
+
+    circ = Circuit(n_qubits = 3)
+    circ.append(gl.HADAMARD1, (0, 1))
+    circ.append(gl.CNOT1, (0, 2))
+    circ.insert(1, gl.X2, (2, 1))
+
+    assert circ.n_qubits() == 3
+    assert circ.get_qubits(1) == (2, 1)
+
+    with pytest.raises(ValueError) as bad_qubits:
+        circ.append(gl.CNOT1, (0, 3))
+
+    with pytest.raises(ValueError) as same_qubits:
+        circ.insert(0, gl.CNOT1, (1, 1))
+
+    # Compare with the 8x8 matrix of the circuit
+    I_mat = gl.I_mat
+    H_full = np.kron(gl.H_mat, np.kron(I_mat, I_mat))
+    X_full = np.kron(I_mat, np.kron(gl.X_mat, I_mat))
+    P0, P1 = np.diag([1, 0]), np.diag([0, 1])
+    CNOT_full = np.kron(P0, np.eye(4)) + np.kron(P1, np.kron(I_mat, gl.X_mat))
+    full = CNOT_full @ X_full @ H_full
+
+    batch = np.eye(8)
+    assert np.allclose(circ.apply(batch), batch @ full.T)
+    assert np.allclose(circ.apply(batch[0]), full[:, 0])
+
+    with pytest.raises(ValueError) as wrong_size:
+        circ.apply(np.ones(4))
+
+    with pytest.raises(TypeError) as wrong_type:
+        circ.apply(QubitState([1, 0, 0, 0]))
+
+    # Copies and comparisons take the qubits into account
+    copied = circ.copy()
+    assert copied.compare(circ)
+    copied.pop()
+    copied.append(gl.CNOT1, (0, 1))
+    assert not copied.compare(circ)
+
+    # Circuits on fewer qubits can be merged in, but not the other way round
+    small = Circuit([gl.CNOT1])
+    circ.merge(small)
+    assert circ.get_qubits(-1) == (0, 1)
+    with pytest.raises(ValueError) as too_large:
+        small.merge(circ)
+
+
+def test_reversed_qubits():
+    """
+    Function that tests gates acting on qubits (1, 0) of a 2-qubit circuit,
+    which swaps the roles of the two qubits.
+    """
+    circ = Circuit()
+    circ.append(gl.CNOT1, (1, 0))
+    target = Circuit(gl.CNOT2)
+
+    for state_in in [np.array([0, 1, 0, 0]), QubitState([0, 1, 1, 0])]:
+        out = circ.apply(state_in)
+        expected = target.apply(state_in)
+        if type(out) is QubitState:
+            assert out.compare(expected)
+        else:
+            assert np.allclose(out, expected)
+
+
+def test_equivalent():
+    """
+    Function that tests circuits made of different gates are found
+    equivalent iff. their unitaries agree up to a global phase.
+    """
+    # HZH = X
+    circ1 = Circuit([gl.HADAMARD1, gl.Z1, gl.HADAMARD1])
+    circ2 = Circuit(gl.X1)
+    assert circ1.equivalent(circ2)
+    assert not circ1.compare(circ2)  # Different gates
+    assert circ1.content_hash() == circ2.content_hash()
+
+    # Global phase is ignored
+    circ3 = Circuit(UnitaryGate(np.exp(0.7j) * np.kron(gl.X_mat, gl.I_mat)))
+    assert circ3.equivalent(circ2)
+    assert circ3.content_hash() == circ2.content_hash()
+
+    # Different unitaries are distinguished
+    circ4 = Circuit([gl.HADAMARD1, gl.Z1])
+    assert not circ4.equivalent(circ1)
+    assert circ4.content_hash() != circ1.content_hash()
+
+    # The cached unitary is updated when the circuit is modified
+    circ4.append(gl.HADAMARD1)
+    assert circ4.equivalent(circ1)
+    circ4.insert(0, gl.X1)
+    assert np.allclose(circ4.unitary(), np.eye(4))
+
+    with pytest.raises(TypeError) as invalid_in:
+        circ1.equivalent(gl.X1)
+
+    # Deduplication of a library of random circuits with equivalent copies
+    library = {}
+    circuits = [random_circuit(3) for i in range(5)]
+    for circ in circuits + [c.copy() for c in circuits]:
+        library.setdefault(circ.content_hash(), circ)
+    assert len(library) == 5
+
+
+def test_n_qubit_unitary():
+    """
+    Function that tests the unitary of a circuit on more than 2 qubits,
+    and equivalence of circuits acting on different qubit pairs.
+    """
+    circ = Circuit(n_qubits = 3)
+    circ.append(gl.SWAP, (0, 2))
+    circ.append(gl.CNOT1, (2, 1))
+    circ.append(gl.SWAP, (0, 2))
+
+    target = Circuit(n_qubits = 3)
+    target.append(gl.CNOT1, (0, 1))
+    assert circ.equivalent(target)
+    assert circ.content_hash() == target.content_hash()
+    assert circ.unitary().shape == (8, 8)
+
+    # Larger registers are only hashed by their gates
+    large = Circuit(n_qubits = 12)
+    large.append(gl.CNOT1, (0, 11))
+    with pytest.raises(ValueError):
+        large.content_hash()
+    assert large.gate_hash() == large.copy().gate_hash()
+
+
+def test_incremental_unitary():
+    """
+    Function that tests that the unitary of a circuit, once computed,
+    is kept up to date by append, insert, pop and set_element,
+    including negative and out of range indices.
+    """
+    circ = random_circuit(6)
+    circ.append(random_unitary(), (1, 0))
+    circ.unitary()
+
+    circ.insert(2, random_unitary())
+    circ.insert(-1, random_unitary(), (1, 0))
+    circ.insert(-100, random_unitary())
+    circ.insert(100, random_unitary())
+    circ.pop()
+    circ.pop(-2)
+    circ.pop(0)
+    circ.append(gl.CNOT2)
+    circ.set_element(1, gl.SWAP)
+    circ.set_element(-1, random_unitary(), (1, 0))
+    assert circ.get_qubits(1) == (0, 1)
+
+    # A fresh circuit with the same gates computes its unitary from scratch
+    fresh = Circuit(n_qubits = 2)
+    for i in range(circ.size()):
+        fresh.append(circ.get_element(i), circ.get_qubits(i))
+    assert np.allclose(circ.unitary(), fresh.unitary())
+
+    # States multiplied by the updated product of the gates
+    state = QubitState([1, 1j, 0, 1])
+    batch = ug.rvs(4, size = 3)[:, 0, :]
+    assert circ.apply(state, use_product = True).compare(fresh.copy().apply(state))
+    assert np.allclose(circ.apply(batch, use_product = True), fresh.copy().apply(batch))
+
+    with pytest.raises(IndexError):
+        circ.set_element(circ.size(), gl.X1)
+
+    with pytest.raises(TypeError):
+        circ.set_element(0, gl.X_mat)
+
+    # Edits of circuits on more qubits
+    circ = Circuit(n_qubits = 3)
+    circ.append(gl.CNOT1, (2, 0))
+    circ.append(random_unitary(), (1, 2))
+    circ.unitary()
+    circ.set_element(0, gl.HADAMARD1, (0, 1))
+    circ.insert(1, gl.CZ, (0, 2))
+
+    fresh = Circuit(n_qubits = 3)
+    fresh.append(gl.HADAMARD1, (0, 1))
+    fresh.append(gl.CZ, (0, 2))
+    fresh.append(circ.get_element(2), (1, 2))
+    assert np.allclose(circ.unitary(), fresh.unitary())
+
+
+def test_apply_into():
+    """
+    Function that tests applying circuits into preallocated buffers, and
+    that the steady state does not allocate arrays the size of the states.
+    """
+    rng = np.random.default_rng(4)
+    for n_qubits, depth in ((2, 7), (5, 12), (3, 0), (3, 1)):
+        circ = Circuit(n_qubits = n_qubits)
+        for k in range(depth):
+            gate = [gl.CNOT1, gl.CZ, random_unitary(), gl.SWAP][k % 4]
+            circ.append(gate, tuple(int(q) for q in rng.choice(n_qubits, 2, replace = False)))
+
+        states = rng.normal(size = (4096, 2 ** n_qubits)) + 0j
+        out, scratch = np.empty_like(states), np.empty_like(states)
+
+        assert circ.apply_into(states, out, scratch) is out
+        assert np.allclose(out, circ.apply(states))
+        assert np.allclose(circ.apply_into(states[0], out[0]), circ.apply(states[0]))
+
+        # Only NumPy's internal iteration buffers (at most 8192 entries)
+        # may be allocated, whatever the size of the batch
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        circ.apply_into(states, out, scratch)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert peak - before < 200000
+
+    with pytest.raises(ValueError):
+        circ.apply_into(states, out, out)
+
+    with pytest.raises(ValueError):
+        circ.apply_into(states[:, :4], out)
+
+
+def test_apply_history():
+    """
+    Function to test that applying a circuit gives the same output before
+    and after its unitary is computed, and that the product of the gates
+    is only used on request, with the dtype of the per-gate path.
+    """
+    circ = Circuit([gl.X1, gl.HADAMARD2])
+    state = np.array([1., 0, 0, 0])
+
+    before = circ.apply(state)
+    circ.unitary()
+    after = circ.apply(state)
+    assert before.dtype == after.dtype
+    assert np.array_equal(before, after)
+
+    product = circ.apply(state, use_product = True)
+    assert product.dtype == before.dtype
+    assert np.allclose(product, before)
+
+    # On more qubits, and into preallocated arrays
+    circ = Circuit(n_qubits = 3)
+    circ.append(gl.HADAMARD1, (2, 0))
+    circ.append(gl.CNOT1, (0, 1))
+    batch = np.eye(8)[:3]
+    before = circ.apply(batch)
+    circ.content_hash()
+    assert np.array_equal(circ.apply(batch), before)
+    assert circ.apply(batch, use_product = True).dtype == before.dtype
+
+    out = np.empty_like(before)
+    circ.apply_into(batch, out, use_product = True)
+    assert np.allclose(out, before)
+
+    # Collapsed states are applied from their current amplitudes
+    circ = Circuit([gl.HADAMARD1, gl.CNOT1])
+    q_state = QubitState([1, 1, 1, 1])
+    q_state.measure_collapse(rng = 0)
+    expected = circ.apply(QubitState(q_state.peek()))
+    assert circ.apply(q_state).compare(expected)
+    assert circ.apply(q_state, use_product = True).compare(expected)
@@ -0,0 +1,129 @@
+'''
+A testing python file using the pytest framework for circuit DAGs.
+
+Tests gate supports, the commutation rules, the dependencies and layers
+of small circuits, and that reordered circuits keep their unitary.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit
+from drmd.unitary_gate import UnitaryGate, random_unitary
+from drmd.dag import CircuitDAG, gate_support, gates_commute
+
+
+def test_support():
+    """
+    Function to test the qubits gates act on non-trivially.
+    """
+    assert gate_support(gl.HADAMARD1, (3, 1)) == (3,)
+    assert gate_support(gl.Z2, (3, 1)) == (1,)
+    assert gate_support(gl.CNOT1, (0, 2)) == (0, 2)
+    assert gate_support(UnitaryGate(1j * np.eye(4)), (0, 1)) == ()
+
+
+def test_commutation():
+    """
+    Function to test the commutation rules.
+    """
+    # Disjoint supports, diagonal gates, Pauli gates
+    assert gates_commute(gl.HADAMARD1, (0, 1), gl.HADAMARD2, (0, 1))
+    assert gates_commute(gl.CZ, (0, 1), gl.T1, (1, 2))
+    assert gates_commute(gl.X1, (0, 1), gl.CNOT1, (0, 1)) is False
+    assert gates_commute(UnitaryGate(np.kron(gl.X_mat, gl.X_mat)), (0, 1),
+                         UnitaryGate(np.kron(gl.Z_mat, gl.Z_mat)), (0, 1))
+    assert not gates_commute(gl.X1, (0, 1), gl.Z1, (0, 1))
+
+    # Numerical check: the target of a CNOT commutes with X
+    assert gates_commute(gl.CNOT1, (0, 1), gl.X2, (0, 1))
+    assert gates_commute(gl.CNOT1, (0, 1), gl.X1, (1, 2))
+    assert not gates_commute(gl.CNOT1, (0, 1), gl.HADAMARD1, (1, 2))
+
+
+def test_layers():
+    """
+    Function to test dependencies and layers.
+    """
+    circ = Circuit(n_qubits = 4)
+    circ.append(gl.HADAMARD1, (0, 1))   # 0
+    circ.append(gl.HADAMARD1, (2, 3))   # 1
+    circ.append(gl.CZ, (0, 1))          # 2
+    circ.append(gl.T1, (0, 3))          # 3, commutes with CZ
+    circ.append(gl.CNOT1, (2, 3))       # 4
+    circ.append(gl.HADAMARD2, (0, 3))   # 5, on qubit 3
+
+    dag = CircuitDAG(circ)
+    assert dag.support(3) == (0,)
+    assert dag.predecessors(2) == [0]
+    assert dag.predecessors(3) == [0]
+    assert dag.predecessors(5) == [4]
+    assert dag.successors(0) == [2, 3]
+
+    layers = dag.layers()
+    assert layers == [[0, 1], [2, 4], [3, 5]]
+    assert dag.depth() == 3
+
+    for strategy in ("layers", "fusion"):
+        reordered = dag.reorder(strategy)
+        assert sorted(dag.order(strategy)) == list(range(6))
+        assert np.allclose(reordered.unitary(), circ.unitary())
+
+    with pytest.raises(ValueError):
+        dag.order("frog")
+    with pytest.raises(TypeError):
+        CircuitDAG(gl.CZ)
+
+
+def test_fusion_order():
+    """
+    Function to test that the 'fusion' order groups gates on the same
+    qubits, and keeps the unitary of random circuits.
+    """
+    circ = Circuit(n_qubits = 3)
+    circ.append(gl.CZ, (0, 1))
+    circ.append(gl.HADAMARD1, (2, 0))
+    circ.append(gl.S1, (0, 1))
+    order = CircuitDAG(circ).order("fusion")
+    assert order == [0, 2, 1]
+
+    rng = np.random.default_rng(0)
+    circ = Circuit(n_qubits = 4)
+    choices = [gl.CZ, gl.T1, gl.HADAMARD2, gl.CNOT1, gl.X1, gl.Z2]
+    for i in range(40):
+        q1, q2 = rng.choice(4, 2, replace = False)
+        circ.append(choices[rng.integers(len(choices))], (int(q1), int(q2)))
+    circ.append(random_unitary(rng = 1), (1, 3))
+
+    dag = CircuitDAG(circ)
+    for strategy in ("layers", "fusion"):
+        assert np.allclose(dag.reorder(strategy).unitary(), circ.unitary())
+    assert dag.depth() <= 41
+
+
+def test_deep_circuit():
+    """
+    Function to test that gates only depend on a few recent gates, so that
+    deep circuits build in linear time.
+    """
+    rng = np.random.default_rng(2)
+    circ = Circuit(n_qubits = 8)
+    choices = [gl.CZ, gl.T1, gl.HADAMARD2, gl.CNOT1, gl.X1, random_unitary(rng = 3)]
+    for i in range(2000):
+        q1, q2 = rng.choice(8, 2, replace = False)
+        circ.append(choices[rng.integers(len(choices))], (int(q1), int(q2)))
+
+    dag = CircuitDAG(circ)
+    assert sum(len(dag.predecessors(j)) for j in range(len(dag))) < 4 * len(dag)
+
+    # Dependencies on earlier gates are kept through the barriers
+    circ = Circuit([gl.HADAMARD1, gl.X1, gl.X1])
+    dag = CircuitDAG(circ)
+    assert dag.predecessors(2) == [0]
+    assert np.allclose(dag.reorder().unitary(), circ.unitary())
@@ -0,0 +1,130 @@
+'''
+A testing python file using the pytest framework for the on-disk cache.
+
+Tests that unitaries, metadata, circuits and JSON values survive a round
+trip through the cache directory, that entries are shared between cache
+objects, and that the size cap evicts the least recently used entries.
+'''
+import sys
+import os
+import time
+import threading
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit, random_circuit
+from drmd.disk_cache import DiskCache
+
+
+def test_round_trip(tmp_path):
+    """
+    Function to test storing and loading every kind of value.
+    """
+    cache = DiskCache(tmp_path)
+    circ = random_circuit(3, rng = 0)
+
+    assert np.allclose(cache.unitary(circ), circ.unitary())
+    assert cache.stats()["misses"] == 1
+
+    # A new object, e.g. in another process, finds the entry
+    other = DiskCache(tmp_path)
+    assert np.allclose(other.unitary(random_circuit(3, rng = 0)), circ.unitary())
+    assert other.stats()["hits"] == 1
+
+    clifford = Circuit(n_qubits = 3)
+    clifford.append(gl.HADAMARD1, (0, 1))
+    clifford.append(gl.CNOT1, (2, 1))
+    info = cache.metadata(clifford)
+    assert info == {"n_qubits": 3, "size": 2, "clifford": True,
+                    "kinds": {"diagonal": 0, "permutation": 1, "dense": 1},
+                    "pairs": [[0, 1], [2, 1]]}
+    assert other.metadata(clifford) == info
+
+    cache.put(clifford, "result", clifford)
+    loaded = other.get(clifford, "result")
+    assert loaded.compare(clifford) and loaded.n_qubits() == 3
+
+    assert cache.lookup(circ, "score", lambda: {"cost": 1.5}) == {"cost": 1.5}
+    assert other.lookup(circ, "score", lambda: None) == {"cost": 1.5}
+    assert other.get(circ, "missing", "default") == "default"
+    assert len(cache) == 4
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_eviction(tmp_path):
+    """
+    Function to test that the least recently used entries are evicted.
+    """
+    circuits = [random_circuit(1, rng = seed) for seed in range(4)]
+    sizes = []
+    cache = DiskCache(tmp_path)
+    for circ in circuits[:2]:
+        cache.unitary(circ)
+        sizes.append(cache.stats()["bytes"])
+
+    cache = DiskCache(tmp_path, max_bytes = 2 * sizes[0] + 10)
+    time.sleep(0.01)
+    cache.unitary(circuits[0])  # hit, now more recently used than 1
+    time.sleep(0.01)
+    cache.unitary(circuits[2])
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get(circuits[1], "unitary") is None
+    assert cache.get(circuits[0], "unitary") is not None
+
+    # An entry larger than the cap is kept until the next one arrives
+    tiny = DiskCache(tmp_path, max_bytes = 1)
+    tiny.unitary(circuits[3])
+    assert len(tiny) == 1
+
+
+def test_concurrent(tmp_path):
+    """
+    Function to test that concurrent writers keep the cache within its cap.
+    """
+    circuits = [random_circuit(2, rng = seed) for seed in range(20)]
+    probe = DiskCache(tmp_path / "probe")
+    probe.unitary(circuits[0])
+    entry = probe.stats()["bytes"]
+    failures = []
+
+    def work(offset):
+        cache = DiskCache(tmp_path / "shared", max_bytes = 5 * entry)
+        for i in range(20):
+            circ = circuits[(i + offset) % 20]
+            if not np.allclose(cache.unitary(circ), circ.unitary()):
+                failures.append(circ)
+
+    threads = [threading.Thread(target = work, args = (k,)) for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not failures
+    assert DiskCache(tmp_path / "shared").stats()["bytes"] <= 5 * entry
+    assert not [name for name in os.listdir(tmp_path / "shared") if name.endswith(".tmp")]
+
+
+def test_errors(tmp_path):
+    """
+    Function to test the errors raised on invalid inputs.
+    """
+    cache = DiskCache(tmp_path)
+    circ = Circuit([gl.CNOT1])
+
+    with pytest.raises(ValueError):
+        DiskCache(tmp_path, max_bytes = 0)
+    with pytest.raises(TypeError):
+        cache.get("frog", "unitary")
+    with pytest.raises(ValueError):
+        cache.put(circ, "../escape", 1)
+    with pytest.raises(TypeError):
+        cache.put(circ, "value", object())
@@ -0,0 +1,100 @@
+'''
+A testing python file using the pytest framework for state distances.
+
+Tests fidelity, trace distance and phase-insensitive comparison of
+states, row by row and pairwise, and the phase option of
+QubitState.compare.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import distance
+from drmd.qubit_state import QubitState
+from drmd.distance import fidelity, trace_distance, equal_up_to_phase
+
+
+def random_states(rng, n):
+    """
+    Function returning n random normalised two-qubit states.
+    """
+    states = rng.normal(size = (n, 4)) + 1j * rng.normal(size = (n, 4))
+    return states / np.linalg.norm(states, axis = 1, keepdims = True)
+
+
+def test_pairs():
+    """
+    Function to test row by row comparisons against explicit loops.
+    """
+    rng = np.random.default_rng(0)
+    a = random_states(rng, 20)
+    b = random_states(rng, 20)
+    phases = np.exp(1j * rng.uniform(0, 2 * np.pi, 20))[:, None]
+
+    expected = [abs(np.vdot(x, y)) ** 2 for x, y in zip(a, b)]
+    assert np.allclose(fidelity(a, b), expected)
+    assert np.allclose(trace_distance(a, b), np.sqrt(1 - np.array(expected)))
+    assert np.allclose(fidelity(a, 3 * a * phases), 1)
+    assert np.allclose(trace_distance(a, a * phases), 0)
+
+    assert equal_up_to_phase(a, 2 * a * phases).all()
+    assert not equal_up_to_phase(a, b).any()
+
+    # A single state against a batch, and unnormalised inputs
+    assert np.allclose(fidelity(a[0], b), [abs(np.vdot(a[0], y)) ** 2 for y in b])
+    assert fidelity([1, 0, 0, 0], [1, 1, 0, 0]) == pytest.approx(0.5)
+    assert trace_distance(QubitState([1, 0, 0, 0]), [0, 1, 0, 0]) == pytest.approx(1)
+    assert equal_up_to_phase([1, 1j, 0, 0], [1j, -1, 0, 0]) is True
+
+
+def test_pairwise(monkeypatch):
+    """
+    Function to test all-pairs comparisons, including in several chunks.
+    """
+    rng = np.random.default_rng(1)
+    a = random_states(rng, 7)
+    b = np.concatenate([random_states(rng, 4), 1j * a[2:3]])
+
+    overlaps = fidelity(a, b, pairwise = True)
+    assert overlaps.shape == (7, 5)
+    assert np.allclose(overlaps, np.abs(a.conj() @ b.T) ** 2)
+    assert np.allclose(trace_distance(a, b, pairwise = True), np.sqrt(1 - overlaps))
+
+    expected = np.zeros((7, 5), dtype = bool)
+    expected[2, 4] = True
+    assert np.array_equal(equal_up_to_phase(a, b, pairwise = True), expected)
+
+    monkeypatch.setattr(distance, "_CHUNK_ENTRIES", 8)
+    assert np.array_equal(equal_up_to_phase(a, b, pairwise = True), expected)
+
+
+def test_compare():
+    """
+    Function to test QubitState.compare with and without phases.
+    """
+    state = QubitState([1, 1j, 0, 0])
+    assert state.compare([1, 1j, 0, 0])
+    assert not state.compare([1j, -1, 0, 0])
+    assert state.compare([1j, -1, 0, 0], up_to_phase = True)
+    assert state.compare(QubitState([-1, -1j, 0, 0]), up_to_phase = True)
+
+    for wrong in ([0, 0, 0, 0], [1, 0], ["a", "b", "c", "d"], 5):
+        with pytest.raises(ValueError):
+            state.compare(wrong)
+
+
+def test_errors():
+    """
+    Function to test the errors raised on invalid inputs.
+    """
+    with pytest.raises(ValueError):
+        fidelity(np.ones((3, 4)), np.ones((2, 4)))
+    with pytest.raises(ValueError):
+        trace_distance(np.ones((3, 4)), np.zeros(4))
+    with pytest.raises(TypeError):
+        equal_up_to_phase("frog", np.ones(4))
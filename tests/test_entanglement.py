@@ -0,0 +1,83 @@
+'''
+A testing python file using the pytest framework for entanglement measures.
+
+Tests reduced density matrices, purity, entropy and concurrence on known
+product and entangled states, and that batches agree with the explicit
+partial trace of each state.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd.qubit_state import QubitState
+from drmd.entanglement import reduced_density_matrix, purity, entropy, concurrence
+
+
+def test_known_states():
+    """
+    Function to test the measures of product and Bell states.
+    """
+    product = QubitState([1, 1], [1, 0])
+    bell = QubitState([1, 0, 0, 1])
+
+    assert np.allclose(product.reduced_density_matrix(1), [[0.5, 0.5], [0.5, 0.5]])
+    assert np.allclose(product.reduced_density_matrix(2), [[1, 0], [0, 0]])
+    assert np.isclose(product.concurrence(), 0)
+    assert np.isclose(product.purity(), 1)
+    assert np.isclose(product.entropy(), 0)
+
+    assert np.allclose(bell.reduced_density_matrix(2), np.eye(2) / 2)
+    assert np.isclose(bell.concurrence(), 1)
+    assert np.isclose(bell.purity(), 0.5)
+    assert np.isclose(bell.entropy(), 1)
+    assert np.isclose(bell.entropy(base = np.e), np.log(2))
+
+    # Unnormalised arrays are normalised
+    assert np.isclose(concurrence(np.array([0, 3j, 3, 0])), 1)
+
+
+def test_batch():
+    """
+    Function to test batches against the explicit partial trace.
+    """
+    rng = np.random.default_rng(0)
+    states = rng.normal(size = (50, 4)) + 1j * rng.normal(size = (50, 4))
+    states /= np.linalg.norm(states, axis = 1, keepdims = True)
+
+    rho1 = reduced_density_matrix(states, 1)
+    rho2 = reduced_density_matrix(states, 2)
+    assert rho1.shape == (50, 2, 2)
+
+    for i, psi in enumerate(states):
+        full = np.outer(psi, psi.conj()).reshape(2, 2, 2, 2)
+        assert np.allclose(rho1[i], np.einsum('abcb->ac', full))
+        assert np.allclose(rho2[i], np.einsum('abad->bd', full))
+
+        spectrum = np.linalg.eigvalsh(rho1[i])
+        spectrum = spectrum[spectrum > 1e-15]
+        assert np.isclose(entropy(states)[i], -np.sum(spectrum * np.log2(spectrum)))
+
+    assert np.allclose(purity(states), np.einsum('nab,nba->n', rho1, rho1).real)
+    assert np.allclose(purity(states), np.einsum('nab,nba->n', rho2, rho2).real)
+    assert np.all((concurrence(states) >= 0) & (concurrence(states) <= 1))
+
+
+def test_errors():
+    """
+    Function to test the errors raised on invalid inputs.
+    """
+    with pytest.raises(TypeError):
+        concurrence("frog")
+    with pytest.raises(ValueError):
+        concurrence(np.zeros((2, 4)))
+    with pytest.raises(ValueError):
+        purity(np.ones((2, 3)))
+    with pytest.raises(ValueError):
+        reduced_density_matrix(np.ones(4), 3)
+    with pytest.raises(ValueError):
+        entropy(np.ones(4), base = 1)
@@ -0,0 +1,143 @@
+'''
+A testing python file using the pytest framework for gate fusion.
+
+Tests that fused circuits keep the unitary and the action on batches of
+states of the original circuits, with blocks of at most k qubits.
+'''
+import sys
+import os
+import time
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit
+from drmd.qubit_state import QubitState
+from drmd.unitary_gate import random_unitary
+from drmd.fusion import fuse, FusedCircuit
+
+
+def _random_circuit(n_qubits, depth, rng):
+    """
+    Builds a circuit of random and standard gates on random pairs of qubits.
+    """
+    gates = [gl.HADAMARD1, gl.CNOT1, gl.T2, gl.CZ, gl.SWAP]
+    circuit = Circuit(n_qubits = n_qubits)
+    for i in range(depth):
+        pair = tuple(int(q) for q in rng.choice(n_qubits, 2, replace = False))
+        unitary = random_unitary(rng = rng) if i % 3 == 0 else gates[i % len(gates)]
+        circuit.append(unitary, pair)
+    return circuit
+
+
+@pytest.mark.parametrize("max_qubits", [2, 3, 4, 5])
+def test_fused_unitary(max_qubits):
+    """
+    Function to test that fusion keeps the unitary and bounds block sizes.
+    """
+    rng = np.random.default_rng(3)
+    circuit = _random_circuit(5, 30, rng)
+
+    for reorder in (True, False):
+        fused = fuse(circuit, max_qubits = max_qubits, reorder = reorder)
+        assert type(fused) is FusedCircuit
+        assert np.allclose(fused.unitary(), circuit.unitary())
+        assert all(len(qubits) <= max_qubits for qubits, _ in fused.blocks())
+        assert fused.stats()["gates"] == 30
+        assert fused.stats()["blocks"] == len(fused) <= 30
+
+
+def test_fused_apply():
+    """
+    Function to test applying fused circuits to states and batches.
+    """
+    rng = np.random.default_rng(4)
+    circuit = _random_circuit(6, 40, rng)
+    fused = fuse(circuit, max_qubits = 4)
+
+    states = rng.normal(size = (5, 64)) + 1j * rng.normal(size = (5, 64))
+    original = states.copy()
+    assert np.allclose(fused.apply(states), circuit.apply(states))
+    assert np.allclose(fused.apply(states[0]), circuit.apply(states[0]))
+    assert np.array_equal(states, original)
+
+    with pytest.raises(ValueError):
+        fused.apply(np.ones(32))
+    with pytest.raises(TypeError):
+        fused.apply([1, 0])
+
+    # QubitState inputs on two qubits
+    pair = fuse(Circuit([gl.HADAMARD1, gl.CNOT1]))
+    out = pair.apply(QubitState([1, 0], [1, 0]))
+    assert np.allclose(out.get_initial(), [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)])
+
+    # Collapsed states are applied from their current amplitudes
+    collapsed = QubitState([1, 1, 1, 1])
+    collapsed.measure_collapse(rng = 0)
+    assert pair.apply(collapsed).compare(Circuit([gl.HADAMARD1, gl.CNOT1]).apply(collapsed))
+
+
+def test_fewer_blocks():
+    """
+    Function to test that gates on the same qubits are fused together.
+    """
+    # A ladder of single-qubit and CNOT gates on 4 qubits
+    circuit = Circuit(n_qubits = 4)
+    for q in range(3):
+        circuit.append(gl.HADAMARD1, (q, q + 1))
+        circuit.append(gl.CNOT1, (q, q + 1))
+        circuit.append(gl.T2, (q, q + 1))
+
+    assert len(fuse(circuit, max_qubits = 2)) == 3
+    assert len(fuse(circuit, max_qubits = 4)) == 1
+    assert fuse(circuit, max_qubits = 3).stats()["max_qubits"] == 3
+
+    # Single-qubit gates only count the qubit they act on
+    single = Circuit([gl.HADAMARD1, gl.X1, gl.T1], n_qubits = 4)
+    single.append(gl.X2, (2, 3))
+    fused = fuse(single, max_qubits = 2)
+    assert len(fused) == 2
+    assert fused.stats()["max_qubits"] == 1
+    assert np.allclose(fused.unitary(), single.unitary())
+
+
+def test_fuse_errors():
+    """
+    Function to test invalid arguments.
+    """
+    with pytest.raises(TypeError):
+        fuse(np.eye(4))
+    with pytest.raises(ValueError):
+        fuse(Circuit([gl.CNOT1]), max_qubits = 1)
+    with pytest.raises(ValueError):
+        fuse(Circuit([gl.CNOT1]), max_qubits = 2.5)
+
+
+def test_deep_circuit():
+    """
+    Function to test that fusing deep circuits costs about as much as
+    applying them gate by gate, with or without reordering.
+    """
+    rng = np.random.default_rng(5)
+    gates = [gl.CZ, gl.T1, gl.HADAMARD2, gl.CNOT1, gl.SWAP]
+    circuit = Circuit(n_qubits = 10)
+    for i in range(3000):
+        pair = tuple(int(q) for q in rng.choice(10, 2, replace = False))
+        circuit.append(gates[i % len(gates)], pair)
+    state = np.zeros(2 ** 10, dtype = complex)
+    state[0] = 1
+
+    start = time.perf_counter()
+    expected = circuit.apply(state)
+    elapsed = time.perf_counter() - start
+
+    for reorder in (False, True):
+        start = time.perf_counter()
+        fused = fuse(circuit, max_qubits = 4, reorder = reorder)
+        # Linear in the depth; quadratic passes take tens of seconds here
+        assert time.perf_counter() - start < 20 * elapsed + 2
+        assert np.allclose(fused.apply(state), expected)
@@ -0,0 +1,127 @@
+'''
+A testing python file using the pytest framework for the gate_list module
+and the layout of the drmd package.
+
+Tests that the predefined gates are constructed on demand and cached,
+and that importing the package does not load heavy dependencies.
+Also tests the gate structure helpers and the gate registry.
+'''
+import sys
+import os
+import subprocess
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+import drmd
+from drmd import gate_list as gl
+from drmd.unitary_gate import UnitaryGate
+from drmd import structure as st
+from drmd.gate_registry import get_registry
+
+
+def test_lazy_import():
+    """
+    Function to test that 'import drmd' works as a package and does not
+    import scipy.stats until a random unitary is requested.
+    """
+    base = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    code = ("import sys, drmd\n"
+            "drmd.Circuit\n"
+            "assert 'scipy.stats' not in sys.modules\n"
+            "drmd.random_unitary()\n"
+            "assert 'scipy.stats' in sys.modules\n")
+    result = subprocess.run([sys.executable, "-c", code], cwd = base,
+                            capture_output = True, text = True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_package_exports():
+    """
+    Function to test that the main classes are available from the package.
+    """
+    assert drmd.UnitaryGate is UnitaryGate
+    assert drmd.gate_list is gl
+    assert "Circuit" in dir(drmd)
+
+    with pytest.raises(AttributeError):
+        drmd.not_a_class
+
+
+def test_gate_cache():
+    """
+    Function to test that gates are built once and then cached.
+    """
+    assert gl.HADAMARD1 is gl.HADAMARD1
+    assert np.allclose(gl.CNOT1._matrix, gl.C1NOT2)
+
+    names = gl.list_unitary_gates()
+    assert "X1" in names and "CNOT2" in names
+    assert all(isinstance(getattr(gl, name), UnitaryGate) for name in names)
+
+    with pytest.raises(AttributeError):
+        gl.NOT_A_GATE
+
+
+def test_structure():
+    """
+    Function to test the detection of diagonal, permutation
+    and Clifford gates on known examples.
+    """
+    assert st.is_diagonal(gl.CZ_mat)
+    assert not st.is_diagonal(gl.C1NOT2)
+
+    perm, phases = st.monomial_form(np.kron(gl.Y_mat, gl.I_mat))
+    state = np.array([1, 2, 3, 4])
+    assert np.allclose(phases * state[perm], gl.Y1.apply(state))
+    assert st.monomial_form(gl.HADAMARD1._matrix) is None
+
+    assert st.is_clifford(gl.HADAMARD2._matrix)
+    assert st.is_clifford(gl.CNOT1._matrix)
+    assert not st.is_clifford(gl.T1._matrix)
+
+    # CNOT1 maps X on qubit 1 (label 1) to X on both qubits (label 5)
+    images, signs = st.clifford_table(gl.CNOT1._matrix)
+    assert images[1] == 5 and signs[1] == 0
+
+
+def test_registry():
+    """
+    Function to test lookup, conjugates, fused pairs
+    and metadata of the gate registry.
+    """
+    registry = get_registry()
+    assert registry is get_registry()  # built only once
+
+    assert registry.get("CNOT1") is gl.CNOT1
+    assert registry.info("X1").dagger == "X1"
+    assert registry.dagger("S1").compare(gl.S1.dagger())
+    assert registry.info("T2_DAG").dagger == "T2"
+    assert registry.identify(gl.SWAP) == "SWAP"
+    assert registry.identify(np.kron(gl.H_mat, gl.H_mat)) is None
+
+    info = registry.info("CZ")
+    assert info.diagonal and info.permutation and info.clifford
+    info = registry.info("T1")
+    assert info.diagonal and not info.clifford
+    info = registry.info("HADAMARD1")
+    assert not info.diagonal and not info.permutation and info.clifford
+
+    # The metadata is the gate's own
+    for name in registry.names():
+        info = registry.info(name)
+        assert info.diagonal == info.gate.is_diagonal()
+        assert info.permutation == info.gate.is_permutation()
+        assert info.clifford == info.gate.is_clifford()
+
+    # Fused gate applies the first gate, then the second
+    fused = registry.fused("HADAMARD1", "CNOT1")
+    state = np.array([1, 0, 0, 0])
+    assert np.allclose(fused.apply(state), gl.CNOT1.apply(gl.HADAMARD1.apply(state)))
+    assert fused is registry.fused("HADAMARD1", "CNOT1")
+
+    with pytest.raises(KeyError, match = "No gate named"):
+        registry.get("NOT_A_GATE")
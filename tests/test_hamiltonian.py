@@ -0,0 +1,115 @@
+'''
+A testing python file using the pytest framework for Hamiltonians.
+
+Tests Pauli string and matrix Hamiltonians, evolution operators and
+evolved states for arrays of times, and Trotter circuits.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+from scipy.linalg import expm
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit
+from drmd.unitary_gate import UnitaryGate
+from drmd.hamiltonian import Hamiltonian, pauli_string
+
+ISING = {"ZZ": 1.0, "XI": 0.5, "IX": 0.5}
+
+
+def test_construction():
+    """
+    Function to test Hamiltonians from Pauli strings and matrices.
+    """
+    h = Hamiltonian(ISING)
+    expected = np.kron(gl.Z_mat, gl.Z_mat) + 0.5 * np.kron(gl.X_mat, gl.I_mat) + \
+               0.5 * np.kron(gl.I_mat, gl.X_mat)
+    assert h.n_qubits() == 2
+    assert np.allclose(h.matrix(), expected)
+
+    # Matrices are decomposed back into Pauli strings
+    g = Hamiltonian(expected)
+    assert g.terms().keys() == ISING.keys()
+    assert all(np.isclose(g.terms()[s], c) for s, c in ISING.items())
+    assert np.allclose(g.eigenvalues(), np.linalg.eigvalsh(expected))
+
+    assert np.allclose(pauli_string("XY"), np.kron(gl.X_mat, gl.Y_mat))
+
+    with pytest.raises(ValueError):
+        Hamiltonian({"ZZ": 1.0, "X": 1.0})
+    with pytest.raises(ValueError):
+        Hamiltonian({"ZQ": 1.0})
+    with pytest.raises(ValueError):
+        Hamiltonian({"ZZ": 1j})
+    with pytest.raises(ValueError):
+        Hamiltonian(np.array([[0, 1], [0, 0]]))
+    with pytest.raises(ValueError):
+        Hamiltonian(np.eye(3))
+    with pytest.raises(TypeError):
+        Hamiltonian("ZZ")
+
+
+def test_evolution():
+    """
+    Function to test evolution operators and states for arrays of times.
+    """
+    h = Hamiltonian(ISING)
+    times = np.linspace(0, 3, 7)
+
+    operators = h.evolution(times)
+    assert operators.shape == (7, 4, 4)
+    for t, op in zip(times, operators):
+        assert np.allclose(op, expm(-1j * t * h.matrix()))
+    assert np.allclose(h.evolution(1.5), expm(-1.5j * h.matrix()))
+
+    rng = np.random.default_rng(0)
+    states = rng.normal(size = (5, 4)) + 1j * rng.normal(size = (5, 4))
+    evolved = h.evolve(states, times)
+    assert evolved.shape == (7, 5, 4)
+    assert np.allclose(evolved, np.einsum('tij,nj->tni', operators, states))
+    assert np.allclose(h.evolve(states[0], times), evolved[:, 0])
+
+    gates = h.gates(times)
+    assert type(gates[0]) is UnitaryGate
+    assert np.allclose(gates[3]._matrix, operators[3])
+    circuits = h.circuits(times)
+    assert np.allclose(circuits[-1].unitary(), operators[-1])
+
+    with pytest.raises(ValueError):
+        h.evolve(np.ones(8), times)
+
+
+def test_trotter():
+    """
+    Function to test Trotter circuits, on 2 and on more qubits.
+    """
+    h = Hamiltonian(ISING)
+    exact = h.evolution(1.0)
+
+    # Commuting terms are exact in one step
+    assert np.allclose(Hamiltonian({"ZZ": 1.0, "ZI": 0.3}).trotter(1.0, 1, 1).unitary(),
+                       expm(-1j * np.diag([1.3, -0.7, -1.3, 0.7])))
+
+    first = np.linalg.norm(h.trotter(1.0, 20, order = 1).unitary() - exact, 2)
+    second = np.linalg.norm(h.trotter(1.0, 20, order = 2).unitary() - exact, 2)
+    assert second < first < 0.1
+
+    # A chain of 4 qubits
+    chain = Hamiltonian({"ZZII": 1.0, "IZZI": 1.0, "IIZZ": 1.0,
+                         "XIII": 0.7, "IXII": 0.7, "IIXI": 0.7, "IIIX": 0.7})
+    circuit = chain.trotter(0.5, 10)
+    assert type(circuit) is Circuit and circuit.n_qubits() == 4
+    assert np.linalg.norm(circuit.unitary() - chain.evolution(0.5), 2) < 1.e-2
+    assert len(chain.circuits([0.1, 0.2], steps = 2)) == 2
+
+    with pytest.raises(ValueError):
+        Hamiltonian({"ZZZ": 1.0}).trotter(1.0)
+    with pytest.raises(ValueError):
+        h.trotter(1.0, 0)
+    with pytest.raises(ValueError):
+        chain.gates([1.0])
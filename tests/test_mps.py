@@ -0,0 +1,170 @@
+'''
+A testing python file using the pytest framework for the MPSState class
+and the matrix-product-state backend of the Circuit class.
+
+Random circuits are simulated both as matrix product states and as dense
+state vectors, and the states, expectation values and samples are compared.
+The effect of truncations and the simulation of many qubits are also tested.
+'''
+import sys
+import os
+import warnings
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+from scipy.stats import unitary_group as ug
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit
+from drmd.unitary_gate import UnitaryGate
+from drmd.mps import MPSState
+
+
+def random_circuit_on(n_qubits, depth, rng):
+    """
+    Helper building a circuit of random unitaries on random pairs of qubits.
+    """
+    circ = Circuit(n_qubits = n_qubits)
+    for _ in range(depth):
+        gate = UnitaryGate(ug.rvs(4, random_state = rng))
+        qubits = tuple(int(q) for q in rng.choice(n_qubits, 2, replace = False))
+        circ.append(gate, qubits)
+    return circ
+
+
+def test_init():
+    """
+    Function to test the initial state |0...0> and input checks.
+    """
+    state = MPSState(3)
+    assert state.n_qubits() == 3
+    assert state.bond_dimensions() == [1, 1]
+    assert np.allclose(state.to_statevector(), np.eye(8)[0])
+
+    with pytest.raises(ValueError, match = "positive integer"):
+        MPSState(0)
+
+    with pytest.raises(ValueError, match = "bond dimension"):
+        MPSState(3, max_bond = 0)
+
+    with pytest.raises(ValueError, match = "two distinct qubits"):
+        state.apply_gate(gl.CNOT1, (0, 3))
+
+
+def test_against_statevector():
+    """
+    Function to test on random circuits, with gates on distant and
+    reversed pairs of qubits, that the MPS matches the state vector.
+    """
+    rng = np.random.default_rng(5)
+
+    for _ in range(5):
+        circ = random_circuit_on(5, 12, rng)
+        dense = circ.simulate(backend = "statevector")
+        mps = circ.simulate(backend = "mps", max_bond = 32, max_error = 0.0)
+
+        assert type(mps) is MPSState
+        assert np.allclose(mps.to_statevector(), dense)
+        assert mps.truncation_error() < 1.e-12
+
+
+def test_expectation():
+    """
+    Function to test expectation values of Pauli strings, single-qubit
+    and two-qubit observables against the state vector.
+    """
+    rng = np.random.default_rng(6)
+    circ = random_circuit_on(4, 10, rng)
+    dense = circ.simulate(backend = "statevector")
+    mps = circ.simulate(backend = "mps")
+
+    def dense_expectation(ops):
+        full = np.array([[1]])
+        for op in ops:
+            full = np.kron(full, op)
+        return np.vdot(dense, full @ dense)
+
+    I, X, Y, Z = gl.I_mat, gl.X_mat, gl.Y_mat, gl.Z_mat
+    assert np.isclose(mps.expectation("ZIXY"), dense_expectation([Z, I, X, Y]))
+    assert np.isclose(mps.expectation(X, 2), dense_expectation([I, I, X, I]))
+
+    # Two-qubit observable on qubits (3, 1): first factor on qubit 3
+    obs = np.kron(Z, X)
+    expected = dense_expectation([I, X, I, Z])
+    assert np.isclose(mps.expectation(obs, (3, 1)), expected)
+    assert np.isclose(mps.expectation(UnitaryGate(obs), (3, 1)), expected)
+
+    # Projectors with no overlap give 0, not nan
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert MPSState(3).expectation(np.diag([0, 0, 0, 1.]), (0, 1)) == 0
+        projector = np.diag([0, 0, 1., 0])
+        assert np.isclose(mps.expectation(projector, (3, 1)),
+                          dense_expectation([I, np.diag([1., 0]), I, np.diag([0, 1.])]))
+
+    with pytest.raises(ValueError, match = "Pauli strings"):
+        mps.expectation("ZZ")
+
+    with pytest.raises(ValueError, match = "needs the qubit"):
+        mps.expectation(Z)
+
+
+def test_sample():
+    """
+    Function to test that sampled frequencies match the probabilities
+    of the state vector.
+    """
+    rng = np.random.default_rng(7)
+    circ = random_circuit_on(3, 6, rng)
+    probs = np.abs(circ.simulate(backend = "statevector")) ** 2
+
+    samples = circ.sample(shots = 20000, backend = "mps")
+    assert samples.shape == (20000, 3)
+
+    outcomes = samples @ np.array([4, 2, 1])
+    freqs = np.bincount(outcomes, minlength = 8) / 20000
+    assert np.allclose(freqs, probs, atol = 0.02)
+
+
+def test_truncation():
+    """
+    Function to test that the bond dimension is capped, and that the
+    discarded weight is recorded.
+    """
+    rng = np.random.default_rng(8)
+    circ = random_circuit_on(6, 20, rng)
+
+    mps = circ.simulate(backend = "mps", max_bond = 2)
+    assert max(mps.bond_dimensions()) <= 2
+    assert mps.truncation_error() > 0
+
+    # The truncated state is still normalised
+    assert np.isclose(np.linalg.norm(mps.to_statevector()), 1)
+    assert np.isclose(mps.overlap(mps), 1)
+
+
+def test_many_qubits():
+    """
+    Function to test a shallow circuit of local gates on 60 qubits,
+    out of reach of a state vector, and the choice of the 'auto' backend.
+    """
+    rng = np.random.default_rng(9)
+    n_qubits = 60
+    circ = Circuit(n_qubits = n_qubits)
+
+    # Two layers of random gates on neighbouring qubits
+    for start in (0, 1):
+        for q in range(start, n_qubits - 1, 2):
+            circ.append(UnitaryGate(ug.rvs(4, random_state = rng)), (q, q + 1))
+    circ.append(gl.T1, (0, 1))
+
+    mps = circ.simulate()
+    assert type(mps) is MPSState
+    assert max(mps.bond_dimensions()) <= 16
+
+    assert mps.sample(10).shape == (10, n_qubits)
+    assert np.isclose(mps.expectation("I" * n_qubits), 1)
+    assert abs(mps.expectation("Z" + "I" * (n_qubits - 1))) <= 1
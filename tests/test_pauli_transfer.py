@@ -0,0 +1,138 @@
+'''
+A testing python file using the pytest framework for Pauli transfer matrices.
+
+Tests that PTMs of gates, circuits and Kraus channels act on Pauli vectors
+like the channels act on states, batched composition, and fidelities.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit, random_circuit
+from drmd.unitary_gate import random_unitary
+from drmd.pauli_transfer import (PauliTransferMatrix, unitary_ptm, kraus_ptm, compose,
+                                 pauli_vector, density_matrix, process_fidelity,
+                                 average_gate_fidelity)
+
+
+def _states(n, seed):
+    """
+    Returns n random normalised two-qubit states.
+    """
+    rng = np.random.default_rng(seed)
+    states = rng.normal(size = (n, 4)) + 1j * rng.normal(size = (n, 4))
+    return states / np.linalg.norm(states, axis = 1)[:, None]
+
+
+def test_pauli_vectors():
+    """
+    Function to test the conversions between states and Pauli vectors.
+    """
+    states = _states(5, 0)
+    vectors = pauli_vector(states)
+    assert vectors.shape == (5, 16)
+    assert np.allclose(vectors[:, 0], 1)
+
+    rho = np.einsum('na,nb->nab', states, states.conj())
+    assert np.allclose(density_matrix(vectors), rho)
+    assert np.allclose(pauli_vector(rho), vectors)
+    assert np.allclose(pauli_vector(states[0]), vectors[0])
+
+    with pytest.raises(ValueError):
+        pauli_vector(np.ones(3))
+
+
+def test_unitary_channels():
+    """
+    Function to test the PTMs of gates and circuits.
+    """
+    states = _states(4, 1)
+    circuit = random_circuit(20, rng = 2)
+    circuit.append(gl.CNOT1, (1, 0))
+
+    channel = PauliTransferMatrix(circuit)
+    assert channel.is_unitary() and channel.is_unital()
+    assert np.allclose(channel.apply(pauli_vector(states)), pauli_vector(circuit.apply(states)))
+    assert np.allclose(channel.matrix(), unitary_ptm(circuit.unitary()))
+    assert process_fidelity(channel, circuit.unitary()) == pytest.approx(1)
+
+    # Composition, as matrices and in order of application
+    h, cnot = PauliTransferMatrix(gl.HADAMARD1), PauliTransferMatrix(gl.CNOT1)
+    bell = PauliTransferMatrix(Circuit([gl.HADAMARD1, gl.CNOT1]))
+    assert np.allclose((cnot @ h).matrix(), bell.matrix())
+    assert np.allclose(h.then(cnot).matrix(), bell.matrix())
+
+    # Batched PTMs of unitaries
+    matrices = np.array([random_unitary(rng = i)._matrix for i in range(3)])
+    assert np.allclose(unitary_ptm(matrices)[1], unitary_ptm(matrices[1]))
+
+
+def test_noise_channels():
+    """
+    Function to test Kraus and built-in noise channels.
+    """
+    states = _states(3, 3)
+    rho = np.einsum('na,nb->nab', states, states.conj())
+
+    depolarizing = PauliTransferMatrix.depolarizing(0.2)
+    out = density_matrix(depolarizing.apply(pauli_vector(states)))
+    assert np.allclose(out, 0.8 * rho + 0.2 * np.eye(4) / 4)
+
+    # Amplitude damping of the first qubit sends |10> to |00>
+    damping = PauliTransferMatrix.amplitude_damping(1.0, 1)
+    assert not damping.is_unital()
+    out = density_matrix(damping.apply(pauli_vector(np.array([0, 0, 1, 0]))))
+    assert np.allclose(out, np.diag([1, 0, 0, 0]))
+
+    # Kraus operators give the same channel
+    kraus = np.array([np.sqrt(0.7) * np.eye(4), np.sqrt(0.3) * np.kron(np.eye(2), gl.Z_mat)])
+    assert np.allclose(PauliTransferMatrix(kraus).matrix(),
+                       PauliTransferMatrix.dephasing(0.3, 2).matrix())
+    assert np.allclose(kraus_ptm(kraus), PauliTransferMatrix(kraus).matrix())
+
+    with pytest.raises(ValueError):
+        kraus_ptm(np.array([np.eye(4), np.eye(4)]))
+    with pytest.raises(ValueError):
+        PauliTransferMatrix.dephasing(0.1, 3)
+    with pytest.raises(ValueError):
+        PauliTransferMatrix.depolarizing(2)
+    with pytest.raises(TypeError):
+        PauliTransferMatrix("frog")
+
+
+def test_noisy_circuits():
+    """
+    Function to test noisy circuits and batched composition.
+    """
+    circuit = Circuit([gl.HADAMARD1, gl.CNOT1, gl.T2, gl.SWAP, gl.CZ])
+    noise = PauliTransferMatrix.depolarizing(0.01)
+    noisy = PauliTransferMatrix.from_circuit(circuit, noise = noise)
+
+    # Depolarizing noise commutes with unitaries
+    expected = (1 - 0.01) ** 5 * 15 / 16 + 1 / 16
+    assert process_fidelity(noisy, circuit.unitary()) == pytest.approx(expected)
+    assert average_gate_fidelity(noisy, np.eye(4)) < 1
+
+    # Stacks of sequences of odd length
+    ptms = unitary_ptm(np.array([random_unitary(rng = i)._matrix for i in range(14)]))
+    sequences = ptms.reshape(2, 7, 16, 16)
+    composed = compose(sequences)
+    for s in range(2):
+        product = np.eye(16)
+        for matrix in sequences[s]:
+            product = matrix @ product
+        assert np.allclose(composed[s], product)
+
+    fidelities = process_fidelity(composed, composed[0])
+    assert fidelities.shape == (2,) and fidelities[0] == pytest.approx(1)
+
+    with pytest.raises(ValueError):
+        PauliTransferMatrix.from_circuit(Circuit(n_qubits = 3))
+    with pytest.raises(ValueError):
+        compose(np.eye(16))
@@ -0,0 +1,120 @@
+'''
+A testing python file using the pytest framework for precision control.
+
+Tests that states, gates, circuits and matrix product states created with
+an explicit or default precision keep it through every operation, that
+the dtypes inferred by NumPy are kept otherwise, and that complex64
+results agree with complex128 ones to single precision.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit, random_circuit
+from drmd.mps import MPSState
+from drmd.precision import (as_precision, get_precision, set_precision,
+                            use_precision)
+from drmd.qubit_state import QubitState
+from drmd.unitary_gate import UnitaryGate, random_unitary
+
+
+def test_as_precision():
+    """
+    Function to test the names accepted for precisions.
+    """
+    assert as_precision("single") == np.complex64
+    assert as_precision(np.complex128) == np.complex128
+    assert as_precision("infer") is None and as_precision(None) is None
+
+    for invalid in ("float32", np.float64, "quad", 3):
+        with pytest.raises(ValueError):
+            as_precision(invalid)
+
+
+def test_objects():
+    """
+    Function to test that states and gates keep their precision through
+    copies, measurements and applications.
+    """
+    state = QubitState([1, 0, 0, 1], dtype = "complex64")
+    assert state.peek().dtype == np.complex64
+    assert state.copy().peek().dtype == np.complex64
+    assert all(out.peek().dtype == np.complex64 for out, _ in state.measure_stats(1))
+
+    # Without a precision, inferred dtypes are kept
+    assert QubitState([1, 0, 0, 0]).peek().dtype.kind == "i"
+    assert QubitState([1, 0, 0, 0]).precision() is None
+
+    gate = UnitaryGate(gl.H_mat, gl.I_mat, dtype = np.complex64)
+    assert gate._matrix.dtype == np.complex64
+    assert gate.copy().precision() == np.complex64
+    assert gate.dagger()._matrix.dtype == np.complex64
+    assert gate.astype("complex128")._matrix.dtype == np.complex128
+
+    assert gate.apply(np.array([1, 0, 0, 0])).dtype == np.complex64
+    assert gate.apply(QubitState([1, 0, 0, 0])).precision() == np.complex64
+    assert gl.CNOT1.apply(state).precision() == np.complex64
+    assert gl.CZ.apply_to_qubits(np.ones((3, 8)), (0, 2)).dtype.kind == "f"
+
+    with pytest.raises(ValueError):
+        QubitState([1, 0, 0, 0], dtype = "int")
+
+
+def test_circuits():
+    """
+    Function to test that circuits cast their gates and input states,
+    and agree with double precision to single precision.
+    """
+    gates = [random_unitary() for _ in range(10)]
+    single = Circuit(gates, dtype = "complex64")
+    double = Circuit(gates, dtype = "complex128")
+
+    batch = np.random.default_rng(0).normal(size = (100, 4))
+    out = single.apply(batch)
+    assert out.dtype == np.complex64
+    assert np.allclose(out, double.apply(batch), atol = 1.e-5)
+
+    assert single.unitary().dtype == np.complex64
+    assert single.copy().precision() == np.complex64
+    assert single.apply(batch).dtype == np.complex64  # through the product
+    assert single.apply(QubitState([1, 0, 0, 0])).precision() == np.complex64
+
+    single.append(gl.X1, (1, 0))
+    assert single.get_element(-1)._matrix.dtype == np.complex64
+
+    wide = Circuit(n_qubits = 3, dtype = "complex64")
+    wide.append(gl.HADAMARD1, (2, 0))
+    assert wide.simulate("statevector").dtype == np.complex64
+    assert wide.simulate("mps")._dtype == np.complex64
+
+
+def test_defaults():
+    """
+    Function to test global and scoped default precisions.
+    """
+    assert get_precision() is None
+
+    with use_precision("complex64"):
+        assert QubitState([1, 0, 0, 0]).peek().dtype == np.complex64
+        assert random_circuit(2).precision() == np.complex64
+        assert MPSState(2)._dtype == np.complex64
+
+        # Shared gates and explicit dtypes are not affected
+        assert gl.X1.precision() is None
+        assert QubitState([1, 0, 0, 0], dtype = "infer").precision() is None
+
+    try:
+        set_precision("double")
+        assert UnitaryGate(gl.SWAP_mat).precision() == np.complex128
+        with use_precision(None):
+            assert UnitaryGate(gl.SWAP_mat).precision() is None
+    finally:
+        set_precision(None)
+
+    assert get_precision() is None
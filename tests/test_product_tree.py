@@ -0,0 +1,67 @@
+'''
+A testing python file using the pytest framework for the ProductTree class.
+
+Random sequences of insertions, removals and replacements are applied to
+a tree and to a plain list of matrices, and the product kept by the tree
+is compared with the product of the list.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from scipy.stats import unitary_group as ug
+
+from drmd.product_tree import ProductTree
+
+
+def naive_product(matrices, dim):
+    """
+    Helper multiplying a list of matrices, the first one applied first.
+    """
+    product = np.eye(dim, dtype = complex)
+    for matrix in matrices:
+        product = matrix @ product
+    return product
+
+
+def test_build():
+    """
+    Function to test the product of a freshly built tree.
+    """
+    rng = np.random.default_rng(0)
+    for length in (0, 1, 2, 7, 32):
+        matrices = [ug.rvs(4, random_state = rng) for _ in range(length)]
+        tree = ProductTree(matrices, 4)
+        assert len(tree) == length
+        assert np.allclose(tree.product(), naive_product(matrices, 4))
+
+
+def test_edits():
+    """
+    Function to test the product after random edits of the sequence.
+    """
+    rng = np.random.default_rng(1)
+    matrices = [ug.rvs(4, random_state = rng) for _ in range(10)]
+    tree = ProductTree(matrices, 4)
+
+    for _ in range(200):
+        action = rng.integers(3) if matrices else 0
+        matrix = ug.rvs(4, random_state = rng)
+
+        if action == 0:
+            index = int(rng.integers(len(matrices) + 1))
+            matrices.insert(index, matrix)
+            tree.insert(index, matrix)
+        elif action == 1:
+            index = int(rng.integers(len(matrices)))
+            assert np.allclose(tree.pop(index), matrices.pop(index))
+        else:
+            index = int(rng.integers(len(matrices)))
+            matrices[index] = matrix
+            tree.replace(index, matrix)
+
+        assert len(tree) == len(matrices)
+        assert np.allclose(tree.product(), naive_product(matrices, 4))
@@ -0,0 +1,131 @@
+'''
+A testing python file using the pytest framework for random number generators.
+
+Tests that seeded generators make the random functions reproducible,
+that the default draws a fresh seed, that legacy RandomState objects
+are accepted, and that spawned child generators are reproducible and
+independent.
+'''
+import sys
+import os
+import asyncio
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit, random_circuit
+from drmd.qubit_state import QubitState
+from drmd.unitary_gate import UnitaryGate, random_unitary
+from drmd.stabilizer import StabilizerState
+from drmd.mps import MPSState
+from drmd.runner import AsyncRunner
+from drmd.rng import as_generator, spawn
+
+HH = UnitaryGate(np.kron(gl.H_mat, gl.H_mat))
+
+
+def test_as_generator():
+    """
+    Function to test the conversion of 'rng' arguments.
+    """
+    rng = np.random.default_rng(3)
+    assert as_generator(rng) is rng
+    assert type(as_generator(None)) is np.random.Generator
+    assert as_generator(None) is not as_generator(None)
+    assert as_generator(5).random() == np.random.default_rng(5).random()
+    assert (as_generator(np.random.SeedSequence(5)).random() ==
+            np.random.default_rng(5).random())
+
+    for wrong in ("frog", 1.5, True):
+        with pytest.raises(TypeError):
+            as_generator(wrong)
+
+
+def test_reproducible():
+    """
+    Function to test that equal seeds give equal results in every
+    random function.
+    """
+    assert random_unitary(rng = 7).compare(random_unitary(rng = 7))
+    assert not random_unitary(rng = 7).compare(random_unitary(rng = 8))
+    assert random_circuit(5, rng = 7).compare(random_circuit(5, rng = 7))
+
+    bell = QubitState([1, 0, 0, 1])
+    first = [bell.copy().measure_collapse(rng = seed).peek() for seed in range(20)]
+    second = [bell.copy().measure_collapse(rng = seed).peek() for seed in range(20)]
+    assert np.array_equal(first, second)
+
+    circ = Circuit(n_qubits = 3)
+    circ.append(HH, (0, 1))
+    circ.append(gl.HADAMARD1, (1, 2))
+    circ.append(gl.T1, (0, 1))
+    for backend in ("statevector", "mps"):
+        samples = circ.sample(50, backend = backend, rng = 11)
+        assert np.array_equal(samples, circ.sample(50, backend = backend, rng = 11))
+
+    clifford = Circuit([gl.HADAMARD1, gl.CNOT1])
+    assert np.array_equal(clifford.sample(50, rng = 11), clifford.sample(50, rng = 11))
+
+    outcomes = []
+    for i in range(2):
+        state = StabilizerState(4)
+        state.apply_gate(HH, (0, 1))
+        state.apply_gate(HH, (2, 3))
+        outcomes.append(state.measure_all(rng = 4))
+    assert np.array_equal(*outcomes)
+
+
+def test_legacy_state():
+    """
+    Function to test that legacy RandomState objects are used as is.
+    """
+    first = random_circuit(3, rng = np.random.RandomState(1))
+    assert random_circuit(3, rng = np.random.RandomState(1)).compare(first)
+
+    mps = MPSState(3)
+    mps.apply_gate(HH, (1, 2))
+    first = mps.sample(20, rng = np.random.RandomState(2))
+    assert np.array_equal(mps.sample(20, rng = np.random.RandomState(2)), first)
+
+
+def test_spawn():
+    """
+    Function to test that child generators are reproducible and distinct.
+    """
+    draws = [rng.random(4) for rng in spawn(42, 3)]
+    again = [rng.random(4) for rng in spawn(42, 3)]
+    assert np.array_equal(draws, again)
+    assert not np.array_equal(draws[0], draws[1])
+
+    parent = [rng.random(4) for rng in spawn(np.random.default_rng(42), 2)]
+    assert np.array_equal(parent, [rng.random(4) for rng in
+                                   spawn(np.random.default_rng(42), 2)])
+    assert len(spawn(np.random.SeedSequence(1), 5)) == 5
+    assert len(spawn(None, 2)) == 2
+
+    with pytest.raises(ValueError):
+        spawn(1, -1)
+    with pytest.raises(TypeError):
+        spawn("frog", 2)
+
+
+def test_runner():
+    """
+    Function to test that seeded runner jobs do not depend on batching.
+    """
+    circ = Circuit([HH])
+    state = np.array([1, 0, 0, 0], dtype = complex)
+
+    async def main(max_batch):
+        runner = AsyncRunner(max_batch = max_batch, max_delay = 0.01)
+        rngs = spawn(9, 4)
+        return await asyncio.gather(*[runner.run(circ, state, shots = 30, rng = rng)
+                                      for rng in rngs])
+
+    together = asyncio.run(main(256))
+    alone = asyncio.run(main(1))
+    assert np.array_equal(together, alone)
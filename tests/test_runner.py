@@ -0,0 +1,138 @@
+'''
+A testing python file using the pytest framework for the AsyncRunner class.
+
+Concurrent jobs are submitted from coroutines, and their results are
+compared with direct applications of the circuits. Micro-batching,
+backpressure, sampling, errors and latency statistics are also tested.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+
+import pytest
+import numpy as np
+from scipy.stats import unitary_group as ug
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit, random_circuit
+from drmd.qubit_state import QubitState
+from drmd.runner import AsyncRunner
+
+
+def test_concurrent_jobs():
+    """
+    Function to test that concurrent jobs on a shared circuit are merged
+    into batches and get the same results as direct applications.
+    """
+    circ = random_circuit(4)
+    states = ug.rvs(4, random_state = 0)
+    runner = AsyncRunner(max_batch = 64, max_delay = 0.05)
+    collapsed = QubitState([1, 1, 1, 1])
+    collapsed.measure_collapse(rng = 0)
+
+    async def main():
+        jobs = [runner.run(circ, states[i % 4]) for i in range(40)]
+        jobs.append(runner.run(circ, states))
+        jobs.append(runner.run(circ, QubitState([1, 0, 0, 0])))
+        jobs.append(runner.run(circ, collapsed))
+        return await asyncio.gather(*jobs)
+
+    results = asyncio.run(main())
+
+    for i in range(40):
+        assert np.allclose(results[i], circ.apply(states[i % 4]))
+    assert np.allclose(results[40], circ.apply(states))
+    assert results[41].compare(circ.apply(QubitState([1, 0, 0, 0])))
+    assert results[42].compare(circ.apply(collapsed))
+
+    stats = runner.stats()
+    assert stats["completed"] == 43
+    assert stats["mean_batch"] == 46  # all jobs in one batch
+    assert 0 <= stats["p50"] <= stats["p90"] <= stats["p99"]
+
+
+def test_shots():
+    """
+    Function to test measurement samples returned by jobs.
+    """
+    bell = Circuit([gl.HADAMARD1, gl.CNOT1])
+    runner = AsyncRunner()
+
+    async def main():
+        single = await runner.run(bell, np.array([1, 0, 0, 0]), shots = 2000)
+        batch = await runner.run(bell, np.eye(4)[:2], shots = 10)
+        return single, batch
+
+    single, batch = asyncio.run(main())
+    assert single.shape == (2000, 2) and batch.shape == (2, 10, 2)
+    assert np.all(single[:, 0] == single[:, 1])
+    assert abs(single[:, 0].mean() - 0.5) < 0.05
+
+    # |01> becomes a Bell state with anti-correlated qubits
+    assert np.all(batch[1, :, 0] != batch[1, :, 1])
+
+
+def test_backpressure():
+    """
+    Function to test that no more than max_pending states are queued
+    or computed at once, and that oversized jobs are rejected.
+    """
+    circ = Circuit(gl.X1)
+    runner = AsyncRunner(max_batch = 4, max_delay = 0.001, max_pending = 6)
+    peak = []
+
+    async def job():
+        out = runner.run(circ, np.eye(4)[:3])
+        task = asyncio.ensure_future(out)
+        await asyncio.sleep(0)
+        peak.append(runner._in_flight)
+        return await task
+
+    async def main():
+        return await asyncio.gather(*[job() for _ in range(10)])
+
+    results = asyncio.run(main())
+    assert all(np.allclose(out, circ.apply(np.eye(4)[:3])) for out in results)
+    assert max(peak) <= 6
+    assert runner._in_flight == 0
+
+    with pytest.raises(ValueError, match = "at most 6"):
+        asyncio.run(runner.run(circ, np.eye(4)[[0] * 7]))
+
+
+def test_errors_and_drain():
+    """
+    Function to test invalid jobs, and draining pending jobs.
+    """
+    circ = Circuit(n_qubits = 3)
+    circ.append(gl.CNOT1, (2, 0))
+    runner = AsyncRunner(max_delay = 10)
+
+    async def main():
+        task = asyncio.ensure_future(runner.run(circ, np.eye(8)[5]))
+        await asyncio.sleep(0)
+        await runner.drain()
+        assert runner._batches == {}
+        return await task
+
+    # The control of the CNOT is qubit 2, its target qubit 0
+    assert np.allclose(asyncio.run(main()), np.eye(8)[1])
+
+    with pytest.raises(ValueError):
+        asyncio.run(runner.run(circ, np.eye(4)[0]))
+
+    with pytest.raises(TypeError):
+        asyncio.run(runner.run(circ, QubitState([1, 0, 0, 0])))
+
+    with pytest.raises(TypeError):
+        asyncio.run(runner.run(gl.X1, np.eye(4)[0]))
+
+    with pytest.raises(ValueError):
+        asyncio.run(runner.run(circ, np.eye(8)[0], shots = 0))
+
+    with pytest.raises(ValueError):
+        AsyncRunner(max_batch = 0)
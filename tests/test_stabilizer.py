@@ -0,0 +1,145 @@
+'''
+A testing python file using the pytest framework for the StabilizerState
+class and the stabilizer backend of the Circuit class.
+
+Random Clifford circuits are simulated both on a stabilizer tableau and on
+a dense state vector, and the resulting states, measurement outcomes and
+samples are compared.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit
+from drmd.stabilizer import StabilizerState
+
+CLIFFORD_NAMES = ["HADAMARD1", "HADAMARD2", "CNOT1", "CNOT2", "S1", "S2",
+                  "X1", "Y2", "Z1", "CZ", "SWAP"]
+
+
+def random_clifford_circuit(n_qubits, depth, rng):
+    """
+    Helper building a random circuit of Clifford gates from gate_list,
+    acting on random pairs of qubits.
+    """
+    circ = Circuit(n_qubits = n_qubits)
+    for _ in range(depth):
+        gate = getattr(gl, CLIFFORD_NAMES[rng.integers(len(CLIFFORD_NAMES))])
+        qubits = tuple(int(q) for q in rng.choice(n_qubits, 2, replace = False))
+        circ.append(gate, qubits)
+    return circ
+
+
+def test_init():
+    """
+    Function to test the initial state |0...0> and input checks.
+    """
+    state = StabilizerState(3)
+    assert state.n_qubits() == 3
+    assert np.allclose(state.to_statevector(), np.eye(8)[0])
+    assert str(state) == "+ZII\n+IZI\n+IIZ"
+
+    with pytest.raises(ValueError, match = "positive integer"):
+        StabilizerState(0)
+
+    with pytest.raises(ValueError, match = "Only Clifford gates"):
+        state.apply_gate(gl.T1, (0, 1))
+
+    with pytest.raises(ValueError, match = "two distinct qubits"):
+        state.apply_gate(gl.CNOT1, (2, 2))
+
+
+def test_against_statevector():
+    """
+    Function to test on random Clifford circuits that the stabilizer state
+    matches the dense state vector, up to a global phase.
+    """
+    rng = np.random.default_rng(3)
+
+    for _ in range(10):
+        circ = random_clifford_circuit(4, 30, rng)
+        assert circ.is_clifford()
+
+        dense = circ.simulate(backend = "statevector")
+        tableau = circ.simulate()
+        assert type(tableau) is StabilizerState
+
+        overlap = np.vdot(tableau.to_statevector(), dense)
+        assert np.isclose(abs(overlap), 1)
+
+
+def test_sample_and_measure():
+    """
+    Function to test that samples only contain outcomes with non-zero
+    probability, spread uniformly, and that measurements collapse the state.
+    """
+    rng = np.random.default_rng(4)
+
+    for _ in range(5):
+        circ = random_clifford_circuit(4, 25, rng)
+        probs = np.abs(circ.simulate(backend = "statevector")) ** 2
+        support = set(np.nonzero(probs > 1.e-9)[0])
+
+        samples = circ.sample(shots = 400)
+        outcomes = samples @ (1 << np.arange(3, -1, -1))
+        assert set(outcomes) <= support
+
+        # Every outcome of a stabilizer state is equally likely
+        counts = np.bincount(outcomes, minlength = 16)[sorted(support)]
+        assert counts.min() > 400 / len(support) / 3
+
+        # Collapse after measuring one qubit matches the projected state
+        state = circ.simulate()
+        outcome = state.measure(1)
+        dense = circ.simulate(backend = "statevector").reshape(2, 2, 2, 2)
+        projected = np.zeros_like(dense)
+        projected[:, outcome] = dense[:, outcome]
+        projected = projected.reshape(-1) / np.linalg.norm(projected)
+        assert np.isclose(abs(np.vdot(state.to_statevector(), projected)), 1)
+
+        # Measuring again gives the same result
+        state = circ.simulate()
+        bits = state.measure_all()
+        assert (bits @ (1 << np.arange(3, -1, -1))) in support
+        assert np.array_equal(state.measure_all(), bits)
+        assert np.array_equal(state.sample(5), np.tile(bits, (5, 1)))
+
+
+def test_bell_state():
+    """
+    Function to test the outcomes of a Bell state are perfectly correlated.
+    """
+    circ = Circuit([gl.HADAMARD1, gl.CNOT1])
+    samples = circ.sample(shots = 200)
+    assert np.all(samples[:, 0] == samples[:, 1])
+    assert 0 < samples[:, 0].sum() < 200
+
+
+def test_many_qubits():
+    """
+    Function to test that Clifford circuits on hundreds of qubits,
+    out of reach of a state vector, are simulated quickly.
+    """
+    n_qubits = 300
+    circ = Circuit(n_qubits = n_qubits)
+    circ.append(gl.HADAMARD1, (0, 1))
+    for q in range(n_qubits - 1):
+        circ.append(gl.CNOT1, (q, q + 1))
+
+    start = time.perf_counter()
+    samples = circ.sample(shots = 100)
+    assert time.perf_counter() - start < 10
+
+    # GHZ state: all bits equal in every shot
+    assert np.all(samples == samples[:, :1])
+
+    state = circ.simulate()
+    first = state.measure(0)
+    assert state.measure(n_qubits - 1) == first
@@ -0,0 +1,151 @@
+'''
+A testing python file using the pytest framework for the execution of
+gate streams.
+
+Streams given as generators, circuits and gate files are applied to
+states of every type and folded into running products, and the results
+are compared with the equivalent Circuit. Checkpoints and resuming from
+a gate file are also tested.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+from scipy.stats import unitary_group as ug
+
+from drmd import gate_list as gl
+from drmd.circuit import Circuit
+from drmd.mps import MPSState
+from drmd.qubit_state import QubitState
+from drmd.stabilizer import StabilizerState
+from drmd.stream import stream_apply, stream_unitary, write_gates, read_gates
+from drmd.unitary_gate import UnitaryGate
+
+
+def random_stream(n_qubits, depth, seed):
+    """
+    Helper generator of random gates on random pairs of qubits.
+    """
+    rng = np.random.default_rng(seed)
+    for _ in range(depth):
+        qubits = tuple(int(q) for q in rng.choice(n_qubits, 2, replace = False))
+        yield ug.rvs(4, random_state = rng), qubits
+
+
+def as_circuit(stream, n_qubits):
+    """
+    Helper storing a stream of gates in a Circuit.
+    """
+    circ = Circuit(n_qubits = n_qubits)
+    for matrix, qubits in stream:
+        circ.append(UnitaryGate(matrix), qubits)
+    return circ
+
+
+def test_stream_apply():
+    """
+    Function to test applying generators of gates to arrays, batches,
+    QubitState and MPSState objects.
+    """
+    circ = as_circuit(random_stream(4, 30, 0), 4)
+    state = ug.rvs(16, random_state = 1)[0]
+    batch = ug.rvs(16, random_state = 2)[:3]
+
+    assert np.allclose(stream_apply(random_stream(4, 30, 0), state), circ.apply(state))
+    assert np.allclose(stream_apply(random_stream(4, 30, 0), batch), circ.apply(batch))
+
+    mps = stream_apply(random_stream(4, 30, 0), MPSState(4))
+    assert np.allclose(mps.to_statevector(), circ.simulate("statevector"))
+
+    # Gates given alone act on qubits (0, 1)
+    qubit = QubitState([1, 0, 0, 0])
+    out = stream_apply(iter([gl.HADAMARD1, gl.CNOT1.copy()]), qubit)
+    assert out.compare([1, 0, 0, 1])
+    assert qubit.compare([1, 0, 0, 0])
+
+    # Collapsed states are streamed from their current amplitudes
+    qubit = QubitState([1, 1, 1, 1])
+    qubit.measure_collapse(rng = 0)
+    pair = Circuit([gl.HADAMARD1, gl.CNOT1])
+    assert stream_apply(iter([gl.HADAMARD1, gl.CNOT1]), qubit).compare(pair.apply(qubit))
+
+    with pytest.raises(TypeError):
+        stream_apply([gl.X1], [1, 0, 0, 0])
+
+    with pytest.raises(TypeError):
+        stream_apply(["X1"], state)
+
+    with pytest.raises(ValueError):
+        stream_apply([(gl.X1, (0, 4))], state)
+
+
+def test_stream_unitary():
+    """
+    Function to test the running product of a stream against the
+    unitary of the equivalent circuit.
+    """
+    circ = as_circuit(random_stream(3, 20, 3), 3)
+    assert np.allclose(stream_unitary(random_stream(3, 20, 3), 3), circ.unitary())
+    assert np.allclose(stream_unitary(circ, 3), circ.unitary())
+    assert np.allclose(stream_unitary([]), np.eye(4))
+
+    with pytest.raises(ValueError):
+        stream_unitary([], 1)
+
+
+def test_checkpoints():
+    """
+    Function to test that checkpoints are called with the partial results.
+    """
+    saved = []
+    stream_unitary(random_stream(2, 10, 4), 2,
+                   checkpoint = lambda count, matrix: saved.append((count, matrix.copy())),
+                   every = 4)
+
+    assert [count for count, _ in saved] == [4, 8]
+    partial = as_circuit(list(random_stream(2, 10, 4))[:8], 2)
+    assert np.allclose(saved[1][1], partial.unitary())
+
+    states = []
+    stream_apply([gl.X1] * 3, QubitState([1, 0, 0, 0]),
+                 checkpoint = lambda count, state: states.append(state), every = 1)
+    assert all(type(state) is QubitState for state in states)
+    assert states[0].compare([0, 0, 1, 0])
+
+    with pytest.raises(ValueError):
+        stream_apply([], np.eye(4)[0], checkpoint = print, every = 0)
+
+
+def test_gate_file(tmp_path):
+    """
+    Function to test writing gate files in chunks, and applying them
+    through a memory map, from the start or from a given gate.
+    """
+    path = str(tmp_path / "gates.bin")
+    circ = as_circuit(random_stream(3, 25, 5), 3)
+
+    assert write_gates(path, random_stream(3, 25, 5), chunk = 7) == 25
+    assert np.allclose(stream_unitary(path, 3), circ.unitary())
+
+    gates = list(read_gates(path, start = 20))
+    assert len(gates) == 5
+    assert gates[0][0].compare(circ.get_element(20))
+    assert gates[0][1] == circ.get_qubits(20)
+
+    # Clifford circuits stream into the stabilizer backend
+    clifford = Circuit([gl.HADAMARD1, gl.CNOT1, gl.S2], 2)
+    write_gates(path, clifford)
+    tableau = stream_apply(path, StabilizerState(2))
+    assert np.allclose(tableau.to_statevector(), clifford.simulate("statevector"))
+
+    assert write_gates(path, []) == 0
+    assert list(read_gates(path)) == []
+
+    with open(path, "wb") as file:
+        file.write(b"abc")
+    with pytest.raises(ValueError):
+        list(read_gates(path))
@@ -0,0 +1,105 @@
+'''
+A testing python file using the pytest framework for unitary synthesis.
+
+Tests that products of standard gates are found by the discrete search
+with the shortest sequences, that arbitrary unitaries are fitted with
+the smallest number of CNOT gates, and the errors raised on invalid input.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.unitary_gate import UnitaryGate, random_unitary
+from drmd.circuit import Circuit
+from drmd.structure import canonical_phase
+from drmd.synthesis import synthesize, operator_distance, cnot_count, _phase_keys
+
+
+def test_phase_keys():
+    """
+    Function to test that synthesis tables key matrices by the same
+    phase convention as the rest of the package.
+    """
+    matrices = np.array([random_unitary(rng = i)._matrix for i in range(3)] +
+                        [np.kron(gl.H_mat, gl.H_mat)])
+    phases = np.exp(1j * np.array([0.3, 2.0, -1.2, np.pi]))[:, None, None]
+    assert _phase_keys(matrices) == _phase_keys(matrices * phases)
+
+    stacked = canonical_phase(matrices)
+    for matrix, canonical in zip(matrices, stacked):
+        assert np.array_equal(canonical_phase(matrix), canonical)
+
+
+def test_discrete():
+    """
+    Function to test the meet-in-the-middle search over standard gates.
+    """
+    sequence = [gl.SWAP, gl.T1, gl.HADAMARD1, gl.CNOT1, gl.S2]
+    target = Circuit(sequence).unitary() * np.exp(0.7j)
+
+    circ = synthesize(target, rotations = False)
+    assert circ.size() <= len(sequence)
+    assert operator_distance(circ.unitary(), target) <= 1.e-8
+
+    # Single gates, and the identity, need no search beyond one level
+    assert synthesize(gl.CZ).size() == 1
+    assert synthesize(np.eye(4)).is_empty()
+
+    # CNOT2 CNOT1 CNOT2 is a SWAP, which is a single gate of the set
+    assert synthesize(Circuit([gl.CNOT2, gl.CNOT1, gl.CNOT2]).unitary()).size() == 1
+
+    # Restricted gate sets, by name or object
+    circ = synthesize(gl.SWAP, gates = ["CNOT1", gl.CNOT2], rotations = False)
+    assert circ.size() == 3 and circ.equivalent(Circuit([gl.SWAP]))
+
+    with pytest.raises(ValueError):
+        synthesize(gl.T1, gates = ["CNOT1"], rotations = False)
+
+
+def test_continuous():
+    """
+    Function to test the numerical fit of arbitrary unitaries.
+    """
+    for seed in range(3):
+        target = random_unitary(rng = seed)
+        circ = synthesize(target, tol = 1.e-9, rng = 0)
+        assert operator_distance(circ.unitary(), target._matrix) <= 1.e-9
+        # 4 layers of rotations around 3 CNOT gates
+        assert circ.size() == 7
+
+    product = np.kron(gl.H_mat, gl.T_mat) @ np.kron(gl.Y_mat, gl.H_mat)
+    target = product @ gl.C2NOT1 @ np.kron(gl.S_mat, gl.H_mat) @ np.diag([1, 1j, -1, 1])
+    assert cnot_count(target) <= 2
+    circ = synthesize(target, gates = [], rng = 0)
+    assert operator_distance(circ.unitary(), target) <= 1.e-8
+    assert circ.size() <= 5
+
+
+def test_cnot_count():
+    """
+    Function to test the number of CNOT gates of standard gates.
+    """
+    assert cnot_count(gl.HADAMARD1._matrix) == 0
+    assert cnot_count(gl.CZ._matrix) == 1
+    assert cnot_count(gl.CNOT1._matrix @ gl.CNOT2._matrix) == 2
+    assert cnot_count(gl.SWAP._matrix) == 3
+
+
+def test_errors():
+    """
+    Function to test the errors raised on invalid inputs.
+    """
+    with pytest.raises(ValueError):
+        synthesize(np.ones((4, 4)))
+    with pytest.raises(ValueError):
+        synthesize(gl.CZ, tol = 0)
+    with pytest.raises(ValueError):
+        synthesize(gl.CZ, max_depth = -1)
+    with pytest.raises(TypeError):
+        synthesize(gl.CZ, gates = [np.eye(4)])
@@ -0,0 +1,105 @@
+'''
+A testing python file using the pytest framework for validation levels.
+
+Tests which constructor checks run at the 'strict', 'fast' and 'off'
+levels, that internal constructions give the same results at every
+level, and that sampled checks still catch invalid inputs.
+'''
+import sys
+import os
+
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import numpy as np
+
+from drmd import gate_list as gl
+from drmd.circuit import random_circuit
+from drmd.qubit_state import QubitState
+from drmd.unitary_gate import UnitaryGate
+from drmd.validation import get_validation, set_validation, use_validation
+
+
+def test_levels():
+    """
+    Function to test that user inputs are checked at the 'strict' and
+    'fast' levels, but not at the 'off' level.
+    """
+    assert get_validation() == ("strict", 0.0)
+
+    for level in ("strict", "fast"):
+        with use_validation(level):
+            with pytest.raises(ValueError):
+                UnitaryGate(np.ones((4, 4)))
+            with pytest.raises(ValueError):
+                QubitState([0, 0, 0, 0])
+            with pytest.raises(TypeError):
+                QubitState("frog")
+
+    with use_validation("off"):
+        assert not np.allclose(UnitaryGate(np.ones((4, 4)))._matrix, np.eye(4))
+
+        # States are still normalised
+        assert np.allclose(QubitState([1, 1, 0, 0]).peek(), [2 ** -0.5, 2 ** -0.5, 0, 0])
+        assert QubitState([1, 0], [0, 1]).compare([0, 1, 0, 0])
+
+    assert get_validation() == ("strict", 0.0)
+
+    with pytest.raises(ValueError):
+        set_validation("sometimes")
+
+    with pytest.raises(ValueError):
+        use_validation("off", sample_rate = 2).__enter__()
+
+
+def test_same_results():
+    """
+    Function to test that circuits, copies and measurements give the
+    same results whatever the validation level.
+    """
+    circ = random_circuit(5)
+    state = QubitState([1, 2, 0, 1j])
+    expected = circ.apply(state)
+    stats = expected.measure_stats(1)
+
+    for level in ("fast", "off"):
+        with use_validation(level):
+            out = circ.copy().apply(state)
+            assert out.compare(expected)
+            assert np.allclose(out.get_initial(), expected.get_initial())
+
+            for (mine, p_mine), (theirs, p_theirs) in zip(out.measure_stats(1), stats):
+                assert mine.compare(theirs) and p_mine == p_theirs
+
+            gate = circ.get_element(0)
+            assert gate.compare(circ.get_element(0).dagger().dagger())
+            assert gate.is_clifford() == circ.get_element(0).is_clifford()
+
+
+def test_sampled_checks():
+    """
+    Function to test that checks run on the given fraction of
+    constructions when validation is off.
+    """
+    errors = 0
+    with use_validation("off", sample_rate = 0.5):
+        for _ in range(200):
+            try:
+                QubitState([0, 0, 0, 0])
+            except ValueError:
+                errors += 1
+
+    assert 50 < errors < 150
+
+    with use_validation("off", sample_rate = 1):
+        with pytest.raises(ValueError):
+            UnitaryGate(np.ones((4, 4)))
+
+    try:
+        set_validation("fast")
+        assert get_validation() == ("fast", 0.0)
+        with pytest.raises(ValueError):
+            QubitState([0, 0, 0, 0])
+    finally:
+        set_validation("strict")
@@ -8,15 +8,16 @@ The copy and repr functions are tested in test_circuit.py.
 import sys
 import os
 
-# Add the package's source directory to sys.path
-sys.path.insert(0, os.path.abspath('../drmd'))
+# Add the package's base directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pytest
 import numpy as np
 
-import gate_list as gl
-from unitary_gate import UnitaryGate
-from qubit_state import QubitState
+from drmd import gate_list as gl
+from drmd.unitary_gate import UnitaryGate
+from drmd.qubit_state import QubitState
+from drmd.validation import use_validation
 
 def test_construction():
     '''
@@ -99,3 +100,124 @@ def test_dag():
                         [0, 0, 0, 1], [-1, 0, 0, 0], [0, -1, 0, 0]]))
 
     assert example.dagger().compare(example_hermitianconjugate)
+
+
+def embed(matrix, qubits, n_qubits):
+    '''
+    Helper building the dense 2**n x 2**n matrix of a two-qubit gate
+    acting on the given qubits, by brute force over the basis states.
+    '''
+    dim = 2 ** n_qubits
+    full = np.zeros((dim, dim), dtype = complex)
+    for col in range(dim):
+        bits = [(col >> (n_qubits - 1 - q)) & 1 for q in range(n_qubits)]
+        local = 2 * bits[qubits[0]] + bits[qubits[1]]
+        for out_local in range(4):
+            new_bits = list(bits)
+            new_bits[qubits[0]], new_bits[qubits[1]] = out_local >> 1, out_local & 1
+            row = int("".join(map(str, new_bits)), 2)
+            full[row, col] += matrix[out_local, local]
+    return full
+
+
+def test_structure_kernels():
+    '''
+    Function to test that gates are recognised as diagonal, permutation or
+    dense, and that the specialised kernels agree with a dense matrix
+    multiplication, for single states and (N, 4) batches of states.
+    '''
+    assert gl.CZ.is_diagonal() and gl.Z1.is_diagonal()
+    assert gl.CNOT1.is_permutation() and not gl.CNOT1.is_diagonal()
+    assert gl.Y2.is_permutation()
+    assert not gl.HADAMARD1.is_permutation()
+
+    rng = np.random.default_rng(1)
+    batch = rng.normal(size = (5, 4)) + 1j * rng.normal(size = (5, 4))
+
+    for gate in [gl.CZ, gl.T1, gl.CNOT2, gl.Y1, gl.SWAP, gl.HADAMARD2]:
+        expected = batch @ gate._matrix.T
+        assert np.allclose(gate.apply(batch), expected)
+        assert np.allclose(gate.apply(batch[0]), expected[0])
+
+    with pytest.raises(ValueError, match = "Wrong size of state"):
+        gl.CZ.apply(np.zeros((2, 3)))
+
+
+def test_apply_to_qubits():
+    '''
+    Function to test applying a gate to two qubits of an n-qubit state,
+    against the dense matrix of the gate embedded in the n-qubit space.
+    '''
+    rng = np.random.default_rng(2)
+    n_qubits = 4
+    batch = rng.normal(size = (3, 2 ** n_qubits)) + 0j
+
+    for gate in [gl.CZ, gl.CNOT1, gl.Y2, gl.HADAMARD1, UnitaryGate(np.eye(4))]:
+        for qubits in [(0, 1), (1, 0), (3, 1), (0, 2)]:
+            full = embed(gate._matrix, qubits, n_qubits)
+            assert np.allclose(gate.apply_to_qubits(batch, qubits), batch @ full.T)
+            assert np.allclose(gate.apply_to_qubits(batch[0], qubits), full @ batch[0])
+
+    # Two-qubit states with qubits (0, 1) match 'apply'
+    assert np.allclose(gl.HADAMARD1.apply_to_qubits(batch[0, :4], (0, 1)),
+                       gl.HADAMARD1.apply(batch[0, :4]))
+
+    with pytest.raises(ValueError, match = "two distinct qubits"):
+        gl.CZ.apply_to_qubits(batch, (1, 1))
+
+    with pytest.raises(ValueError, match = "Wrong size of state"):
+        gl.CZ.apply_to_qubits(np.zeros(6), (0, 1))
+
+
+def test_lightweight():
+    """
+    Function to test that gates have no attribute dictionary, and that
+    copies do not share mutable data with the original gate.
+    """
+    gate = UnitaryGate(gl.C1NOT2)
+    assert not hasattr(gate, "__dict__")
+
+    for level in ("strict", "fast"):
+        with use_validation(level):
+            copied = gate.copy()
+
+        assert copied.compare(gate) and copied._matrix is not gate._matrix
+        assert copied.is_permutation()
+
+        # Index caches filled after copying are not shared
+        copied.apply_to_qubits(np.eye(8)[3], (2, 0))
+        assert gate._index_cache is None or (2, 0) not in gate._index_cache
+
+
+def test_apply_into():
+    """
+    Function to test applying gates into preallocated output arrays,
+    for every kind of gate, against apply_to_qubits.
+    """
+    rng = np.random.default_rng(3)
+    gates = [gl.CNOT1, gl.CZ, gl.T2, gl.SWAP, UnitaryGate(gl.Y_mat, gl.S_mat),
+             UnitaryGate(gl.H_mat, gl.T_mat)]
+
+    for n_qubits in (2, 4):
+        states = rng.normal(size = (5, 2 ** n_qubits)) + 1j * rng.normal(size = (5, 2 ** n_qubits))
+        out = np.empty_like(states)
+
+        for gate in gates:
+            for qubits in ((0, 1), (1, 0), (n_qubits - 1, 0)):
+                expected = gate.apply_to_qubits(states, qubits)
+                assert gate.apply_into(states, out, qubits) is out
+                assert np.allclose(out, expected)
+                assert np.allclose(gate.apply_into(states[2], out[2], qubits), expected[2])
+
+    with pytest.raises(ValueError, match = "shape"):
+        gl.X1.apply_into(np.zeros(4), np.zeros(8))
+
+    with pytest.raises(ValueError, match = "overlap"):
+        state = np.zeros(4, dtype = complex)
+        gl.X1.apply_into(state, state)
+
+    with pytest.raises(ValueError, match = "C-contiguous"):
+        gl.X1.apply_into(np.zeros(4), np.zeros(8)[::2])
+
+    with pytest.raises(TypeError):
+        gl.X1.apply_into(np.zeros(4), [0, 0, 0, 0])